@@ -234,7 +234,12 @@ _parametres_instance = None
 
 
 def obtenir_parametres() -> Parametres:
-    """Retourne l'instance singleton des paramètres."""
+    """Retourne l'instance singleton des paramètres.
+
+    Le fichier JSON n'est lu qu'au premier appel : les appels suivants sont
+    O(1), y compris dans des boucles de benchmark. Utiliser
+    recharger_parametres() pour relire settings.json.
+    """
     global _parametres_instance
     if _parametres_instance is None:
         _parametres_instance = Parametres()
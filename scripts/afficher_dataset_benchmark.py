@@ -6,6 +6,7 @@ Utilisation:
 """
 
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Ajouter le répertoire racine au path
@@ -13,6 +14,7 @@ racine_projet = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(racine_projet))
 
 from scripts.donnees_benchmark_opsemia import (
+    obtenir_index_inverse,
     obtenir_requetes_messages,
     obtenir_requetes_images,
     afficher_statistiques_dataset,
@@ -123,10 +125,11 @@ def afficher_couverture_dataset():
     
     requetes_messages = obtenir_requetes_messages()
     
-    # Compter les documents uniques référencés
-    docs_references = set()
-    for _, ids_attendus, _ in requetes_messages:
-        docs_references.update(ids_attendus)
+    # Documents uniques référencés par au moins une requête message
+    docs_references = [
+        doc_id for doc_id, positions in obtenir_index_inverse().items()
+        if positions[0][0] < len(requetes_messages)
+    ]
     
     print(f"\n📊 Statistiques de couverture:")
     print(f"  - Total requêtes messages: {len(requetes_messages)}")
@@ -134,10 +137,7 @@ def afficher_couverture_dataset():
     print(f"  - Moyenne docs/requête: {sum(len(ids) for _, ids, _ in requetes_messages) / len(requetes_messages):.1f}")
     
     # Distribution du nombre de résultats attendus
-    distribution = {}
-    for _, ids_attendus, _ in requetes_messages:
-        nb = len(ids_attendus)
-        distribution[nb] = distribution.get(nb, 0) + 1
+    distribution = Counter(len(ids_attendus) for _, ids_attendus, _ in requetes_messages)
     
     print(f"\n📈 Distribution du nombre de résultats attendus:")
     for nb in sorted(distribution.keys()):
@@ -21,7 +21,7 @@ import sys
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import AbstractSet, Dict, List, Tuple, Optional
 
 import numpy as np
 import requests
@@ -50,9 +50,11 @@ from src.backend.models.text_encoder import EncodeurTexte
 from src.backend.parsers.message_extractor import parser_sms_depuis_csv
 from src.backend.parsers.image_extractor import parser_images_depuis_csv
 from scripts.donnees_benchmark_opsemia import (
+    obtenir_ensembles_attendus,
     obtenir_requetes_messages,
     obtenir_requetes_images,
     obtenir_toutes_requetes,
+    precharger_embeddings,
 )
 
 
@@ -101,6 +103,9 @@ CHEMIN_OUTPUT_MD = racine_projet / "Docs Projet" / f"BENCHMARK_RESULTATS_{dateti
 # Base de données temporaire pour benchmark
 CHEMIN_DB_BENCHMARK = racine_projet / "data" / "benchmark_temp"
 
+# Nombre de résultats récupérés par requête lors de l'évaluation
+NB_RESULTATS_EVALUATION = 10
+
 # Clé API DeepInfra
 DEEPINFRA_API_KEY = os.getenv("DEEPINFRA_TOKEN")
 
@@ -114,40 +119,54 @@ def calculer_similarite_cosine(vec1: np.ndarray, vec2: np.ndarray) -> float:
     return float(np.dot(vec1, vec2))
 
 
-def precision_at_k(resultats_ids: List[str], pertinents_ids: List[str], k: int) -> float:
-    """Calcule la Precision@K."""
-    if k == 0:
-        return 0.0
-    top_k = resultats_ids[:k]
-    nb_pertinents = len([doc_id for doc_id in top_k if doc_id in pertinents_ids])
-    return nb_pertinents / k
-
-
-def recall_at_k(resultats_ids: List[str], pertinents_ids: List[str], k: int) -> float:
-    """Calcule le Recall@K."""
-    if len(pertinents_ids) == 0:
-        return 0.0
-    top_k = resultats_ids[:k]
-    nb_pertinents = len([doc_id for doc_id in top_k if doc_id in pertinents_ids])
-    return nb_pertinents / len(pertinents_ids)
-
-
-def mean_reciprocal_rank(resultats_ids: List[str], pertinents_ids: List[str]) -> float:
-    """Calcule le Mean Reciprocal Rank (MRR)."""
-    for i, doc_id in enumerate(resultats_ids, 1):
-        if doc_id in pertinents_ids:
-            return 1.0 / i
-    return 0.0
+def calculer_metriques_lot(pertinence: np.ndarray, nb_attendus: np.ndarray, k: int) -> Dict[str, np.ndarray]:
+    """Calcule les métriques de toutes les requêtes en une seule passe NumPy.
+    
+    Args:
+        pertinence: Matrice booléenne (requêtes × rangs), True si le résultat
+            à ce rang fait partie des IDs attendus (complétée par False)
+        nb_attendus: Nombre d'IDs attendus par requête
+        k: Nombre de premiers résultats à considérer (généralement TOP_K_BENCHMARK)
+        
+    Returns:
+        Dictionnaire métrique -> vecteur des valeurs par requête
+        (precision@1, precision@3, precision@k, recall@k, mrr, reussites)
+    """
+    nb_requetes, nb_rangs = pertinence.shape
+    # cumul[:, j] = nombre de résultats pertinents dans le top j
+    cumul = np.zeros((nb_requetes, nb_rangs + 1))
+    cumul[:, 1:] = np.cumsum(pertinence, axis=1)
+    
+    def pertinents_top(n: int) -> np.ndarray:
+        return cumul[:, min(n, nb_rangs)]
+    
+    # MRR : inverse du rang du premier résultat pertinent (0 si aucun)
+    premier_rang = pertinence.argmax(axis=1) + 1
+    mrr = np.where(pertinence.any(axis=1), 1.0 / premier_rang, 0.0)
+    
+    recall = np.divide(
+        pertinents_top(k), nb_attendus,
+        out=np.zeros(nb_requetes), where=nb_attendus > 0,
+    )
+    
+    return {
+        "precision@1": pertinents_top(1) / 1,
+        "precision@3": pertinents_top(3) / 3,
+        f"precision@{k}": pertinents_top(k) / k if k > 0 else np.zeros(nb_requetes),
+        f"recall@{k}": recall,
+        "mrr": mrr,
+        "reussites": (pertinents_top(k) > 0).astype(float),
+    }
 
 
-def est_recherche_reussie(resultats_ids: List[str], pertinents_ids: List[str], k: int) -> bool:
+def est_recherche_reussie(resultats_ids: List[str], pertinents_ids: AbstractSet[str], k: int) -> bool:
     """Détermine si une recherche est réussie.
     
     Une recherche est réussie si au moins 1 document pertinent est dans le top K.
     
     Args:
         resultats_ids: Liste des IDs des résultats retournés
-        pertinents_ids: Liste des IDs des documents pertinents attendus
+        pertinents_ids: Ensemble des IDs des documents pertinents attendus
         k: Nombre de premiers résultats à considérer (généralement TOP_K_BENCHMARK)
         
     Returns:
@@ -616,35 +635,25 @@ def evaluer_modele_benchmark(modele_info: Dict, nom_collection: str) -> Dict:
     """
     print(f"\n🎯 Évaluation {modele_info['nom']} sur 100 requêtes...")
     
-    # Charger encodeur
-    if modele_info['local']:
-        try:
-            encodeur = SentenceTransformer(modele_info['id'], trust_remote_code=True)
-        except:
-            encodeur = SentenceTransformer(modele_info['id'])
-    else:
-        encodeur = None  # API
+    def encoder_requetes(textes: List[str]) -> np.ndarray:
+        """Encode les requêtes absentes du cache (modèle chargé à la demande)."""
+        if modele_info['local']:
+            try:
+                encodeur = SentenceTransformer(modele_info['id'], trust_remote_code=True)
+            except:
+                encodeur = SentenceTransformer(modele_info['id'])
+            return encodeur.encode(textes, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+        return np.array(encoder_texte_via_api(textes, modele_info['id']))
     
     # Base vectorielle
     db = BaseVectorielle(chemin_persistance=CHEMIN_DB_BENCHMARK)
     
-    # Métriques
-    metriques = {
-        "precision@1": [],
-        "precision@3": [],
-        f"precision@{TOP_K_BENCHMARK}": [],
-        f"recall@{TOP_K_BENCHMARK}": [],
-        "mrr": [],
-        "reussites": [],  # 1 si réussite, 0 sinon
-    }
-    
-    metriques_par_type = {
-        "message": {f"precision@{TOP_K_BENCHMARK}": [], f"recall@{TOP_K_BENCHMARK}": [], "mrr": [], "reussites": []},
-        "image": {f"precision@{TOP_K_BENCHMARK}": [], f"recall@{TOP_K_BENCHMARK}": [], "mrr": [], "reussites": []},
-    }
-    
-    # Récupérer toutes les requêtes
+    # Récupérer toutes les requêtes (et leurs IDs attendus en frozenset)
     requetes = obtenir_toutes_requetes()
+    ensembles_attendus = obtenir_ensembles_attendus()
+    
+    # Encoder toutes les requêtes en un lot (cache mémoire puis disque)
+    embeddings_requetes = precharger_embeddings(modele_info['id'], encoder_requetes)
     
     # Vérifier le nombre de documents dans la collection
     nb_docs = db.compter_documents(nom_collection)
@@ -653,6 +662,10 @@ def evaluer_modele_benchmark(modele_info: Dict, nom_collection: str) -> Dict:
     
     debut_eval = time.time()
     requetes_traitees = 0
+    nb_reussites = 0
+    lignes_pertinence: List[List[bool]] = []
+    nb_attendus: List[int] = []
+    types_requetes: List[str] = []
     
     # Logs de debug pour les premières requêtes
     debug_logs_affiches = 0
@@ -662,18 +675,14 @@ def evaluer_modele_benchmark(modele_info: Dict, nom_collection: str) -> Dict:
         if "[REQUETE_A_COMPLETER]" in requete:
             continue
         
-        # Encoder requête
-        if encodeur:
-            emb_req = encodeur.encode([requete], normalize_embeddings=True, show_progress_bar=False)[0]
-        else:
-            emb_brut = encoder_texte_via_api([requete], modele_info['id'])[0]
-            emb_req = np.array(emb_brut)
+        emb_req = embeddings_requetes[i - 1]
+        pertinents = ensembles_attendus[i - 1]
         
         # Rechercher
         resultats = db.rechercher(
             nom_collection=nom_collection,
             embedding_requete=emb_req.tolist(),
-            nombre_resultats=10,
+            nombre_resultats=NB_RESULTATS_EVALUATION,
             methode="KNN",
         )
         
@@ -687,29 +696,16 @@ def evaluer_modele_benchmark(modele_info: Dict, nom_collection: str) -> Dict:
             print(f"      IDs attendus: {ids_attendus[:3]}")
             print(f"      IDs obtenus: {ids_resultats[:5]}")
             # Vérifier si au moins 1 ID attendu est dans les résultats
-            trouve = any(id_att in ids_resultats[:TOP_K_BENCHMARK] for id_att in ids_attendus)
+            trouve = est_recherche_reussie(ids_resultats, pertinents, TOP_K_BENCHMARK)
             print(f"      ✅ TROUVÉ dans top {TOP_K_BENCHMARK}" if trouve else f"      ❌ PAS TROUVÉ dans top {TOP_K_BENCHMARK}")
             debug_logs_affiches += 1
         
-        # Calculer métriques
-        p1 = precision_at_k(ids_resultats, ids_attendus, 1)
-        p3 = precision_at_k(ids_resultats, ids_attendus, 3)
-        pk = precision_at_k(ids_resultats, ids_attendus, TOP_K_BENCHMARK)
-        rk = recall_at_k(ids_resultats, ids_attendus, TOP_K_BENCHMARK)
-        mrr = mean_reciprocal_rank(ids_resultats, ids_attendus)
-        reussite = 1.0 if est_recherche_reussie(ids_resultats, ids_attendus, TOP_K_BENCHMARK) else 0.0
-        
-        metriques["precision@1"].append(p1)
-        metriques["precision@3"].append(p3)
-        metriques[f"precision@{TOP_K_BENCHMARK}"].append(pk)
-        metriques[f"recall@{TOP_K_BENCHMARK}"].append(rk)
-        metriques["mrr"].append(mrr)
-        metriques["reussites"].append(reussite)
-        
-        metriques_par_type[type_req][f"precision@{TOP_K_BENCHMARK}"].append(pk)
-        metriques_par_type[type_req][f"recall@{TOP_K_BENCHMARK}"].append(rk)
-        metriques_par_type[type_req]["mrr"].append(mrr)
-        metriques_par_type[type_req]["reussites"].append(reussite)
+        # Pertinence de chaque rang (les métriques sont calculées en lot ensuite)
+        ligne = [doc_id in pertinents for doc_id in ids_resultats[:NB_RESULTATS_EVALUATION]]
+        lignes_pertinence.append(ligne + [False] * (NB_RESULTATS_EVALUATION - len(ligne)))
+        nb_attendus.append(len(pertinents))
+        types_requetes.append(type_req)
+        nb_reussites += est_recherche_reussie(ids_resultats, pertinents, TOP_K_BENCHMARK)
         
         requetes_traitees += 1
         
@@ -718,12 +714,28 @@ def evaluer_modele_benchmark(modele_info: Dict, nom_collection: str) -> Dict:
             temps_par_requete = temps_ecoule / requetes_traitees
             requetes_restantes = len(requetes) - i
             temps_restant = temps_par_requete * requetes_restantes
-            taux_reussite_actuel = np.mean(metriques["reussites"]) * 100
+            taux_reussite_actuel = nb_reussites / requetes_traitees * 100
             
             print(f"   [{i}/{len(requetes)}] {(i/len(requetes)*100):.1f}% - "
                   f"Taux réussite: {taux_reussite_actuel:.1f}% - "
                   f"Écoulé: {temps_ecoule:.1f}s - Restant: {temps_restant:.1f}s")
     
+    # Calculer toutes les métriques en une passe vectorisée
+    pertinence = np.array(lignes_pertinence, dtype=bool).reshape(-1, NB_RESULTATS_EVALUATION)
+    metriques = calculer_metriques_lot(pertinence, np.array(nb_attendus), TOP_K_BENCHMARK)
+    types_requetes = np.array(types_requetes)
+    
+    def moyennes_par_type(type_req: str) -> Dict[str, float]:
+        masque = types_requetes == type_req
+        if not masque.any():
+            return {f"precision@{TOP_K_BENCHMARK}": 0, f"recall@{TOP_K_BENCHMARK}": 0, "mrr": 0, "taux_reussite": 0}
+        return {
+            f"precision@{TOP_K_BENCHMARK}": np.mean(metriques[f"precision@{TOP_K_BENCHMARK}"][masque]),
+            f"recall@{TOP_K_BENCHMARK}": np.mean(metriques[f"recall@{TOP_K_BENCHMARK}"][masque]),
+            "mrr": np.mean(metriques["mrr"][masque]),
+            "taux_reussite": np.mean(metriques["reussites"][masque]) * 100,
+        }
+    
     # Calculer moyennes
     taux_reussite = np.mean(metriques["reussites"]) * 100  # Score sur 100
     
@@ -741,18 +753,8 @@ def evaluer_modele_benchmark(modele_info: Dict, nom_collection: str) -> Dict:
         "mrr": np.mean(metriques["mrr"]),
         "taux_reussite": taux_reussite,  # Pourcentage de requêtes réussies
         "par_type": {
-            "message": {
-                f"precision@{TOP_K_BENCHMARK}": np.mean(metriques_par_type["message"][f"precision@{TOP_K_BENCHMARK}"]) if metriques_par_type["message"][f"precision@{TOP_K_BENCHMARK}"] else 0,
-                f"recall@{TOP_K_BENCHMARK}": np.mean(metriques_par_type["message"][f"recall@{TOP_K_BENCHMARK}"]) if metriques_par_type["message"][f"recall@{TOP_K_BENCHMARK}"] else 0,
-                "mrr": np.mean(metriques_par_type["message"]["mrr"]) if metriques_par_type["message"]["mrr"] else 0,
-                "taux_reussite": np.mean(metriques_par_type["message"]["reussites"]) * 100 if metriques_par_type["message"]["reussites"] else 0,
-            },
-            "image": {
-                f"precision@{TOP_K_BENCHMARK}": np.mean(metriques_par_type["image"][f"precision@{TOP_K_BENCHMARK}"]) if metriques_par_type["image"][f"precision@{TOP_K_BENCHMARK}"] else 0,
-                f"recall@{TOP_K_BENCHMARK}": np.mean(metriques_par_type["image"][f"recall@{TOP_K_BENCHMARK}"]) if metriques_par_type["image"][f"recall@{TOP_K_BENCHMARK}"] else 0,
-                "mrr": np.mean(metriques_par_type["image"]["mrr"]) if metriques_par_type["image"]["mrr"] else 0,
-                "taux_reussite": np.mean(metriques_par_type["image"]["reussites"]) * 100 if metriques_par_type["image"]["reussites"] else 0,
-            },
+            "message": moyennes_par_type("message"),
+            "image": moyennes_par_type("image"),
         },
     }
     
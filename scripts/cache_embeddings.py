@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Cache disque des embeddings de requêtes de benchmark.
+
+Les 100 requêtes du benchmark sont fixes : les réencoder à chaque exécution
+coûte un passage complet dans le modèle (voire un appel API pour Qwen3).
+Ce module conserve les embeddings déjà calculés dans
+data/embedding_cache/{modèle}.npz, indexés par le SHA-256 du texte.
+
+Les vecteurs sont stockés en float16 (moitié moins de place, écart
+négligeable pour la similarité cosinus) et remis en float32 au chargement.
+
+Utilisation:
+    from scripts.cache_embeddings import encoder_avec_cache
+
+    embeddings = encoder_avec_cache(
+        "BAAI/bge-m3",
+        requetes,
+        lambda textes: modele.encode(textes, batch_size=32, normalize_embeddings=True),
+    )
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+racine_projet = Path(__file__).resolve().parents[1]
+DOSSIER_CACHE_EMBEDDINGS = racine_projet / "data" / "embedding_cache"
+
+
+def _slug_modele(id_modele: str) -> str:
+    """Transforme un ID de modèle HF en nom de fichier sûr."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", id_modele)
+
+
+def _hash_texte(texte: str) -> str:
+    """Retourne l'empreinte SHA-256 d'un texte."""
+    return hashlib.sha256(texte.encode("utf-8")).hexdigest()
+
+
+def chemin_cache(id_modele: str) -> Path:
+    """Retourne le chemin du fichier de cache pour un modèle."""
+    return DOSSIER_CACHE_EMBEDDINGS / f"{_slug_modele(id_modele)}.npz"
+
+
+def _charger_cache(chemin: Path) -> Tuple[Dict[str, int], np.ndarray]:
+    """Charge le cache d'un modèle (index hash -> ligne, matrice float32)."""
+    if not chemin.exists():
+        return {}, np.empty((0, 0), dtype=np.float32)
+
+    with np.load(chemin, allow_pickle=False) as donnees:
+        hashes = donnees["hashes"].tolist()
+        matrice = donnees["embeddings"].astype(np.float32)
+    return {h: i for i, h in enumerate(hashes)}, matrice
+
+
+def _sauvegarder_cache(chemin: Path, index: Dict[str, int], matrice: np.ndarray) -> None:
+    """Écrit le cache en float16, de façon atomique (fichier temporaire + os.replace)."""
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    hashes = np.array(sorted(index, key=index.get))
+
+    descripteur, chemin_tmp = tempfile.mkstemp(dir=chemin.parent, suffix=".npz")
+    try:
+        with os.fdopen(descripteur, "wb") as f:
+            np.savez(f, hashes=hashes, embeddings=matrice.astype(np.float16))
+        os.replace(chemin_tmp, chemin)
+    except BaseException:
+        Path(chemin_tmp).unlink(missing_ok=True)
+        raise
+
+
+def encoder_avec_cache(
+    id_modele: str,
+    textes: Sequence[str],
+    encoder: Callable[[List[str]], np.ndarray],
+) -> np.ndarray:
+    """Encode des textes en réutilisant les embeddings déjà présents sur disque.
+
+    Seuls les textes absents du cache sont passés à ``encoder`` (en un seul
+    appel), puis ajoutés au fichier de cache du modèle.
+
+    Args:
+        id_modele: ID du modèle (détermine le fichier de cache)
+        textes: Textes à encoder
+        encoder: Fonction d'encodage batchée (liste de textes -> matrice)
+
+    Returns:
+        Matrice float32 (len(textes), dimensions), dans l'ordre de ``textes``
+    """
+    chemin = chemin_cache(id_modele)
+    index, matrice = _charger_cache(chemin)
+
+    # Un seul hash par texte distinct : les requêtes répétées sont
+    # dédupliquées avant tout calcul de SHA-256
+    hash_par_texte = {texte: _hash_texte(texte) for texte in dict.fromkeys(textes)}
+    hashes = [hash_par_texte[texte] for texte in textes]
+
+    # Textes manquants (ordre d'apparition conservé)
+    manquants: Dict[str, str] = {
+        h: texte for texte, h in hash_par_texte.items() if h not in index
+    }
+
+    if manquants:
+        # Arrondi float16 dès maintenant : résultats identiques d'une exécution
+        # à l'autre, que l'embedding vienne du modèle ou du disque
+        nouveaux = np.asarray(encoder(list(manquants.values())), dtype=np.float16).astype(np.float32)
+        if matrice.size == 0:
+            matrice = nouveaux
+        else:
+            matrice = np.vstack([matrice, nouveaux])
+        for h in manquants:
+            index[h] = len(index)
+        _sauvegarder_cache(chemin, index, matrice)
+
+    return matrice[[index[h] for h in hashes]]
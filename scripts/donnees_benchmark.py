@@ -13,6 +13,7 @@ Les requêtes couvrent différents aspects:
 - Dates et horaires précis
 """
 
+from collections import Counter
 from typing import Dict, List, Tuple
 
 
@@ -259,13 +260,10 @@ def afficher_statistiques_dataset():
         print(f"  - {diff.capitalize()}: {count} requêtes")
     
     # Statistiques par thème
-    themes = {}
-    for doc in DOCUMENTS_TEST:
-        for theme in doc["themes"]:
-            themes[theme] = themes.get(theme, 0) + 1
+    themes = Counter(theme for doc in DOCUMENTS_TEST for theme in doc["themes"])
     
     print("\nThèmes couverts:")
-    for theme, count in sorted(themes.items(), key=lambda x: x[1], reverse=True):
+    for theme, count in themes.most_common():
         print(f"  - {theme}: {count} documents")
     
     print("=" * 70)
@@ -14,7 +14,16 @@ Les requêtes couvrent différents aspects :
 - Recherche d'images (descriptions visuelles)
 """
 
-from typing import Dict, List, Tuple
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+import numpy as np
+
+
+# Format figé d'une requête: (requête, IDs attendus, difficulté)
+Requete = Tuple[str, Tuple[str, ...], str]
 
 
 # Requêtes pour MESSAGES (90 requêtes)
@@ -175,33 +184,124 @@ REQUETES_IMAGES: List[Tuple[str, List[str], str]] = [
 ]
 
 
-def obtenir_requetes_messages() -> List[Tuple[str, List[str], str]]:
-    """Retourne la liste des 90 requêtes pour messages."""
+def _figer(requetes: List[Tuple[str, List[str], str]]) -> Tuple[Requete, ...]:
+    """Convertit une liste de requêtes en tuples immuables (IDs compris).
+
+    Les textes sont internés : les requêtes identiques (ex. "Billets d'argent"
+    côté images) partagent un même objet, ce qui profite aux caches indexés
+    par texte.
+    """
+    return tuple(
+        (sys.intern(requete), tuple(sys.intern(i) for i in ids), sys.intern(diff))
+        for requete, ids, diff in requetes
+    )
+
+
+# Les constantes sont figées au chargement du module : les getters ci-dessous
+# renvoient des objets partagés qui ne doivent pas être modifiés par l'appelant.
+REQUETES_MESSAGES = _figer(REQUETES_MESSAGES)
+REQUETES_IMAGES = _figer(REQUETES_IMAGES)
+
+
+def _construire_index_inverse() -> Dict[str, Tuple[Tuple[int, int], ...]]:
+    """Construit l'index inverse ID attendu -> ((indice requête, rang), ...).
+
+    Les indices suivent l'ordre de obtenir_toutes_requetes() (messages puis
+    images), le rang est la position de l'ID dans la liste des IDs attendus.
+    """
+    index: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    for indice_requete, (_, ids, _) in enumerate(REQUETES_MESSAGES + REQUETES_IMAGES):
+        for rang, doc_id in enumerate(ids):
+            index[doc_id].append((indice_requete, rang))
+    return {doc_id: tuple(positions) for doc_id, positions in index.items()}
+
+
+INDEX_INVERSE = _construire_index_inverse()
+
+# IDs attendus sous forme d'ensembles (test d'appartenance O(1) pour les
+# métriques), alignés sur l'ordre de obtenir_toutes_requetes()
+ENSEMBLES_ATTENDUS: Tuple[FrozenSet[str], ...] = tuple(
+    frozenset(ids) for _, ids, _ in REQUETES_MESSAGES + REQUETES_IMAGES
+)
+
+
+@lru_cache(maxsize=1)
+def obtenir_requetes_messages() -> Tuple[Requete, ...]:
+    """Retourne les 90 requêtes pour messages (tuple partagé, ne pas modifier)."""
     return REQUETES_MESSAGES
 
 
-def obtenir_requetes_images() -> List[Tuple[str, List[str], str]]:
-    """Retourne la liste des 10 requêtes pour images."""
+@lru_cache(maxsize=1)
+def obtenir_requetes_images() -> Tuple[Requete, ...]:
+    """Retourne les 10 requêtes pour images (tuple partagé, ne pas modifier)."""
     return REQUETES_IMAGES
 
 
-def obtenir_toutes_requetes() -> List[Tuple[str, List[str], str, str]]:
+@lru_cache(maxsize=1)
+def obtenir_toutes_requetes() -> Tuple[Tuple[str, Tuple[str, ...], str, str], ...]:
     """Retourne toutes les 100 requêtes (messages + images) avec type.
     
+    Le résultat est construit une seule fois par processus puis mis en cache :
+    l'appelant ne doit pas le modifier.
+    
     Returns:
-        Liste de tuples (requête, IDs attendus, difficulté, type)
+        Tuple de tuples (requête, IDs attendus, difficulté, type)
     """
-    requetes_completes = []
+    return tuple(
+        [(requete, ids, diff, "message") for requete, ids, diff in REQUETES_MESSAGES]
+        + [(requete, ids, diff, "image") for requete, ids, diff in REQUETES_IMAGES]
+    )
+
+
+def obtenir_index_inverse() -> Dict[str, Tuple[Tuple[int, int], ...]]:
+    """Retourne l'index inverse des IDs attendus (dict partagé, ne pas modifier).
     
-    # Ajouter les requêtes messages
-    for requete, ids, diff in REQUETES_MESSAGES:
-        requetes_completes.append((requete, ids, diff, "message"))
+    Permet de savoir en O(1) pour quelles requêtes un document est attendu,
+    sans parcourir toutes les requêtes.
     
-    # Ajouter les requêtes images
-    for requete, ids, diff in REQUETES_IMAGES:
-        requetes_completes.append((requete, ids, diff, "image"))
+    Returns:
+        Dictionnaire ID -> tuple de (indice requête, rang dans les IDs attendus)
+    """
+    return INDEX_INVERSE
+
+
+def obtenir_ensembles_attendus() -> Tuple[FrozenSet[str], ...]:
+    """Retourne les IDs attendus de chaque requête sous forme de frozenset.
     
-    return requetes_completes
+    Même ordre que obtenir_toutes_requetes() ; l'ordre des IDs (rang) reste
+    disponible dans les tuples des requêtes.
+    """
+    return ENSEMBLES_ATTENDUS
+
+
+# Embeddings des 100 requêtes par ID de modèle, calculés une fois par processus
+_EMBEDDINGS_REQUETES: Dict[str, np.ndarray] = {}
+
+
+def precharger_embeddings(
+    id_modele: str,
+    encoder: Callable[[List[str]], np.ndarray],
+) -> np.ndarray:
+    """Retourne la matrice (100, D) des embeddings de toutes les requêtes.
+    
+    Le premier appel pour un modèle passe par le cache disque
+    (scripts/cache_embeddings.py) ; les suivants renvoient la matrice gardée
+    en mémoire, sans aucun encodage.
+    
+    Args:
+        id_modele: ID du modèle d'embedding
+        encoder: Fonction d'encodage batchée, appelée seulement pour les
+            requêtes absentes du cache disque
+    
+    Returns:
+        Matrice float32 alignée sur obtenir_toutes_requetes() (ne pas modifier)
+    """
+    if id_modele not in _EMBEDDINGS_REQUETES:
+        from scripts.cache_embeddings import encoder_avec_cache
+
+        textes = [requete for requete, _, _, _ in obtenir_toutes_requetes()]
+        _EMBEDDINGS_REQUETES[id_modele] = encoder_avec_cache(id_modele, textes, encoder)
+    return _EMBEDDINGS_REQUETES[id_modele]
 
 
 def afficher_statistiques_dataset():
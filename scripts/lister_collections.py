@@ -1,6 +1,7 @@
 """Script pour lister toutes les collections disponibles."""
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Ajouter le répertoire racine au path
@@ -10,6 +11,17 @@ sys.path.insert(0, str(racine_projet))
 from config.settings import obtenir_parametres
 from src.backend.database.vector_db import BaseVectorielle
 
+
+def _sonder_collection(col):
+    """Récupère le nombre de documents et un échantillon de métadonnées."""
+    try:
+        echantillon = col.get(limit=2, include=["metadatas"])
+        erreur = None
+    except Exception as e:
+        echantillon, erreur = None, e
+    return col.name, col.count(), echantillon, erreur
+
+
 # Initialiser
 parametres = obtenir_parametres()
 db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
@@ -22,26 +34,25 @@ collections = db.client.list_collections()
 if not collections:
     print("Aucune collection trouvée.")
 else:
-    for col in collections:
-        nom = col.name
-        nb_docs = col.count()
+    # Lectures SQLite parallélisées (le client ChromaDB relâche le GIL)
+    with ThreadPoolExecutor(max_workers=min(16, len(collections))) as executeur:
+        sondages = list(executeur.map(_sonder_collection, collections))
+    
+    for nom, nb_docs, resultats, erreur in sondages:
         print(f"📁 {nom}")
         print(f"   Documents: {nb_docs}")
         
         # Afficher un échantillon de métadonnées
-        try:
-            resultats = col.get(limit=2, include=["metadatas"])
-            
-            if resultats["metadatas"]:
-                print(f"   Métadonnées échantillon:")
-                meta = resultats["metadatas"][0]
-                for cle in sorted(meta.keys()):
-                    valeur = meta[cle]
-                    if isinstance(valeur, str) and len(valeur) > 50:
-                        valeur = valeur[:50] + "..."
-                    print(f"      • {cle}: {valeur}")
-        except Exception as e:
-            print(f"   ⚠️ Erreur lecture métadonnées: {e}")
+        if erreur is not None:
+            print(f"   ⚠️ Erreur lecture métadonnées: {erreur}")
+        elif resultats["metadatas"]:
+            print(f"   Métadonnées échantillon:")
+            meta = resultats["metadatas"][0]
+            for cle in sorted(meta.keys()):
+                valeur = meta[cle]
+                if isinstance(valeur, str) and len(valeur) > 50:
+                    valeur = valeur[:50] + "..."
+                print(f"      • {cle}: {valeur}")
         
         print()
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Script de migration : ajoute "proprietaire" et "interlocuteur" aux messages indexés.
+
+Les collections indexées avant l'ajout de ces métadonnées obligent les routes
+de conversation à recalculer l'interlocuteur de chaque message à chaque
+requête. Ce script les calcule une fois et met à jour les métadonnées en place
+(sans réencoder ni toucher aux embeddings).
+
+Usage:
+    python migrer_interlocuteur.py [collection ...]
+
+Sans argument, toutes les collections de messages sont migrées.
+"""
+
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au path
+racine_projet = Path(__file__).resolve().parents[1]
+if str(racine_projet) not in sys.path:
+    sys.path.insert(0, str(racine_projet))
+
+from config.settings import obtenir_parametres
+from src.backend.core.conversations import detecter_proprietaire, identifier_interlocuteur
+from src.backend.database.resumes_conversations import supprimer_resumes
+from src.backend.database.vector_db import BaseVectorielle, parcourir_collection
+
+# Nombre de métadonnées lues et envoyées par appel à collection.get() / update()
+TAILLE_LOT_MISE_A_JOUR = 5000
+
+
+def migrer_collection(db: BaseVectorielle, nom_collection: str) -> int:
+    """Ajoute propriétaire et interlocuteur aux messages d'une collection.
+
+    Args:
+        db: Instance de BaseVectorielle
+        nom_collection: Nom de la collection de messages
+
+    Returns:
+        Nombre de messages mis à jour
+    """
+    print(f"\n📦 Collection: {nom_collection}")
+    collection = db.client.get_collection(name=nom_collection)
+
+    nombre = collection.count()
+    print(f"   📊 {nombre} messages trouvés")
+
+    if nombre == 0:
+        print("   ✓ Collection vide, rien à migrer")
+        return 0
+
+    # Deux passages par lots (détection du propriétaire, puis mise à jour) :
+    # les métadonnées de toute la collection ne sont jamais en mémoire ensemble
+    proprietaire = detecter_proprietaire(
+        metadata
+        for page in parcourir_collection(collection, ["metadatas"], taille_page=TAILLE_LOT_MISE_A_JOUR)
+        for metadata in page["metadatas"] or []
+    )
+    print(f"   📱 Propriétaire détecté: {proprietaire}")
+
+    # La mise à jour des métadonnées ne change pas l'ordre de lecture
+    migres = 0
+    for page in parcourir_collection(collection, ["metadatas"], taille_page=TAILLE_LOT_MISE_A_JOUR):
+        nouvelles_metadatas = [
+            {
+                **metadata,
+                "proprietaire": proprietaire or "",
+                "interlocuteur": identifier_interlocuteur(metadata, proprietaire),
+            }
+            for metadata in page["metadatas"] or [{}] * len(page["ids"])
+        ]
+        collection.update(ids=page["ids"], metadatas=nouvelles_metadatas)
+        migres += len(page["ids"])
+
+    # Interlocuteurs recalculés : les résumés enregistrés (même nombre de
+    # messages) seront reconstruits par la prochaine requête
+    supprimer_resumes(db.chemin_persistance, nom_collection)
+
+    print(f"   ✅ {migres} messages migrés")
+    return migres
+
+
+def main():
+    """Fonction principale."""
+    print("=" * 70)
+    print("MIGRATION : INTERLOCUTEUR DANS LES MÉTADONNÉES")
+    print("=" * 70)
+
+    parametres = obtenir_parametres()
+    db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+
+    noms_collections = sys.argv[1:]
+    if not noms_collections:
+        # Collections de messages : "messages", "messages_cas1", ...
+        # ("message_chunks" et "images" ne sont pas concernées)
+        noms_collections = [
+            col.name for col in db.client.list_collections()
+            if col.name == parametres.NOM_COLLECTION_MESSAGES
+            or col.name.startswith(parametres.NOM_COLLECTION_MESSAGES + "_")
+        ]
+
+    print(f"\n🔍 {len(noms_collections)} collection(s) à migrer")
+
+    total = 0
+    for nom_collection in noms_collections:
+        try:
+            total += migrer_collection(db, nom_collection)
+        except Exception as e:
+            print(f"   ❌ Erreur: {e}")
+
+    print("\n" + "=" * 70)
+    print(f"✅ MIGRATION TERMINÉE ({total} messages)")
+    print("=" * 70)
+    print("\n💡 Redémarrez le serveur (ou attendez 60 s) pour vider le cache des conversations.")
+
+
+if __name__ == "__main__":
+    main()
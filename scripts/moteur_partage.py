@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Moteur de recherche partagé entre les scripts de test.
+
+Ouvrir la base ChromaDB et construire un MoteurRecherche (chargement du
+modèle d'embedding, ouverture du fichier SQLite, index HNSW) prend plusieurs
+secondes. Les scripts de test passent par ``obtenir_moteur()`` : la base et
+le moteur sont construits une seule fois par processus, puis réutilisés.
+
+Utilisation:
+    from scripts.moteur_partage import obtenir_moteur
+
+    moteur = obtenir_moteur()
+    db = moteur.db
+"""
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# Ajouter le répertoire racine au path
+racine_projet = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(racine_projet))
+
+from config.settings import obtenir_parametres
+from src.backend.core.search_engine import MoteurRecherche
+from src.backend.database.vector_db import BaseVectorielle
+
+
+@lru_cache(maxsize=1)
+def obtenir_moteur() -> MoteurRecherche:
+    """Retourne le moteur de recherche du processus (construit au premier appel).
+
+    Returns:
+        MoteurRecherche branché sur la base ChromaDB configurée
+        (accessible via ``moteur.db``)
+    """
+    parametres = obtenir_parametres()
+    db = BaseVectorielle(chemin_persistance=parametres.CHEMIN_BASE_CHROMA)
+    return MoteurRecherche(base_vectorielle=db, parametres=parametres)
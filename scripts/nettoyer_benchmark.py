@@ -9,8 +9,9 @@ Usage:
     python nettoyer_benchmark.py [--force]
 """
 
-import shutil
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Ajouter le répertoire racine au path
@@ -20,6 +21,12 @@ sys.path.insert(0, str(racine_projet))
 CHEMIN_DB_BENCHMARK = racine_projet / "data" / "benchmark_temp"
 
 
+def _ecrire(lignes: list) -> None:
+    """Affiche un bloc de lignes en une seule écriture sur stdout."""
+    sys.stdout.write("\n".join(lignes) + "\n")
+    sys.stdout.flush()
+
+
 def obtenir_taille_dossier(chemin: Path) -> float:
     """Calcule la taille d'un dossier en MB.
     
@@ -32,14 +39,52 @@ def obtenir_taille_dossier(chemin: Path) -> float:
     if not chemin.exists():
         return 0.0
     
-    taille_bytes = sum(
-        f.stat().st_size 
-        for f in chemin.rglob('*') 
-        if f.is_file()
-    )
+    # os.scandir: DirEntry réutilise les infos de lecture du dossier,
+    # sans allouer un Path par fichier
+    taille_bytes = 0
+    pile = [str(chemin)]
+    while pile:
+        with os.scandir(pile.pop()) as entrees:
+            for entree in entrees:
+                if entree.is_dir(follow_symlinks=False):
+                    pile.append(entree.path)
+                elif entree.is_file(follow_symlinks=False):
+                    taille_bytes += entree.stat(follow_symlinks=False).st_size
     return taille_bytes / (1024 * 1024)
 
 
+def _supprimer_dossier_parallele(chemin: Path, workers: int = 8) -> None:
+    """Supprime récursivement un dossier en parallélisant les unlink.
+    
+    Les fichiers sont énumérés avec os.scandir puis supprimés par un pool de
+    threads ; les dossiers sont ensuite retirés du plus profond au plus haut.
+    
+    Args:
+        chemin: Dossier à supprimer
+        workers: Nombre de threads de suppression
+    """
+    fichiers = []
+    dossiers = []
+    pile = [str(chemin)]
+    while pile:
+        dossier = pile.pop()
+        dossiers.append(dossier)
+        with os.scandir(dossier) as entrees:
+            for entree in entrees:
+                if entree.is_dir(follow_symlinks=False):
+                    pile.append(entree.path)
+                else:
+                    fichiers.append(entree.path)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executeur:
+        # list() pour propager la première erreur éventuelle
+        list(executeur.map(os.unlink, fichiers))
+    
+    # Un dossier est toujours listé après son parent : ordre inverse = bottom-up
+    for dossier in reversed(dossiers):
+        os.rmdir(dossier)
+
+
 def lister_collections_temporaires() -> list:
     """Liste les collections temporaires du benchmark.
     
@@ -73,53 +118,62 @@ def nettoyer(force: bool = False):
     Args:
         force: Si True, supprime sans confirmation
     """
-    print("="*70)
-    print("NETTOYAGE DES FICHIERS TEMPORAIRES DU BENCHMARK")
-    print("="*70)
-    
     if not CHEMIN_DB_BENCHMARK.exists():
-        print("\n✅ Aucun fichier temporaire trouvé")
-        print(f"   Dossier inexistant: {CHEMIN_DB_BENCHMARK}")
+        _ecrire([
+            "=" * 70,
+            "NETTOYAGE DES FICHIERS TEMPORAIRES DU BENCHMARK",
+            "=" * 70,
+            "\n✅ Aucun fichier temporaire trouvé",
+            f"   Dossier inexistant: {CHEMIN_DB_BENCHMARK}",
+        ])
         return
     
     # Statistiques
     taille_mb = obtenir_taille_dossier(CHEMIN_DB_BENCHMARK)
     collections = lister_collections_temporaires()
     
-    print(f"\n📁 Dossier temporaire: {CHEMIN_DB_BENCHMARK}")
-    print(f"   Taille: {taille_mb:.2f} MB")
-    
+    lignes = [
+        "=" * 70,
+        "NETTOYAGE DES FICHIERS TEMPORAIRES DU BENCHMARK",
+        "=" * 70,
+        f"\n📁 Dossier temporaire: {CHEMIN_DB_BENCHMARK}",
+        f"   Taille: {taille_mb:.2f} MB",
+    ]
     if collections:
-        print(f"\n🗄️  Collections temporaires trouvées ({len(collections)}):")
-        for col in collections:
-            print(f"   - {col}")
+        lignes.append(f"\n🗄️  Collections temporaires trouvées ({len(collections)}):")
+        lignes.extend(f"   - {col}" for col in collections)
     else:
-        print(f"\n📦 Aucune collection ChromaDB détectée")
+        lignes.append(f"\n📦 Aucune collection ChromaDB détectée")
     
     # Confirmation
     if not force:
-        print("\n⚠️  Cette action va supprimer tous les fichiers temporaires du benchmark.")
+        lignes.append("\n⚠️  Cette action va supprimer tous les fichiers temporaires du benchmark.")
+        _ecrire(lignes)
         reponse = input("   Continuer? (oui/non): ").strip().lower()
         
         if reponse not in ['oui', 'o', 'yes', 'y']:
             print("\n❌ Annulation du nettoyage")
             return
+        lignes = []
     
     # Suppression
-    print("\n🗑️  Suppression des fichiers temporaires...")
+    lignes.append("\n🗑️  Suppression des fichiers temporaires...")
+    _ecrire(lignes)
     try:
-        shutil.rmtree(CHEMIN_DB_BENCHMARK)
-        print(f"   ✅ {taille_mb:.2f} MB libérés")
-        print(f"   ✅ {len(collections)} collection(s) supprimée(s)")
+        _supprimer_dossier_parallele(CHEMIN_DB_BENCHMARK)
     except Exception as e:
         print(f"   ❌ Erreur lors de la suppression: {e}")
         return
     
-    print("\n" + "="*70)
-    print("✅ NETTOYAGE TERMINÉ")
-    print("="*70)
-    print("\n💡 Les fichiers temporaires seront automatiquement recréés")
-    print("   lors de la prochaine exécution du benchmark.")
+    _ecrire([
+        f"   ✅ {taille_mb:.2f} MB libérés",
+        f"   ✅ {len(collections)} collection(s) supprimée(s)",
+        "\n" + "=" * 70,
+        "✅ NETTOYAGE TERMINÉ",
+        "=" * 70,
+        "\n💡 Les fichiers temporaires seront automatiquement recréés",
+        "   lors de la prochaine exécution du benchmark.",
+    ])
 
 
 def main():
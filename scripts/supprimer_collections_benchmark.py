@@ -14,13 +14,21 @@ CHEMIN_DB_BENCHMARK = racine_projet / "data" / "benchmark_temp"
 def main():
     db = BaseVectorielle(chemin_persistance=CHEMIN_DB_BENCHMARK)
     
-    collections = [col.name for col in db.client.list_collections() if col.name.startswith("benchmark_")]
+    toutes_collections = [col.name for col in db.client.list_collections()]
+    collections = [nom for nom in toutes_collections if nom.startswith("benchmark_")]
     
     print(f"🗑️  Suppression de {len(collections)} collection(s)...")
     
     for nom in collections:
         print(f"   - {nom}")
-        db.supprimer_collection(nom)
+    
+    if collections and len(collections) == len(toutes_collections):
+        # Base dédiée au benchmark : une seule remise à zéro plutôt qu'un
+        # démontage collection par collection (allow_reset=True dans BaseVectorielle)
+        db.client.reset()
+    else:
+        for nom in collections:
+            db.supprimer_collection(nom)
     
     print(f"✅ Suppression terminée")
 
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Téléchargement des dépôts de modèles Hugging Face pour les scripts telecharger_modele_*.
+
+Sans filtre, snapshot_download récupère tout le dépôt : exports ONNX,
+poids TensorFlow/Flax/Rust, et souvent les poids PyTorch en deux formats
+(plusieurs Go que ni SentenceTransformer ni transformers ne chargent).
+``telecharger_depot()`` ne télécharge qu'un seul format de poids PyTorch :
+safetensors s'il est publié, sinon pytorch_model.bin.
+
+Utilisation (après l'activation éventuelle de hf_transfer, qui doit
+précéder l'import de huggingface_hub):
+    from scripts.telechargement_hf import telecharger_depot
+
+    chemin_local = telecharger_depot("BAAI/bge-m3")
+"""
+
+from huggingface_hub import HfApi, snapshot_download
+
+# Fichiers jamais chargés par les scripts : exports ONNX et poids
+# TensorFlow (.h5), Flax (.msgpack) et Rust (.ot)
+FICHIERS_IGNORES = ["onnx/*", "*.onnx", "*.onnx_data", "*.h5", "*.msgpack", "*.ot"]
+
+
+def telecharger_depot(id_modele: str, max_workers: int = 8) -> str:
+    """Télécharge les fichiers utiles d'un dépôt de modèle (en parallèle).
+
+    Args:
+        id_modele: ID du dépôt Hugging Face
+        max_workers: Nombre de fichiers téléchargés simultanément
+
+    Returns:
+        Chemin local du dépôt dans le cache Hugging Face
+    """
+    fichiers_ignores = list(FICHIERS_IGNORES)
+    fichiers = HfApi().list_repo_files(id_modele)
+    if any(fichier.endswith(".safetensors") for fichier in fichiers):
+        # transformers charge safetensors en priorité : .bin serait un doublon
+        fichiers_ignores.append("pytorch_model*.bin")
+    return snapshot_download(
+        repo_id=id_modele, max_workers=max_workers, ignore_patterns=fichiers_ignores
+    )
@@ -8,8 +8,11 @@ ATTENTION: Ce modèle est volumineux (~8GB). Assurez-vous d'avoir suffisamment d
 et de mémoire GPU/RAM disponible.
 """
 
+import importlib.util
 import io
+import os
 import sys
+import time
 from pathlib import Path
 
 # Forcer UTF-8 pour la sortie console (nécessaire pour les emojis sur Windows)
@@ -22,7 +25,15 @@ if sys.stderr.encoding != 'utf-8':
 racine_projet = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(racine_projet))
 
+# Téléchargement Rust (hf_transfer) si installé ; doit être activé avant
+# l'import de huggingface_hub
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+import torch
 from sentence_transformers import SentenceTransformer
+from scripts.telechargement_hf import telecharger_depot
+from scripts.donnees_benchmark_opsemia import obtenir_requetes_messages
 
 
 def telecharger_modele_qwen3():
@@ -34,17 +45,31 @@ def telecharger_modele_qwen3():
     print("Cela peut prendre 10-30 minutes selon votre connexion...")
     
     try:
-        # Le téléchargement se fait automatiquement lors de l'instanciation
-        modele = SentenceTransformer(id_modele)
+        # BF16 sur GPU (poids deux fois plus légers), FP32 sur CPU
+        if torch.cuda.is_available():
+            options_modele = {"device": "cuda", "model_kwargs": {"torch_dtype": torch.bfloat16}}
+        else:
+            options_modele = {"device": "cpu"}
+        
+        # Téléchargement parallèle des fichiers utiles du dépôt (un seul
+        # format de poids, sans les exports ONNX/TensorFlow)
+        chemin_local = telecharger_depot(id_modele)
+        modele = SentenceTransformer(chemin_local, trust_remote_code=True, **options_modele)
         
-        # Test rapide pour vérifier que le modèle fonctionne
-        texte_test = "Test du modèle Qwen3-Embedding-8B"
-        embedding = modele.encode([texte_test], normalize_embeddings=True)
+        # Test de fonctionnement: encoder toutes les requêtes de benchmark
+        # en un seul appel batché (valide le modèle et préchauffe le tokenizer)
+        requetes = [requete for requete, _, _ in obtenir_requetes_messages()]
+        debut = time.perf_counter()
+        embedding = modele.encode(
+            requetes, batch_size=32, normalize_embeddings=True, convert_to_numpy=True
+        )
+        duree = time.perf_counter() - debut
         
         print(f"✅ Modèle téléchargé avec succès!")
         print(f"   - ID: {id_modele}")
         print(f"   - Dimensions: {modele.get_sentence_embedding_dimension()}")
         print(f"   - Test embedding: {embedding.shape}")
+        print(f"   - Débit: {len(requetes) / duree:.1f} requêtes/s ({duree:.2f}s pour {len(requetes)})")
         
     except Exception as e:
         print(f"❌ Erreur lors du téléchargement: {e}")
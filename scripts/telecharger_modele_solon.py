@@ -10,7 +10,9 @@ Les IDs possibles testés:
 - OrdalieTech/Solon-embeddings-large
 """
 
+import importlib.util
 import io
+import os
 import sys
 from pathlib import Path
 
@@ -24,8 +26,31 @@ if sys.stderr.encoding != 'utf-8':
 racine_projet = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(racine_projet))
 
+# Téléchargement Rust (hf_transfer) si installé ; doit être activé avant
+# l'import de huggingface_hub
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+from huggingface_hub import snapshot_download
+from huggingface_hub.utils import LocalEntryNotFoundError
 from sentence_transformers import SentenceTransformer
 
+from scripts.telechargement_hf import telecharger_depot
+
+
+def _chercher_dans_cache(ids_possibles: list) -> tuple:
+    """Cherche un des IDs dans le cache Hugging Face local, sans appel réseau.
+    
+    Returns:
+        (ID, chemin local) du premier modèle déjà en cache, sinon (None, None)
+    """
+    for id_modele in ids_possibles:
+        try:
+            return id_modele, snapshot_download(repo_id=id_modele, local_files_only=True)
+        except (LocalEntryNotFoundError, ValueError):
+            continue
+    return None, None
+
 
 def telecharger_modele_solon():
     """Télécharge et met en cache le modèle Solon-embeddings-large."""
@@ -36,12 +61,23 @@ def telecharger_modele_solon():
         "Solon-embeddings-large-0.1",
     ]
     
+    # Modèle déjà en cache : chargement local, sans requête vers le Hub
+    id_en_cache, chemin_en_cache = _chercher_dans_cache(ids_possibles)
+    if id_en_cache:
+        print(f"\n♻️  Modèle déjà présent dans le cache: {id_en_cache}")
+        ids_possibles = [id_en_cache]
+    
     for id_modele in ids_possibles:
         print(f"\n🔍 Tentative avec: {id_modele}...")
         
         try:
-            # Le téléchargement se fait automatiquement lors de l'instanciation
-            modele = SentenceTransformer(id_modele, trust_remote_code=True)
+            if id_modele == id_en_cache:
+                chemin_local = chemin_en_cache
+            else:
+                # Téléchargement parallèle des fichiers utiles du dépôt (un seul
+                # format de poids, sans les exports ONNX/TensorFlow)
+                chemin_local = telecharger_depot(id_modele)
+            modele = SentenceTransformer(chemin_local, trust_remote_code=True)
             
             # Test rapide pour vérifier que le modèle fonctionne
             texte_test = "Test du modèle Solon-embeddings-large"
@@ -9,7 +9,9 @@ Ces modèles sont utilisés pour générer des descriptions textuelles des image
 avant de les encoder avec le modèle d'embedding.
 """
 
+import importlib.util
 import io
+import os
 import sys
 from pathlib import Path
 
@@ -23,6 +25,11 @@ if sys.stderr.encoding != 'utf-8':
 racine_projet = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(racine_projet))
 
+# Téléchargement Rust (hf_transfer) si installé ; doit être activé avant
+# l'import de huggingface_hub
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from transformers import (
     BlipForConditionalGeneration,
     BlipProcessor,
@@ -30,6 +37,8 @@ from transformers import (
     MarianTokenizer,
 )
 
+from scripts.telechargement_hf import telecharger_depot
+
 
 def telecharger_modeles_vision():
     """Télécharge et met en cache les modèles de vision."""
@@ -45,12 +54,9 @@ def telecharger_modeles_vision():
     
     try:
         print("\n   Téléchargement en cours...")
-        processor_blip = BlipProcessor.from_pretrained(
-            "Salesforce/blip-image-captioning-base"
-        )
-        modele_blip = BlipForConditionalGeneration.from_pretrained(
-            "Salesforce/blip-image-captioning-base"
-        )
+        chemin_blip = telecharger_depot("Salesforce/blip-image-captioning-base")
+        processor_blip = BlipProcessor.from_pretrained(chemin_blip)
+        modele_blip = BlipForConditionalGeneration.from_pretrained(chemin_blip)
         
         print("   ✅ BLIP téléchargé avec succès!")
         print(f"   Cache: {modele_blip.config._name_or_path}")
@@ -67,12 +73,9 @@ def telecharger_modeles_vision():
     
     try:
         print("\n   Téléchargement en cours...")
-        tokenizer_trad = MarianTokenizer.from_pretrained(
-            "Helsinki-NLP/opus-mt-en-fr"
-        )
-        modele_trad = MarianMTModel.from_pretrained(
-            "Helsinki-NLP/opus-mt-en-fr"
-        )
+        chemin_trad = telecharger_depot("Helsinki-NLP/opus-mt-en-fr")
+        tokenizer_trad = MarianTokenizer.from_pretrained(chemin_trad)
+        modele_trad = MarianMTModel.from_pretrained(chemin_trad)
         
         print("   ✅ Traducteur téléchargé avec succès!")
         print(f"   Cache: {modele_trad.config._name_or_path}")
@@ -85,34 +88,44 @@ def telecharger_modeles_vision():
     print("\n🧪 Test rapide des modèles...")
     
     try:
-        from PIL import Image
-        import numpy as np
+        import torch
+        
+        # FP16 sur GPU (moitié moins de trafic mémoire), FP32 sur CPU
+        peripherique = "cuda" if torch.cuda.is_available() else "cpu"
+        dtype = torch.float16 if peripherique == "cuda" else torch.float32
+        modele_blip = modele_blip.to(device=peripherique, dtype=dtype).eval()
+        modele_trad = modele_trad.to(device=peripherique, dtype=dtype).eval()
         
-        # Créer une image de test (100x100 pixels, bleu)
-        image_test = Image.fromarray(
-            np.full((100, 100, 3), [0, 0, 255], dtype=np.uint8)
-        )
+        # Lot de 4 images de test déjà prétraitées (tenseur normalisé à la
+        # taille d'entrée de BLIP) : pas d'aller-retour PIL ni de resize
+        taille = processor_blip.image_processor.size["height"]
+        pixel_values = torch.zeros(4, 3, taille, taille, device=peripherique, dtype=dtype)
         
-        # Test BLIP
-        print("   Test BLIP...")
-        inputs = processor_blip(image_test, return_tensors="pt")
-        outputs = modele_blip.generate(**inputs, max_length=50)
-        caption_en = processor_blip.decode(outputs[0], skip_special_tokens=True)
-        print(f"   Description générée: '{caption_en}'")
+        # BLIP puis MarianMT dans un même bloc inference_mode, chacun sur un
+        # vrai lot (glouton, déterministe)
+        print("   Test BLIP + traducteur (lot de 4 images)...")
+        with torch.inference_mode():
+            outputs = modele_blip.generate(
+                pixel_values=pixel_values,
+                max_length=50,
+                num_beams=1,
+                do_sample=False,
+            )
+            captions_en = processor_blip.batch_decode(outputs, skip_special_tokens=True)
+            
+            inputs_trad = tokenizer_trad(captions_en, return_tensors="pt", padding=True).to(peripherique)
+            translated = modele_trad.generate(**inputs_trad, num_beams=1, do_sample=False)
+            captions_fr = tokenizer_trad.batch_decode(translated, skip_special_tokens=True)
         
-        # Test traduction
-        print("   Test traducteur...")
-        inputs_trad = tokenizer_trad(caption_en, return_tensors="pt")
-        translated = modele_trad.generate(**inputs_trad)
-        caption_fr = tokenizer_trad.decode(translated[0], skip_special_tokens=True)
-        print(f"   Traduction: '{caption_fr}'")
+        print(f"   Description générée: '{captions_en[0]}'")
+        print(f"   Traduction: '{captions_fr[0]}'")
         
         print("\n   ✅ Tests réussis!")
         
     except Exception as e:
         print(f"   ⚠️  Erreur lors des tests: {e}")
         print("   Les modèles ont été téléchargés mais le test a échoué.")
-        print("   Vérifiez les dépendances (PIL, torch, transformers)")
+        print("   Vérifiez les dépendances (torch, transformers)")
     
     return True
 
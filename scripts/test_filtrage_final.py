@@ -7,21 +7,20 @@ from pathlib import Path
 racine_projet = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(racine_projet))
 
-from config.settings import obtenir_parametres
-from src.backend.core.search_engine import MoteurRecherche
-from src.backend.database.vector_db import BaseVectorielle
+from scripts.moteur_partage import obtenir_moteur
 
 # Initialiser
-parametres = obtenir_parametres()
-db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
-moteur = MoteurRecherche(db, parametres)
+moteur = obtenir_moteur()
+
+# Même requête pour les 4 tests : encodée une seule fois
+embedding_requete = moteur.encoder_requete("rendez-vous", "messages")
 
 print("=== TEST FILTRAGE DIRECTION APRÈS CORRECTION ===\n")
 
 # Test 1: Recherche SANS filtre
 print("1️⃣  Recherche SANS filtre:")
-resultats_sans = moteur.rechercher(
-    requete="rendez-vous",
+resultats_sans = moteur.rechercher_par_embedding(
+    embedding_requete,
     nom_collection="messages",
     filtres=None,
     nombre_resultats=10,
@@ -34,8 +33,8 @@ if resultats_sans:
 
 # Test 2: Recherche avec filtre INCOMING uniquement
 print("\n2️⃣  Recherche avec filtre INCOMING (+ exclure_bruit=True):")
-resultats_incoming = moteur.rechercher(
-    requete="rendez-vous",
+resultats_incoming = moteur.rechercher_par_embedding(
+    embedding_requete,
     nom_collection="messages",
     filtres={"direction": "incoming"},
     nombre_resultats=10,
@@ -51,8 +50,8 @@ if resultats_incoming:
 
 # Test 3: Recherche avec filtre OUTGOING uniquement
 print("\n3️⃣  Recherche avec filtre OUTGOING (+ exclure_bruit=True):")
-resultats_outgoing = moteur.rechercher(
-    requete="rendez-vous",
+resultats_outgoing = moteur.rechercher_par_embedding(
+    embedding_requete,
     nom_collection="messages",
     filtres={"direction": "outgoing"},
     nombre_resultats=10,
@@ -68,8 +67,8 @@ if resultats_outgoing:
 
 # Test 4: Recherche avec filtre direction + temporel
 print("\n4️⃣  Recherche avec filtre INCOMING + période temporelle:")
-resultats_combo = moteur.rechercher(
-    requete="rendez-vous",
+resultats_combo = moteur.rechercher_par_embedding(
+    embedding_requete,
     nom_collection="messages",
     filtres={
         "$and": [
@@ -5,15 +5,19 @@ Permet de tester rapidement un modèle sans exécuter tout le benchmark.
 Utile pour le développement et le débogage.
 
 Usage:
-    python test_rapide_modele.py [nom_modele]
+    python test_rapide_modele.py [nom_modele] [--onnx] [--quantize]
     
 Exemples:
     python test_rapide_modele.py jina
     python test_rapide_modele.py bge
     python test_rapide_modele.py solon
     python test_rapide_modele.py qwen  # Nécessite DEEPINFRA_TOKEN
+    python test_rapide_modele.py bge --onnx  # Export ONNX Runtime (optimum)
+    python test_rapide_modele.py solon --quantize  # Compare FP32 / int8 dynamique (CPU)
+    python test_rapide_modele.py tous  # Tous les modèles, l'un après l'autre
 """
 
+import gc
 import sys
 import time
 from pathlib import Path
@@ -25,6 +29,8 @@ sys.path.insert(0, str(racine_projet))
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+from scripts.donnees_benchmark_opsemia import obtenir_requetes_messages
+
 
 # Modèles disponibles
 MODELES = {
@@ -46,11 +52,15 @@ MODELES = {
 }
 
 
-def tester_modele(nom_court: str):
+def tester_modele(nom_court: str, onnx: bool = False, quantifier: bool = False):
     """Teste rapidement un modèle.
     
     Args:
         nom_court: Nom court du modèle (jina, bge, solon, qwen)
+        onnx: Si True, exporte le modèle vers ONNX Runtime (backend
+            sentence-transformers, nécessite optimum[onnxruntime])
+        quantifier: Si True, compare les embeddings FP32 à ceux du même
+            modèle quantifié en int8 dynamique (couches Linear, CPU)
     """
     if nom_court not in MODELES:
         print(f"❌ Modèle '{nom_court}' inconnu")
@@ -63,18 +73,30 @@ def tester_modele(nom_court: str):
     print(f"TEST RAPIDE - {modele_info['nom']}")
     print("="*70)
     print(f"ID: {modele_info['id']}")
+    print(f"Backend: {'ONNX Runtime' if onnx else 'PyTorch'}")
     print()
     
     # Chargement
     print("⏳ Chargement du modèle...")
+    options_modele = {"trust_remote_code": True} if modele_info['trust_remote'] else {}
+    if onnx:
+        # Export ONNX au premier chargement (graphe optimisé, mis en cache par HF)
+        options_modele["backend"] = "onnx"
+    if quantifier:
+        if onnx:
+            print("❌ --quantize s'applique au backend PyTorch, incompatible avec --onnx")
+            return
+        # La quantification dynamique int8 de PyTorch ne s'exécute que sur CPU
+        options_modele["device"] = "cpu"
     debut = time.time()
     try:
-        if modele_info['trust_remote']:
-            modele = SentenceTransformer(modele_info['id'], trust_remote_code=True)
-        else:
-            modele = SentenceTransformer(modele_info['id'])
+        modele = SentenceTransformer(modele_info['id'], **options_modele)
     except Exception as e:
         print(f"❌ Erreur chargement: {e}")
+        if onnx:
+            print("\n💡 Conseil: Le backend ONNX nécessite sentence-transformers>=3.2 et:")
+            print('   pip install "optimum[onnxruntime]"')
+            return
         print("\n💡 Conseil: Télécharger d'abord le modèle:")
         print(f"   python scripts/telecharger_modele_{nom_court}.py")
         return
@@ -82,27 +104,48 @@ def tester_modele(nom_court: str):
     duree_chargement = time.time() - debut
     print(f"✅ Chargé en {duree_chargement:.2f}s")
     print(f"   Dimensions: {modele.get_sentence_embedding_dimension()}")
+    
+    # Préchauffage non chronométré (init tokenizer, allocations, autotune cuDNN)
+    # pour que les mesures suivantes reflètent le régime établi
+    modele.encode(["préchauffage"] * 4, batch_size=4, show_progress_bar=False)
     print()
     
-    # Test encodage simple
-    print("⏳ Test encodage message simple...")
+    # Textes du test de similarité, encodés avec le message de test
+    requete = "livraison qualité produit"
+    corpus = [
+        "Le produit est prêt pour la livraison. Qualité 99.1%",
+        "Salut, on se voit demain ?",
+        "Production terminée, rendement excellent",
+        "Pizza promotion 2 achetées 1 offerte",
+        "Livraison effectuée mission accomplie",
+    ]
+    
+    # Test encodage : message + requête + corpus en un seul appel
+    print(f"⏳ Test encodage message simple (lot unique de {2 + len(corpus)} textes)...")
     texte_test = "Le produit est prêt pour la livraison. Qualité 99.1%"
     
     debut = time.time()
-    embedding = modele.encode([texte_test], normalize_embeddings=True, show_progress_bar=False)[0]
+    embeddings = modele.encode(
+        [texte_test, requete] + corpus,
+        batch_size=64,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+    )
     duree = time.time() - debut
+    embedding, emb_requete, emb_corpus = embeddings[0], embeddings[1], embeddings[2:]
     
-    print(f"✅ Message encodé en {duree*1000:.2f}ms")
+    print(f"✅ Lot encodé en {duree*1000:.2f}ms")
     print(f"   Dimension: {len(embedding)}")
     print(f"   Premiers éléments: {embedding[:5]}")
     print()
     
     # Test encodage batch
-    print("⏳ Test encodage batch (100 messages)...")
+    print("⏳ Test encodage batch (100 messages identiques)...")
     messages_test = [texte_test] * 100
     
     debut = time.time()
-    embeddings_batch = modele.encode(messages_test, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+    embeddings_batch = modele.encode(messages_test, batch_size=1024, normalize_embeddings=True, show_progress_bar=False)
     duree_batch = time.time() - debut
     
     print(f"✅ Batch encodé en {duree_batch:.2f}s")
@@ -110,38 +153,81 @@ def tester_modele(nom_court: str):
     print(f"   Estimation 1000 msgs: {duree_batch*10:.1f}s")
     print()
     
+    # Lot de longueurs variées (requêtes du benchmark) : cas réaliste, où le
+    # tri par longueur interne à encode() limite le padding de chaque sous-lot
+    messages_varies = [requete for requete, _, _ in obtenir_requetes_messages()][:100]
+    nb_varies = len(messages_varies)
+    nb_tokens = [len(ids) for ids in modele.tokenizer(messages_varies, truncation=True)["input_ids"]]
+    print(f"⏳ Test encodage batch hétérogène ({nb_varies} requêtes, {min(nb_tokens)}-{max(nb_tokens)} tokens)...")
+    
+    debut = time.time()
+    modele.encode(messages_varies, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+    duree_varies = time.time() - debut
+    
+    print(f"✅ Batch encodé en {duree_varies:.2f}s")
+    print(f"   Débit: {nb_varies/duree_varies:.1f} messages/s")
+    print()
+    
     # Test similarité
     print("⏳ Test recherche de similarité...")
-    requete = "livraison qualité produit"
-    corpus = [
-        "Le produit est prêt pour la livraison. Qualité 99.1%",
-        "Salut, on se voit demain ?",
-        "Production terminée, rendement excellent",
-        "Pizza promotion 2 achetées 1 offerte",
-        "Livraison effectuée mission accomplie",
-    ]
     
-    emb_requete = modele.encode([requete], normalize_embeddings=True, show_progress_bar=False)[0]
-    emb_corpus = modele.encode(corpus, normalize_embeddings=True, show_progress_bar=False)
+    # Calcul similarités (tableau contigu float32 -> produit matrice-vecteur BLAS)
+    emb_corpus = np.ascontiguousarray(emb_corpus, dtype=np.float32)
+    similarites = emb_corpus @ np.asarray(emb_requete, dtype=np.float32)
     
-    # Calcul similarités
-    similarites = np.dot(emb_corpus, emb_requete)
-    indices_tries = np.argsort(-similarites)
+    # Top K par sélection partielle O(n), seul le top K est trié
+    k = min(3, len(similarites))
+    top = np.argpartition(-similarites, k - 1)[:k]
+    indices_tries = top[np.argsort(-similarites[top])]
     
     print(f"✅ Requête: '{requete}'")
     print(f"   Top 3 résultats:")
-    for i, idx in enumerate(indices_tries[:3], 1):
+    for i, idx in enumerate(indices_tries, 1):
         print(f"   {i}. [{similarites[idx]:.3f}] {corpus[idx][:50]}...")
     print()
     
+    if quantifier:
+        print("⏳ Test quantification int8 dynamique...")
+        import torch
+        
+        # Poids des couches Linear (attention + FFN) en int8, activations
+        # quantifiées à la volée : produits scalaires int8 (VNNI sur AVX-512)
+        modele[0].auto_model = torch.ao.quantization.quantize_dynamic(
+            modele[0].auto_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        
+        debut = time.time()
+        embeddings_int8 = modele.encode(
+            [texte_test, requete] + corpus,
+            batch_size=64,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        duree_int8 = time.time() - debut
+        
+        # Embeddings normalisés : le produit scalaire ligne à ligne est le cosinus
+        cosinus = np.einsum("ij,ij->i", embeddings.astype(np.float32), embeddings_int8.astype(np.float32))
+        similarites_int8 = embeddings_int8[2:] @ embeddings_int8[1]
+        top_int8 = np.argsort(-similarites_int8)[:k]
+        
+        print(f"✅ Lot int8 encodé en {duree_int8*1000:.2f}ms (FP32: {duree*1000:.2f}ms)")
+        print(f"   Cosinus FP32/int8: min {cosinus.min():.4f}, moyen {cosinus.mean():.4f}")
+        if np.array_equal(top_int8, indices_tries):
+            print(f"   ✅ Top {k} identique au modèle FP32")
+        else:
+            print(f"   ⚠️  Top {k} différent du modèle FP32: {[corpus[i][:30] for i in top_int8]}")
+        print()
+    
     # Résumé
     print("="*70)
     print("✅ TEST RÉUSSI")
     print("="*70)
     print(f"Résumé {modele_info['nom']}:")
     print(f"  - Chargement: {duree_chargement:.2f}s")
-    print(f"  - Encodage simple: {duree*1000:.2f}ms")
+    print(f"  - Encodage lot ({2 + len(corpus)} textes): {duree*1000:.2f}ms")
     print(f"  - Débit batch: {100/duree_batch:.1f} msg/s")
+    print(f"  - Débit batch hétérogène: {nb_varies/duree_varies:.1f} msg/s")
     print(f"  - Recherche: Fonctionne correctement")
     print()
     print("💡 Pour le benchmark complet:")
@@ -149,21 +235,49 @@ def tester_modele(nom_court: str):
     print("="*70)
 
 
+def liberer_memoire():
+    """Libère le modèle précédent avant d'en charger un autre (RAM et VRAM)."""
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except ImportError:
+        pass
+
+
 def main():
     """Fonction principale."""
-    if len(sys.argv) < 2:
-        print("Usage: python test_rapide_modele.py [modele]")
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    
+    if not arguments:
+        print("Usage: python test_rapide_modele.py [modele] [--onnx] [--quantize]")
         print()
         print("Modèles disponibles:")
         for nom, info in MODELES.items():
             print(f"  - {nom:<8} : {info['nom']}")
+        print(f"  - {'tous':<8} : Tous les modèles, l'un après l'autre")
+        print()
+        print("Options:")
+        print("  --onnx       Encoder via ONNX Runtime (export automatique)")
+        print("  --quantize   Comparer FP32 et int8 dynamique (CPU)")
         print()
         print("Exemple:")
         print("  python test_rapide_modele.py jina")
         sys.exit(1)
     
-    nom_modele = sys.argv[1].lower()
-    tester_modele(nom_modele)
+    nom_modele = arguments[0].lower()
+    options = {"onnx": "--onnx" in sys.argv, "quantifier": "--quantize" in sys.argv}
+    
+    if nom_modele == "tous":
+        # Un seul modèle en mémoire à la fois : le pic de RAM/VRAM reste
+        # celui du plus gros modèle, pas la somme des trois
+        for nom in MODELES:
+            tester_modele(nom, **options)
+            liberer_memoire()
+            print()
+    else:
+        tester_modele(nom_modele, **options)
 
 
 if __name__ == "__main__":
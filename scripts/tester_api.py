@@ -7,20 +7,49 @@ from __future__ import annotations
 
 import io
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict
 
 import requests
+from requests.adapters import HTTPAdapter
 
-# Forcer UTF-8 pour la sortie console (nécessaire pour les emojis sur Windows)
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+# orjson (optionnel) décode nettement plus vite les réponses riches en
+# flottants (scores, métadonnées) ; repli sur le module json standard
+try:
+    from orjson import loads as decoder_json
+except ImportError:
+    from json import loads as decoder_json
+
+# Sortie console en UTF-8 (emojis sur Windows), avec un tampon de 64 Kio :
+# chaque test est écrit puis vidé en un bloc, plutôt que ligne par ligne
+TAILLE_TAMPON_SORTIE = 64 * 1024
+sys.stdout.flush()
+sys.stdout = io.TextIOWrapper(
+    io.BufferedWriter(io.FileIO(sys.stdout.fileno(), "w", closefd=False), TAILLE_TAMPON_SORTIE),
+    encoding='utf-8',
+    errors='replace',
+    line_buffering=False,
+    write_through=False,
+)
 if sys.stderr.encoding != 'utf-8':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 # Configuration de l'API
 API_URL = "http://127.0.0.1:5000"
+DELAI_REQUETE_S = 30
+# Attentes successives (backoff exponentiel) pendant la sonde de démarrage
+DELAIS_SONDE_S = (0.05, 0.1, 0.2, 0.4, 0.8)
+
+# Session partagée : connexion HTTP keep-alive réutilisée par tous les tests
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+
+# Les tests s'exécutent en parallèle : un bloc de sortie par test
+_VERROU_AFFICHAGE = threading.Lock()
 
 # Ajouter le répertoire racine au path
 racine_projet = Path(__file__).resolve().parents[1]
@@ -43,37 +72,60 @@ def tester_endpoint(
         data: Données JSON pour POST (optionnel)
         params: Paramètres de requête pour GET (optionnel)
     """
-    print(f"\n{'='*70}")
-    print(f"🧪 Test: {nom}")
-    print(f"{'='*70}")
-    print(f"   {methode} {endpoint}")
+    lignes = [
+        f"\n{'='*70}",
+        f"🧪 Test: {nom}",
+        f"{'='*70}",
+        f"   {methode} {endpoint}",
+    ]
     
     if data:
-        print(f"   Données: {data}")
+        lignes.append(f"   Données: {data}")
     
     try:
         url = f"{API_URL}{endpoint}"
         
         if methode == "GET":
-            response = requests.get(url, params=params)
+            response = SESSION.get(url, params=params, timeout=DELAI_REQUETE_S)
         elif methode == "POST":
-            response = requests.post(url, json=data)
+            response = SESSION.post(url, json=data, timeout=DELAI_REQUETE_S)
         else:
-            print(f"❌ Méthode {methode} non supportée")
-            return
+            lignes.append(f"❌ Méthode {methode} non supportée")
+            response = None
         
-        print(f"\n   Statut: {response.status_code}")
-        
-        if response.status_code == 200:
-            print("   ✅ Succès")
-            result = response.json()
-            print(f"   Réponse: {result}")
-        else:
-            print(f"   ❌ Échec")
-            print(f"   Réponse: {response.text}")
+        if response is not None:
+            lignes.append(f"\n   Statut: {response.status_code}")
+            
+            if response.status_code == 200:
+                lignes.append("   ✅ Succès")
+                result = decoder_json(response.content)
+                lignes.append(f"   Réponse: {result}")
+            else:
+                lignes.append(f"   ❌ Échec")
+                lignes.append(f"   Réponse: {response.text}")
     
     except Exception as e:
-        print(f"   ❌ Erreur: {e}")
+        lignes.append(f"   ❌ Erreur: {e}")
+    
+    with _VERROU_AFFICHAGE:
+        sys.stdout.write("\n".join(lignes) + "\n")
+        sys.stdout.flush()
+
+
+def attendre_backend() -> bool:
+    """Attend que l'API réponde sur /api/health (backoff exponentiel).
+
+    Returns:
+        True si le serveur répond 200, False après épuisement des tentatives
+    """
+    for delai in (0.0,) + DELAIS_SONDE_S:
+        time.sleep(delai)
+        try:
+            if SESSION.get(f"{API_URL}/api/health", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+    return False
 
 
 def executer_tests_complets() -> None:
@@ -85,45 +137,44 @@ def executer_tests_complets() -> None:
     print("   Lancez: python src/backend/app.py")
     print("="*70)
     
-    input("\nAppuyez sur Entrée pour commencer les tests...")
-    
-    # Test 1: Santé de l'API
-    tester_endpoint(
-        "Vérification de santé",
-        "GET",
-        "/api/health"
-    )
-    
-    time.sleep(0.5)
-    
-    # Test 2: Liste des collections
-    tester_endpoint(
-        "Liste des collections",
-        "GET",
-        "/api/collections"
-    )
-    
-    time.sleep(0.5)
-    
-    # Test 3: Statistiques
-    tester_endpoint(
-        "Statistiques d'indexation",
-        "GET",
-        "/api/stats"
-    )
-    
-    time.sleep(0.5)
-    
-    # Test 4: Configuration actuelle
-    tester_endpoint(
-        "Configuration actuelle",
-        "GET",
-        "/api/config"
-    )
-    
-    time.sleep(0.5)
-    
-    # Test 5: Recherche sémantique (nécessite des données indexées)
+    if not attendre_backend():
+        print(f"\n❌ Le serveur ne répond pas sur {API_URL}/api/health")
+        sys.stdout.flush()
+        return
+    
+    # Tests en lecture seule, indépendants : exécutés en parallèle
+    tests_lecture = [
+        ("Vérification de santé", "GET", "/api/health"),
+        ("Liste des collections", "GET", "/api/collections"),
+        ("Statistiques d'indexation", "GET", "/api/stats"),
+        ("Configuration actuelle", "GET", "/api/config"),
+        (
+            "Obtenir un message par ID",
+            "GET",
+            "/api/message/SM0447",
+            None,
+            {"collection": "messages_cas1"},
+        ),
+        (
+            "Contexte d'un message",
+            "GET",
+            "/api/context/SM0447",
+            None,
+            {
+                "collection": "messages_cas1",
+                "fenetre_avant": 3,
+                "fenetre_apres": 3
+            },
+        ),
+    ]
+    
+    with ThreadPoolExecutor(max_workers=len(tests_lecture)) as executeur:
+        futures = [executeur.submit(tester_endpoint, *test) for test in tests_lecture]
+        for future in futures:
+            future.result()
+    
+    # Recherches en série : la première peut déclencher le chargement du
+    # modèle d'embedding côté serveur
     tester_endpoint(
         "Recherche sémantique",
         "POST",
@@ -136,9 +187,6 @@ def executer_tests_complets() -> None:
         }
     )
     
-    time.sleep(0.5)
-    
-    # Test 6: Recherche avec filtres temporels
     tester_endpoint(
         "Recherche avec filtre temporel",
         "POST",
@@ -154,33 +202,10 @@ def executer_tests_complets() -> None:
         }
     )
     
-    time.sleep(0.5)
-    
-    # Test 7: Obtenir un message spécifique
-    tester_endpoint(
-        "Obtenir un message par ID",
-        "GET",
-        "/api/message/SM0447",
-        params={"collection": "messages_cas1"}
-    )
-    
-    time.sleep(0.5)
-    
-    # Test 8: Contexte d'un message
-    tester_endpoint(
-        "Contexte d'un message",
-        "GET",
-        "/api/context/SM0447",
-        params={
-            "collection": "messages_cas1",
-            "fenetre_avant": 3,
-            "fenetre_apres": 3
-        }
-    )
-    
     print("\n" + "="*70)
     print("✅ Tests terminés!")
     print("="*70)
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
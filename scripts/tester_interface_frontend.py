@@ -9,9 +9,7 @@ from pathlib import Path
 racine_projet = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(racine_projet))
 
-from config.settings import obtenir_parametres
-from src.backend.core.search_engine import MoteurRecherche
-from src.backend.database.vector_db import BaseVectorielle
+from scripts.moteur_partage import obtenir_moteur
 
 
 def main():
@@ -20,18 +18,18 @@ def main():
     print("VALIDATION INTERFACE FRONTEND")
     print("=" * 70)
     
-    parametres = obtenir_parametres()
-    db = BaseVectorielle(chemin_persistance=parametres.CHEMIN_BASE_CHROMA)
-    moteur = MoteurRecherche(base_vectorielle=db, parametres=parametres)
+    moteur = obtenir_moteur()
+    db = moteur.db
     
     # Test 1: Lister les collections
     print("\n[TEST 1] Lister les collections")
     print("-" * 70)
     collections_raw = db.client.list_collections()
+    comptes = db.compter_tous()
     collections = [
         {
             "nom": col.name,
-            "nombre_documents": db.compter_documents(col.name),
+            "nombre_documents": comptes.get(col.name, 0),
             "metadata": col.metadata
         }
         for col in collections_raw
@@ -6,12 +6,24 @@ Ce script teste rapidement chaque modèle d'embedding avec le pipeline complet :
 2. Indexation d'un petit échantillon de données
 3. Recherche de test
 4. Vérification des résultats
+
+Usage:
+    python tester_modeles_pipeline.py [--no-compile]
+
+    --no-compile : garder l'encodeur en mode eager (sans torch.compile)
 """
 
+import contextlib
 import io
+import multiprocessing
+import os
 import sys
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 
 # Forcer UTF-8 pour la sortie console (nécessaire pour les emojis sur Windows)
 if sys.stdout.encoding != 'utf-8':
@@ -21,12 +33,15 @@ if sys.stderr.encoding != 'utf-8':
 
 # Ajouter le répertoire racine au path pour les imports
 racine_projet = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(racine_projet))
+if str(racine_projet) not in sys.path:
+    sys.path.insert(0, str(racine_projet))
 
 from config.settings import Parametres
 from src.backend.core.search_engine import MoteurRecherche
-from src.backend.database.indexer import indexer_csv_messages
+from src.backend.database.indexer import indexer_csv_messages, preparer_messages_et_chunks
 from src.backend.database.vector_db import BaseVectorielle
+from src.backend.models import model_manager
+from src.backend.models.text_encoder import charger_encodeur_texte_depuis_parametres
 
 
 # Modèles à tester (en ordre de taille croissante)
@@ -38,19 +53,128 @@ MODELES_A_TESTER = [
 ]
 
 
-def tester_modele(id_modele: str, nom_modele: str) -> bool:
+SEPARATEUR = "=" * 70
+
+# Extensions des fichiers de poids à précharger
+EXTENSIONS_POIDS = (".safetensors", ".bin", ".pt", ".onnx")
+TAILLE_BLOC_LECTURE = 8 * 1024 * 1024
+
+
+def _lire_fichier(chemin: str) -> int:
+    """Lit un fichier par blocs en jetant les données (remplit le page cache).
+
+    Returns:
+        Nombre d'octets lus
+    """
+    total = 0
+    with open(chemin, "rb", buffering=0) as f:
+        while bloc := f.read(TAILLE_BLOC_LECTURE):
+            total += len(bloc)
+    return total
+
+
+def precharger_poids_modele(id_modele: str, workers: int = 32) -> None:
+    """Lit en parallèle les fichiers de poids d'un modèle déjà en cache HF.
+
+    Le chargement Hugging Face lit les shards un par un ; en les lisant
+    d'abord tous en parallèle, ils sont ensuite servis depuis le page cache
+    du système. Sans effet si le modèle n'est pas encore téléchargé.
+
+    Args:
+        id_modele: ID Hugging Face du modèle
+        workers: Nombre de lectures simultanées
+    """
+    try:
+        from huggingface_hub import snapshot_download
+        chemin_local = snapshot_download(repo_id=id_modele, local_files_only=True)
+    except Exception:
+        return
+    
+    fichiers = [
+        str(p) for p in Path(chemin_local).rglob("*")
+        if p.suffix in EXTENSIONS_POIDS and p.is_file()
+    ]
+    if not fichiers:
+        return
+    
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(workers, len(fichiers))) as executeur:
+        octets = sum(executeur.map(_lire_fichier, fichiers))
+    duree = time.perf_counter() - debut
+    print(f"   ♨️  Poids préchargés: {len(fichiers)} fichier(s), {octets / 1024**3:.2f} Go en {duree:.1f}s")
+
+
+def compiler_encodeur() -> None:
+    """Compile (torch.compile) le transformer de l'encodeur partagé.
+
+    L'encodeur est chargé via model_manager (le même singleton que celui
+    utilisé ensuite par l'indexeur et le moteur de recherche), puis son
+    module Hugging Face est remplacé par sa version compilée. Sans effet
+    pour les encodeurs sans modèle local (API) ou avec PyTorch < 2.0.
+    """
+    import torch
+    from src.backend.models.model_manager import obtenir_encodeur_texte
+    
+    if not hasattr(torch, "compile"):
+        print("   ⚠️  torch.compile indisponible (PyTorch < 2.0), mode eager conservé")
+        return
+    
+    encodeur = obtenir_encodeur_texte()
+    modele_st = getattr(encodeur, "modele", None)
+    if modele_st is None:
+        return
+    
+    premier_module = modele_st._first_module()
+    # dynamic=True : les lots ont des longueurs de séquence variables,
+    # on évite une recompilation par forme
+    premier_module.auto_model = torch.compile(premier_module.auto_model, dynamic=True)
+    print("   ⚙️  Encodeur compilé avec torch.compile")
+
+
+@lru_cache(maxsize=None)
+def _preparer_chunks_cache(chemin_csv: str, taille_fenetre: int, overlap: int) -> tuple:
+    """Parse, débruite et découpe le CSV une seule fois par jeu de paramètres."""
+    return preparer_messages_et_chunks(chemin_csv, taille_fenetre, overlap)
+
+
+def preparer_chunks(parametres: Parametres) -> tuple:
+    """Prépare les messages et chunks du CSV de test, communs à tous les modèles.
+    
+    Args:
+        parametres: Paramètres (CSV et taille/chevauchement des fenêtres)
+    
+    Returns:
+        Tuple (messages, chunks) à passer à tester_modele
+    """
+    return _preparer_chunks_cache(
+        str(parametres.CHEMIN_CSV_DONNEES),
+        parametres.TAILLE_FENETRE_CHUNK,
+        parametres.OVERLAP_FENETRE_CHUNK,
+    )
+
+
+def tester_modele(
+    id_modele: str,
+    nom_modele: str,
+    donnees_preparees: Optional[tuple] = None,
+    compiler: bool = True,
+) -> bool:
     """Teste un modèle avec le pipeline complet.
     
     Args:
         id_modele: ID Hugging Face du modèle
         nom_modele: Nom lisible du modèle
+        donnees_preparees: Tuple (messages, chunks) issu de preparer_chunks ;
+            si None, le CSV est relu et redécoupé
+        compiler: Si True, compile l'encodeur avec torch.compile avant
+            l'indexation (coût unique amorti sur tous les encodages)
     
     Returns:
         True si le test réussit, False sinon
     """
-    print(f"\n{'='*70}")
+    print(f"\n{SEPARATEUR}")
     print(f"TEST: {nom_modele}")
-    print(f"{'='*70}")
+    print(SEPARATEUR)
     print(f"ID Modèle: {id_modele}")
     
     try:
@@ -64,6 +188,24 @@ def tester_modele(id_modele: str, nom_modele: str) -> bool:
             
             print("\n📄 Phase 1/3: Indexation...")
             
+            # Shards du modèle lus en parallèle avant leur chargement séquentiel
+            precharger_poids_modele(id_modele)
+            
+            # L'indexeur et le moteur de recherche utilisent l'encodeur partagé
+            # de model_manager, chargé d'après la configuration globale : il
+            # est remplacé par celui du modèle testé (compilé ensuite)
+            try:
+                model_manager._encodeur_texte_singleton = charger_encodeur_texte_depuis_parametres(parametres)
+            except Exception as e:
+                print(f"   ❌ Échec chargement du modèle: {e}")
+                return False
+            
+            if compiler:
+                try:
+                    compiler_encodeur()
+                except Exception as e:
+                    print(f"   ⚠️  Compilation impossible, mode eager conservé: {e}")
+            
             # Indexer le CSV (version courte pour test rapide)
             try:
                 stats = indexer_csv_messages(
@@ -71,6 +213,7 @@ def tester_modele(id_modele: str, nom_modele: str) -> bool:
                     parametres=parametres,
                     nom_cas="test",
                     reinitialiser=True,
+                    donnees_preparees=donnees_preparees,
                 )
                 
                 print(f"   ✅ Indexation réussie")
@@ -142,37 +285,120 @@ def tester_modele(id_modele: str, nom_modele: str) -> bool:
         return False
 
 
+def _initialiser_worker(compteur, nb_gpus: int) -> None:
+    """Initialise un processus worker : l'épingle sur un GPU s'il y en a.
+
+    Args:
+        compteur: Compteur partagé (multiprocessing.Value) des workers démarrés
+        nb_gpus: Nombre de GPU visibles depuis le processus principal
+    """
+    with compteur.get_lock():
+        index_worker = compteur.value
+        compteur.value += 1
+    if nb_gpus > 0:
+        # À faire avant tout import de torch dans le worker
+        os.environ["CUDA_VISIBLE_DEVICES"] = str(index_worker % nb_gpus)
+
+
+def _tester_modele_isole(
+    id_modele: str,
+    nom_modele: str,
+    donnees_preparees: tuple,
+    compiler: bool,
+) -> tuple:
+    """Exécute tester_modele dans un worker et capture sa sortie console.
+
+    Args:
+        id_modele: ID Hugging Face du modèle
+        nom_modele: Nom lisible du modèle
+        donnees_preparees: Tuple (messages, chunks) commun à tous les modèles
+        compiler: Compiler l'encodeur avec torch.compile
+
+    Returns:
+        Tuple (succès, sortie console du test)
+    """
+    # Un worker peut enchaîner plusieurs modèles : repartir d'un encodeur vierge
+    model_manager._encodeur_texte_singleton = None
+    
+    sortie = io.StringIO()
+    with contextlib.redirect_stdout(sortie), contextlib.redirect_stderr(sortie):
+        succes = tester_modele(id_modele, nom_modele, donnees_preparees, compiler)
+    return succes, sortie.getvalue()
+
+
+def _compter_gpus() -> int:
+    """Retourne le nombre de GPU CUDA disponibles (0 sans torch ni CUDA)."""
+    try:
+        import torch
+        return torch.cuda.device_count()
+    except ImportError:
+        return 0
+
+
 def main():
     """Fonction principale."""
-    print("=" * 70)
+    print(SEPARATEUR)
     print("TEST DES MODÈLES AVEC PIPELINE_EXAMPLE.PY")
-    print("=" * 70)
+    print(SEPARATEUR)
     print("\nCe script teste que chaque modèle fonctionne avec le pipeline complet.")
     print("Les tests utilisent une base temporaire et ne modifient pas vos données.\n")
     
-    # Importer ici pour forcer le rechargement du singleton à chaque test
-    from src.backend.models import model_manager
+    # --no-compile : mesure de référence en mode eager
+    compiler = "--no-compile" not in sys.argv
+    
+    # Chaque modèle est testé dans son propre processus (interpréteur, singleton
+    # d'encodeur et contexte CUDA isolés) : les tests s'exécutent en parallèle
+    nb_gpus = _compter_gpus()
+    nb_workers = max(1, min(len(MODELES_A_TESTER), (os.cpu_count() or 1) // 4))
+    if nb_gpus > 0:
+        nb_workers = min(nb_workers, nb_gpus)
+    print(f"⚙️  {nb_workers} processus de test ({nb_gpus} GPU détecté(s))\n")
+    
+    # Parsing + débruitage + chunking communs : faits une fois, seul
+    # l'encodage est refait pour chaque modèle
+    print("📄 Préparation des messages et chunks de test...")
+    donnees_preparees = preparer_chunks(Parametres())
+    print(f"   ✓ {len(donnees_preparees[0])} messages, {len(donnees_preparees[1])} chunks\n")
+    
+    # "spawn" : pas de fork d'un processus ayant déjà initialisé CUDA (et
+    # comportement identique sous Windows)
+    contexte = multiprocessing.get_context("spawn")
+    compteur = contexte.Value("i", 0)
     
     resultats = {}
     
-    for id_modele, nom_modele in MODELES_A_TESTER:
-        # Réinitialiser le singleton de l'encodeur avant chaque test
-        model_manager._encodeur_texte_singleton = None
+    with ProcessPoolExecutor(
+        max_workers=nb_workers,
+        mp_context=contexte,
+        initializer=_initialiser_worker,
+        initargs=(compteur, nb_gpus),
+    ) as executeur:
+        futures = {
+            executeur.submit(
+                _tester_modele_isole, id_modele, nom_modele, donnees_preparees, compiler
+            ): nom_modele
+            for id_modele, nom_modele in MODELES_A_TESTER
+        }
         
         try:
-            succes = tester_modele(id_modele, nom_modele)
-            resultats[nom_modele] = succes
+            for future in as_completed(futures):
+                nom_modele = futures[future]
+                try:
+                    succes, sortie = future.result()
+                    print(sortie, end="")
+                    resultats[nom_modele] = succes
+                except Exception as e:
+                    print(f"\n❌ Erreur lors du test de {nom_modele}: {e}")
+                    resultats[nom_modele] = False
         except KeyboardInterrupt:
             print("\n\n⚠️  Interruption utilisateur. Arrêt des tests.")
-            break
-        except Exception as e:
-            print(f"\n❌ Erreur lors du test de {nom_modele}: {e}")
-            resultats[nom_modele] = False
+            for future in futures:
+                future.cancel()
     
     # Afficher le résumé
-    print(f"\n{'='*70}")
+    print(f"\n{SEPARATEUR}")
     print("RÉSUMÉ DES TESTS")
-    print(f"{'='*70}")
+    print(SEPARATEUR)
     
     for nom_modele, succes in resultats.items():
         status = "✅ RÉUSSI" if succes else "❌ ÉCHOUÉ"
@@ -181,9 +407,9 @@ def main():
     nb_reussis = sum(1 for s in resultats.values() if s)
     nb_total = len(resultats)
     
-    print(f"\n{'='*70}")
+    print(f"\n{SEPARATEUR}")
     print(f"BILAN: {nb_reussis}/{nb_total} modèles fonctionnent correctement")
-    print(f"{'='*70}")
+    print(SEPARATEUR)
     
     if nb_reussis == nb_total:
         print("\n🎉 Tous les tests ont réussi!")
@@ -7,23 +7,40 @@ from pathlib import Path
 
 # Ajouter le répertoire racine au path
 racine_projet = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(racine_projet))
+if str(racine_projet) not in sys.path:
+    sys.path.insert(0, str(racine_projet))
 
 from config.settings import obtenir_parametres
-from src.backend.core.search_engine import MoteurRecherche
-from src.backend.database.vector_db import BaseVectorielle
+from scripts.moteur_partage import obtenir_moteur
+
+SEPARATEUR = "=" * 70
+
+
+def afficher_resultats(resultats: list, nombre: int = 3) -> None:
+    """Affiche les premiers résultats, une seule écriture par résultat.
+
+    Args:
+        resultats: Résultats retournés par le moteur de recherche
+        nombre: Nombre de résultats à afficher
+    """
+    for i, res in enumerate(resultats[:nombre], 1):
+        sys.stdout.writelines([
+            f"\n{i}. Score: {res['score']:.3f}\n",
+            f"   Document: {res['document'][:100]}...\n",
+            f"   Metadata: {res['metadata']}\n",
+        ])
+    sys.stdout.flush()
 
 
 def main():
     """Test rapide de la recherche "police"."""
-    print("=" * 70)
+    print(SEPARATEUR)
     print("TEST RECHERCHE 'police'")
-    print("=" * 70)
+    print(SEPARATEUR)
     
     # Initialiser
     parametres = obtenir_parametres()
-    db = BaseVectorielle(chemin_persistance=parametres.CHEMIN_BASE_CHROMA)
-    moteur = MoteurRecherche(base_vectorielle=db, parametres=parametres)
+    moteur = obtenir_moteur()
     
     # Collection
     nom_collection = "messages_cas1"
@@ -33,9 +50,9 @@ def main():
     print(f"Methode: {parametres.METHODE_RECHERCHE}")
     
     # Test 1: Recherche "police" AVEC exclusion du bruit
-    print("\n" + "=" * 70)
+    print("\n" + SEPARATEUR)
     print("TEST 1: Recherche 'police' AVEC exclusion du bruit")
-    print("=" * 70)
+    print(SEPARATEUR)
     
     resultats_avec_filtre = moteur.rechercher(
         requete="police",
@@ -47,15 +64,12 @@ def main():
     print(f"OK - {len(resultats_avec_filtre)} resultat(s) trouve(s)")
     
     if resultats_avec_filtre:
-        for i, res in enumerate(resultats_avec_filtre[:3], 1):
-            print(f"\n{i}. Score: {res['score']:.3f}")
-            print(f"   Document: {res['document'][:100]}...")
-            print(f"   Metadata: {res['metadata']}")
+        afficher_resultats(resultats_avec_filtre)
     
     # Test 2: Recherche "police" SANS exclusion du bruit
-    print("\n" + "=" * 70)
+    print("\n" + SEPARATEUR)
     print("TEST 2: Recherche 'police' SANS exclusion du bruit")
-    print("=" * 70)
+    print(SEPARATEUR)
     
     resultats_sans_filtre = moteur.rechercher(
         requete="police",
@@ -67,26 +81,25 @@ def main():
     print(f"OK - {len(resultats_sans_filtre)} resultat(s) trouve(s)")
     
     if resultats_sans_filtre:
-        for i, res in enumerate(resultats_sans_filtre[:3], 1):
-            print(f"\n{i}. Score: {res['score']:.3f}")
-            print(f"   Document: {res['document'][:100]}...")
-            print(f"   Metadata: {res['metadata']}")
+        afficher_resultats(resultats_sans_filtre)
     
     # Vérifier si le message "nique la police" est présent
-    print("\n" + "=" * 70)
+    print("\n" + SEPARATEUR)
     print("VÉRIFICATION: Message 'nique la police'")
-    print("=" * 70)
+    print(SEPARATEUR)
     
-    message_trouve = False
-    for res in resultats_sans_filtre:
-        if "police" in res['document'].lower():
-            print(f"OK - Trouve: {res['document']}")
-            print(f"   Score: {res['score']:.3f}")
-            print(f"   ID: {res['id']}")
-            message_trouve = True
-            break
+    # Documents passés en minuscules une seule fois, puis premier qui correspond
+    documents_minuscules = [res['document'].lower() for res in resultats_sans_filtre]
+    res = next(
+        (res for res, doc in zip(resultats_sans_filtre, documents_minuscules) if "police" in doc),
+        None,
+    )
     
-    if not message_trouve:
+    if res is not None:
+        print(f"OK - Trouve: {res['document']}")
+        print(f"   Score: {res['score']:.3f}")
+        print(f"   ID: {res['id']}")
+    else:
         print("ERREUR - Message 'nique la police' non trouve dans les resultats")
 
 
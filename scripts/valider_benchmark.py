@@ -4,25 +4,42 @@
 Vérifie que tous les composants sont prêts avant d'exécuter le benchmark complet.
 """
 
+import asyncio
+import importlib.util
 import os
 import sys
 from pathlib import Path
 
 # Ajouter le répertoire racine au path
 racine_projet = Path(__file__).resolve().parents[1]
-sys.path.insert(0, str(racine_projet))
+if str(racine_projet) not in sys.path:
+    sys.path.insert(0, str(racine_projet))
 
 # Charger les variables d'environnement depuis .env
 try:
-    from dotenv import load_dotenv
+    from dotenv import dotenv_values, load_dotenv
     load_dotenv()
 except ImportError:
+    dotenv_values = None
     print("⚠️  python-dotenv non installé, impossible de charger .env automatiquement")
     print("   Installation: pip install python-dotenv")
 
 
-def verifier_fichiers():
-    """Vérifie que tous les fichiers nécessaires existent."""
+def _compter_entrees(dossier: Path) -> int:
+    """Compte les entrées directes d'un dossier.
+
+    os.scandir parcourt le flux du dossier sans construire un Path par entrée.
+    """
+    with os.scandir(dossier) as entrees:
+        return sum(1 for _ in entrees)
+
+
+async def verifier_fichiers():
+    """Vérifie que tous les fichiers nécessaires existent.
+    
+    Les tests d'existence (indépendants) sont lancés en parallèle dans des
+    threads ; les résultats sont affichés dans l'ordre de la liste.
+    """
     print("📁 Vérification des fichiers...")
     
     fichiers_requis = [
@@ -37,26 +54,46 @@ def verifier_fichiers():
         racine_projet / "Docs Projet",
     ]
     
+    existences = await asyncio.gather(
+        *(asyncio.to_thread(chemin.exists) for chemin in fichiers_requis + dossiers_requis)
+    )
+    existe_fichier = existences[:len(fichiers_requis)]
+    existe_dossier = existences[len(fichiers_requis):]
+    
+    dossiers_presents = [d for d, existe in zip(dossiers_requis, existe_dossier) if existe]
+    nb_entrees = await asyncio.gather(
+        *(asyncio.to_thread(_compter_entrees, dossier) for dossier in dossiers_presents)
+    )
+    nb_par_dossier = dict(zip(dossiers_presents, nb_entrees))
+    
     erreurs = []
     
-    for fichier in fichiers_requis:
-        if not fichier.exists():
+    for fichier, existe in zip(fichiers_requis, existe_fichier):
+        if not existe:
             erreurs.append(f"❌ Fichier manquant: {fichier}")
         else:
             print(f"   ✓ {fichier.name}")
     
-    for dossier in dossiers_requis:
-        if not dossier.exists():
+    for dossier, existe in zip(dossiers_requis, existe_dossier):
+        if not existe:
             erreurs.append(f"❌ Dossier manquant: {dossier}")
         else:
-            nb_fichiers = len(list(dossier.glob("*")))
-            print(f"   ✓ {dossier.name}/ ({nb_fichiers} fichiers)")
+            print(f"   ✓ {dossier.name}/ ({nb_par_dossier[dossier]} fichiers)")
     
     return erreurs
 
 
-def verifier_dependances():
-    """Vérifie que les dépendances Python sont installées."""
+def _module_importable(module: str) -> bool:
+    """Indique si un module est installé, sans l'importer.
+
+    find_spec interroge seulement les finders : le corps du paquet (torch,
+    CUDA, hub HF...) n'est pas exécuté.
+    """
+    return importlib.util.find_spec(module) is not None
+
+
+async def verifier_dependances():
+    """Vérifie que les dépendances Python sont installées (recherches en parallèle)."""
     print("\n📦 Vérification des dépendances...")
     
     dependances = [
@@ -68,13 +105,16 @@ def verifier_dependances():
         ("chromadb", "chromadb"),
     ]
     
+    disponibles = await asyncio.gather(
+        *(asyncio.to_thread(_module_importable, module) for module, _ in dependances)
+    )
+    
     erreurs = []
     
-    for module, package in dependances:
-        try:
-            __import__(module)
+    for (module, package), disponible in zip(dependances, disponibles):
+        if disponible:
             print(f"   ✓ {package}")
-        except ImportError:
+        else:
             erreurs.append(f"❌ Package manquant: {package}")
             erreurs.append(f"   Installation: pip install {package}")
     
@@ -96,16 +136,19 @@ def verifier_configuration():
     
     if chemin_env.exists():
         print(f"      Taille .env: {chemin_env.stat().st_size} octets")
-        # Lire le contenu (masqué)
-        try:
-            with open(chemin_env, 'r') as f:
-                contenu = f.read()
-                if "DEEPINFRA_TOKEN" in contenu:
-                    print(f"      ✓ Variable DEEPINFRA_TOKEN trouvée dans .env")
+        # Parser le fichier (clés réelles, pas de simple recherche de sous-chaîne)
+        if dotenv_values is None:
+            print(f"      ⚠️  python-dotenv non installé, .env non analysé")
+        else:
+            try:
+                valeurs_env = dotenv_values(chemin_env)
+                token_fichier = valeurs_env.get("DEEPINFRA_TOKEN")
+                if "DEEPINFRA_TOKEN" in valeurs_env:
+                    print(f"      ✓ Variable DEEPINFRA_TOKEN trouvée dans .env: {'***' + token_fichier[-10:] if token_fichier else '(vide)'}")
                 else:
                     print(f"      ⚠️  Variable DEEPINFRA_TOKEN absente du .env")
-        except Exception as e:
-            print(f"      ⚠️  Erreur lecture .env: {e}")
+            except Exception as e:
+                print(f"      ⚠️  Erreur lecture .env: {e}")
     
     # Vérifier clé API
     deepinfra_token = os.getenv("DEEPINFRA_TOKEN")
@@ -214,7 +257,7 @@ def afficher_estimation_temps():
     print("   - GPU recommandé pour les modèles locaux")
 
 
-def main():
+async def main_async():
     """Fonction principale de validation."""
     print("="*80)
     print("VALIDATION DU SYSTÈME DE BENCHMARK OPSEMIA")
@@ -223,8 +266,8 @@ def main():
     toutes_erreurs = []
     
     # Vérifications
-    toutes_erreurs.extend(verifier_fichiers())
-    toutes_erreurs.extend(verifier_dependances())
+    toutes_erreurs.extend(await verifier_fichiers())
+    toutes_erreurs.extend(await verifier_dependances())
     toutes_erreurs.extend(verifier_configuration())
     toutes_erreurs.extend(verifier_dataset_benchmark())
     toutes_erreurs.extend(verifier_espace_disque())
@@ -255,6 +298,11 @@ def main():
     return len(toutes_erreurs)
 
 
+def main():
+    """Point d'entrée synchrone."""
+    return asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     exit_code = main()
     sys.exit(0 if exit_code == 0 else 1)
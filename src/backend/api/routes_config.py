@@ -2,23 +2,104 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-from typing import Any, Dict
+import hashlib
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-from flask import Blueprint, jsonify, request
-
-# Ajouter le répertoire racine au path pour les imports
-racine_projet = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(racine_projet))
+from flask import Blueprint, Response, jsonify, request
 
+# Pas de manipulation de sys.path : importer src.backend.api implique déjà
+# que la racine du projet est sur le path (app.py l'ajoute au démarrage)
 from config.settings import Parametres, obtenir_parametres, recharger_parametres, MODELES_DISPONIBLES
-from src.backend.database.vector_db import BaseVectorielle
+from src.backend.api.routes_conversations import invalider_cache_messages
+from src.backend.api.routes_donnees import invalider_cache_positions
+from src.backend.api.routes_images import invalider_cache_galerie
+from src.backend.database.index_images import supprimer_index_images
+from src.backend.database.resumes_conversations import supprimer_resumes
+from src.backend.database.vector_db import BaseVectorielle, obtenir_base_vectorielle
 from src.backend.models.model_manager import recharger_encodeur_texte, obtenir_id_modele_actuel
 
 # Blueprint pour les routes de configuration
 bp_config = Blueprint("config", __name__, url_prefix="/api")
 
+# Catalogue des modèles (constant pendant toute la vie du processus) :
+# sérialisé une seule fois pour GET /api/config
+_MODELES_DISPONIBLES_JSON = json.dumps(MODELES_DISPONIBLES, ensure_ascii=False)
+
+# Corps complet de GET /api/config, construit au premier appel et vidé à
+# chaque POST /api/config (seule route qui modifie les paramètres)
+_cache_corps_config: Optional[str] = None
+
+# Clés de configuration nécessitant un rechargement complet des paramètres
+CLES_CONFIG_A_FROID = frozenset({
+    "id_modele_embedding",
+    "peripherique_embedding",
+    "taille_fenetre_chunk",
+    "overlap_fenetre_chunk",
+})
+
+# Instantané des collections (nom, métadonnées, nombre de documents), mis en
+# cache quelques secondes : /api/stats et /api/collections sont appelés à
+# chaque affichage de page et n'ont alors plus besoin d'interroger ChromaDB
+DUREE_CACHE_COMPTES_SEC = 10.0
+_cache_collections: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+
+
+def _obtenir_collections(db: BaseVectorielle) -> List[Dict[str, Any]]:
+    """Retourne la liste des collections avec leurs comptes, recalculée au plus toutes les 10 s.
+
+    Args:
+        db: Base vectorielle à interroger en cas d'expiration du cache
+
+    Returns:
+        Liste de {"nom", "nombre_documents", "metadata"} (à ne pas modifier)
+    """
+    global _cache_collections
+    maintenant = time.monotonic()
+    if _cache_collections is None or maintenant - _cache_collections[0] > DUREE_CACHE_COMPTES_SEC:
+        collections = db.client.list_collections()
+        comptes = db.compter_tous(collections)
+        _cache_collections = (maintenant, [
+            {
+                "nom": col.name,
+                "nombre_documents": comptes.get(col.name, 0),
+                "metadata": col.metadata
+            }
+            for col in collections
+        ])
+    return _cache_collections[1]
+
+
+def invalider_cache_comptes() -> None:
+    """Vide le cache des collections (après suppression de collection, changement de config)."""
+    global _cache_collections
+    _cache_collections = None
+
+
+def invalider_cache_config() -> None:
+    """Vide le corps de GET /api/config mis en cache (après modification des paramètres)."""
+    global _cache_corps_config
+    _cache_corps_config = None
+
+
+def _avec_etag(reponse: Response) -> Response:
+    """Ajoute un ETag au corps de la réponse et répond 304 si le client l'a déjà.
+
+    Le frontend interroge régulièrement /api/config, /api/stats et
+    /api/collections : si rien n'a changé, le corps n'est pas renvoyé.
+
+    Args:
+        reponse: Réponse JSON complète (statut 200)
+
+    Returns:
+        La même réponse avec ETag, ou une réponse 304 sans corps
+    """
+    reponse.set_etag(hashlib.blake2b(reponse.get_data(), digest_size=16).hexdigest())
+    # no-cache : le navigateur garde la réponse mais la revalide à chaque appel
+    reponse.cache_control.no_cache = True
+    return reponse.make_conditional(request)
+
 
 @bp_config.route("/config", methods=["GET"])
 def obtenir_config() -> tuple[Dict[str, Any], int]:
@@ -27,15 +108,21 @@ def obtenir_config() -> tuple[Dict[str, Any], int]:
     Returns:
         JSON avec tous les paramètres de configuration
     """
+    global _cache_corps_config
     try:
+        if _cache_corps_config is not None:
+            return _avec_etag(Response(_cache_corps_config, status=200, mimetype="application/json"))
+        
         parametres = obtenir_parametres()
         
-        config = {
-            "encodage": {
-                "modele": parametres.ID_MODELE_EMBEDDING,
-                "peripherique": parametres.PERIPHERIQUE_EMBEDDING,
-                "modeles_disponibles": MODELES_DISPONIBLES
-            },
+        # Partie dynamique de "encodage" ; le catalogue des modèles, figé,
+        # est inséré tel quel depuis sa sérialisation faite à l'import
+        encodage = json.dumps({
+            "modele": parametres.ID_MODELE_EMBEDDING,
+            "peripherique": parametres.PERIPHERIQUE_EMBEDDING,
+        }, ensure_ascii=False)
+        
+        reste_config = json.dumps({
             "chunking": {
                 "taille_fenetre": parametres.TAILLE_FENETRE_CHUNK,
                 "overlap": parametres.OVERLAP_FENETRE_CHUNK
@@ -57,12 +144,16 @@ def obtenir_config() -> tuple[Dict[str, Any], int]:
                 "num_beams": parametres.NUM_BEAMS_DESCRIPTION_IMAGE,
                 "temperature": parametres.TEMPERATURE_DESCRIPTION_IMAGE
             }
-        }
+        }, ensure_ascii=False)
         
-        return jsonify({
-            "succes": True,
-            "configuration": config
-        }), 200
+        corps = (
+            '{"succes": true, "configuration": {"encodage": '
+            f'{encodage[:-1]}, "modeles_disponibles": {_MODELES_DISPONIBLES_JSON}}}, '
+            f'{reste_config[1:]}}}'
+        )
+        
+        _cache_corps_config = corps
+        return _avec_etag(Response(corps, status=200, mimetype="application/json"))
         
     except Exception as e:
         return jsonify({
@@ -71,6 +162,33 @@ def obtenir_config() -> tuple[Dict[str, Any], int]:
         }), 500
 
 
+# Marqueur d'un paramètre inconnu (toujours considéré comme modifié)
+_ABSENT = object()
+
+
+def _valeur_inchangee(actuelle: Any, nouvelle: Any) -> bool:
+    """Indique si une valeur envoyée à POST /api/config est déjà celle en vigueur.
+
+    Les nombres sont comparés après conversion dans le type du paramètre
+    (sauvegarder() convertit de la même façon : "15" == 15).
+
+    Args:
+        actuelle: Valeur actuelle du paramètre (_ABSENT si inconnu)
+        nouvelle: Valeur reçue
+
+    Returns:
+        True si la sauvegarde ne changerait rien
+    """
+    if actuelle is _ABSENT:
+        return False
+    if isinstance(actuelle, (int, float)) and not isinstance(actuelle, bool):
+        try:
+            return actuelle == type(actuelle)(nouvelle)
+        except (TypeError, ValueError):
+            return False
+    return actuelle == nouvelle
+
+
 @bp_config.route("/config", methods=["POST"])
 def modifier_config() -> tuple[Dict[str, Any], int]:
     """Modifie la configuration du système de manière permanente.
@@ -105,14 +223,35 @@ def modifier_config() -> tuple[Dict[str, Any], int]:
         
         # Obtenir les paramètres actuels
         parametres = obtenir_parametres()
+        
+        # Ne garder que les valeurs réellement modifiées : le panneau de
+        # gestion renvoie tous les champs, même inchangés
+        data = {
+            cle: valeur for cle, valeur in data.items()
+            if not _valeur_inchangee(getattr(parametres, cle.upper(), _ABSENT), valeur)
+        }
+        if not data:
+            return jsonify({
+                "succes": True,
+                "message": "Aucun paramètre modifié",
+                "modifications": {}
+            }), 200
+        
         id_modele_avant = parametres.ID_MODELE_EMBEDDING
         peripherique_avant = parametres.PERIPHERIQUE_EMBEDDING
         
         # Sauvegarder les modifications dans le JSON
         parametres.sauvegarder(data)
+        invalider_cache_config()
         
-        # Recharger les paramètres
-        parametres_nouveaux = recharger_parametres()
+        # sauvegarder() met déjà à jour l'instance partagée : les réglages de
+        # recherche/images s'appliquent à chaud, sans relire le JSON. Seuls
+        # le modèle, le périphérique et le chunking justifient un rechargement.
+        if CLES_CONFIG_A_FROID.intersection(data):
+            parametres_nouveaux = recharger_parametres()
+        else:
+            parametres_nouveaux = parametres
+        invalider_cache_comptes()
         
         modifs = list(data.keys())
         
@@ -134,6 +273,7 @@ def modifier_config() -> tuple[Dict[str, Any], int]:
                     "peripherique_embedding": peripherique_avant
                 })
                 recharger_parametres()
+                invalider_cache_config()
                 return jsonify({
                     "succes": False,
                     "erreur": f"Impossible de charger le modèle {data.get('id_modele_embedding')}: {str(e)}"
@@ -175,35 +315,22 @@ def obtenir_stats() -> tuple[Dict[str, Any], int]:
     """
     try:
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
-        
-        # Récupérer toutes les collections
-        collections = db.client.list_collections()
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
-        stats_collections = []
-        total_documents = 0
+        # Récupérer toutes les collections (instantané en cache)
+        stats_collections = _obtenir_collections(db)
+        total_documents = sum(col["nombre_documents"] for col in stats_collections)
         
-        for collection_info in collections:
-            nom = collection_info.name
-            count = db.compter_documents(nom)
-            total_documents += count
-            
-            stats_collections.append({
-                "nom": nom,
-                "nombre_documents": count,
-                "metadata": collection_info.metadata
-            })
-        
-        return jsonify({
+        return _avec_etag(jsonify({
             "succes": True,
             "statistiques": {
-                "nombre_collections": len(collections),
+                "nombre_collections": len(stats_collections),
                 "total_documents": total_documents,
                 "collections": stats_collections,
                 "modele_embedding": parametres.ID_MODELE_EMBEDDING,
                 "methode_recherche": parametres.METHODE_RECHERCHE
             }
-        }), 200
+        }))
         
     except Exception as e:
         return jsonify({
@@ -221,24 +348,15 @@ def lister_collections() -> tuple[Dict[str, Any], int]:
     """
     try:
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
-        collections = db.client.list_collections()
+        liste_collections = _obtenir_collections(db)
         
-        liste_collections = [
-            {
-                "nom": col.name,
-                "nombre_documents": db.compter_documents(col.name),
-                "metadata": col.metadata
-            }
-            for col in collections
-        ]
-        
-        return jsonify({
+        return _avec_etag(jsonify({
             "succes": True,
             "nombre_collections": len(liste_collections),
             "collections": liste_collections
-        }), 200
+        }))
         
     except Exception as e:
         return jsonify({
@@ -259,7 +377,7 @@ def supprimer_collection(nom_collection: str) -> tuple[Dict[str, Any], int]:
     """
     try:
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
         # Vérifier si la collection existe
         collections = db.client.list_collections()
@@ -273,6 +391,12 @@ def supprimer_collection(nom_collection: str) -> tuple[Dict[str, Any], int]:
         
         # Supprimer la collection
         db.supprimer_collection(nom_collection)
+        invalider_cache_comptes()
+        invalider_cache_messages(nom_collection)
+        invalider_cache_positions(nom_collection)
+        invalider_cache_galerie()
+        supprimer_resumes(db.chemin_persistance, nom_collection)
+        supprimer_index_images(db.chemin_persistance, nom_collection)
         
         return jsonify({
             "succes": True,
@@ -295,7 +419,7 @@ def verifier_sante() -> tuple[Dict[str, Any], int]:
     """
     try:
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
         # Vérifier la connexion à ChromaDB
         collections = db.client.list_collections()
@@ -2,26 +2,397 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-from typing import Any, Dict, List
+import json
+import logging
+import re
+import sqlite3
+import time
+from operator import itemgetter
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, request, stream_with_context
 
-# Ajouter le répertoire racine au path pour les imports
-racine_projet = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(racine_projet))
+# orjson (optionnel) sérialise les milliers de métadonnées d'une conversation
+# bien plus vite que json ; repli sur le module standard s'il est absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+# Pas de manipulation de sys.path : importer src.backend.api implique déjà
+# que la racine du projet est sur le path (app.py l'ajoute au démarrage)
 from config.settings import obtenir_parametres
-from src.backend.database.vector_db import BaseVectorielle
+from src.backend.core.conversations import (
+    detecter_proprietaire,
+    interlocuteur_message,
+    resumer_conversations,
+    resumes_avec_apercus,
+)
+from src.backend.database.resumes_conversations import enregistrer_resumes, lire_resumes
+from src.backend.database.vector_db import BaseVectorielle, obtenir_base_vectorielle
+
+# Logger du module (niveau configuré par creer_app)
+logger = logging.getLogger(__name__)
 
 # Blueprint pour les routes de conversations
 bp_conversations = Blueprint("conversations", __name__, url_prefix="/api")
 
 
+def _encoder(payload: Any) -> bytes:
+    """Sérialise en JSON UTF-8 compact (orjson si disponible, sinon json)."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json(payload: Dict[str, Any], status: int = 200) -> Response:
+    """Construit une réponse JSON (orjson si disponible, sinon json).
+
+    Args:
+        payload: Données à sérialiser
+        status: Code HTTP
+
+    Returns:
+        Réponse Flask application/json
+    """
+    return Response(_encoder(payload), status=status, mimetype="application/json")
+
+
+# Clé de tri chronologique des messages renvoyés par les routes
+_cle_timestamp = itemgetter("timestamp")
+
+# Nombre de messages sérialisés par morceau dans les réponses en streaming
+TAILLE_LOT_STREAMING = 500
+
+
+def _json_en_flux(entete: Dict[str, Any], cle_liste: str, elements: List[Dict[str, Any]]) -> Response:
+    """Construit une réponse JSON envoyée par morceaux.
+
+    Produit ``{**entete, cle_liste: [...]}`` : la liste est sérialisée par
+    lots de TAILLE_LOT_STREAMING éléments, ce qui évite de garder en mémoire
+    le corps complet (souvent plusieurs Mo) et permet d'envoyer les premiers
+    octets avant la fin de la sérialisation.
+
+    Args:
+        entete: Champs placés avant la liste (sérialisés en une fois)
+        cle_liste: Nom du champ contenant la liste
+        elements: Éléments de la liste
+
+    Returns:
+        Réponse Flask application/json en streaming
+    """
+    def generer():
+        debut = _encoder(entete)[:-1]
+        yield debut + (b"," if entete else b"") + _encoder(cle_liste) + b":["
+        for i in range(0, len(elements), TAILLE_LOT_STREAMING):
+            lot = _encoder(elements[i:i + TAILLE_LOT_STREAMING])[1:-1]
+            yield (b"," + lot) if i else lot
+        yield b"]}"
+
+    return Response(stream_with_context(generer()), status=200, mimetype="application/json")
+
+
+def _ndjson_conversation(
+    db: BaseVectorielle,
+    nom_collection: str,
+    contact: str,
+    offset: int,
+    limit: Optional[int],
+) -> Response:
+    """Envoie une conversation en NDJSON (une ligne JSON par message).
+
+    Les IDs de la conversation viennent de l'instantané de la collection
+    (métadonnées seulement, déjà triées chronologiquement) ; les textes sont
+    lus dans ChromaDB par lots de TAILLE_LOT_STREAMING IDs, au fil de
+    l'envoi : la mémoire utilisée par la réponse ne dépend que du lot.
+
+    Première ligne : {"succes", "conversation", "total", "offset", "limit"} ;
+    puis un {"id", "document", "metadata", "timestamp"} par ligne.
+
+    Args:
+        db: Base vectorielle contenant la collection
+        nom_collection: Nom de la collection de messages
+        contact: Numéro de l'interlocuteur
+        offset: Nombre de messages à sauter
+        limit: Nombre maximal de messages (None = tous)
+
+    Returns:
+        Réponse Flask application/x-ndjson en streaming
+    """
+    instantane = _charger_messages(db, nom_collection)
+    ids_contact = instantane.ids_par_contact.get(contact) or []
+    ids_page = ids_contact[offset:None if limit is None else offset + limit]
+    contact_name = next(
+        (conv["contact_name"] for conv in instantane.conversations if conv["contact"] == contact),
+        contact
+    )
+    collection = db.obtenir_ou_creer_collection(nom_collection)
+
+    def generer():
+        yield _encoder({
+            "succes": True,
+            "conversation": {
+                "contact": contact,
+                "contact_name": contact_name,
+                "nombre_messages": len(ids_contact)
+            },
+            "total": len(ids_contact),
+            "offset": offset,
+            "limit": limit
+        }) + b"\n"
+        for i in range(0, len(ids_page), TAILLE_LOT_STREAMING):
+            ids_lot = ids_page[i:i + TAILLE_LOT_STREAMING]
+            lot = collection.get(ids=ids_lot, include=["documents", "metadatas"])
+            metadatas = lot["metadatas"] or [{}] * len(lot["ids"])
+            documents = lot["documents"] or [""] * len(lot["ids"])
+            par_id = dict(zip(lot["ids"], zip(documents, metadatas)))
+            # get(ids=...) ne garantit pas l'ordre : celui de l'instantané fait foi
+            lignes = [
+                _encoder({
+                    "id": msg_id,
+                    "document": par_id[msg_id][0],
+                    "metadata": par_id[msg_id][1],
+                    "timestamp": par_id[msg_id][1].get("timestamp") or ""
+                })
+                for msg_id in ids_lot
+                if msg_id in par_id
+            ]
+            if lignes:
+                yield b"\n".join(lignes) + b"\n"
+
+    return Response(stream_with_context(generer()), status=200, mimetype="application/x-ndjson")
+
+
+class MessagesCollection(NamedTuple):
+    """Métadonnées d'une collection de messages, avec propriétaire et résumé des conversations.
+
+    Les textes ne sont pas chargés : seules les routes qui les affichent les
+    demandent à ChromaDB, pour les messages concernés.
+    """
+
+    ids: List[str]
+    metadatas: List[Dict[str, Any]]
+    proprietaire: Optional[str]
+    conversations: List[Dict[str, Any]]  # Résumés triés (voir resumer_conversations)
+    ids_par_contact: Dict[str, List[str]]  # Index inversé interlocuteur -> IDs
+
+    @property
+    def interlocuteur_indexe(self) -> bool:
+        """True si les métadonnées portent déjà le champ "interlocuteur" (indexation
+        récente ou scripts/migrer_interlocuteur.py)."""
+        return bool(self.metadatas) and "interlocuteur" in self.metadatas[0]
+
+
+# Les trois routes de conversation relisent toute la collection : les métadonnées
+# sont gardées en mémoire une minute pour ne payer le scan ChromaDB qu'une fois
+# (vidé par les routes d'indexation et de suppression de collection)
+DUREE_CACHE_MESSAGES_SEC = 60.0
+_cache_messages: Dict[Tuple[str, str], Tuple[float, MessagesCollection]] = {}
+
+# Corps de GET /api/conversations par collection, gardé aussi longtemps que
+# les métadonnées (même durée, mêmes invalidations)
+_cache_liste_conversations: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+
+
+def _instantane_en_cache(db: BaseVectorielle, nom_collection: str) -> Optional[MessagesCollection]:
+    """Retourne l'instantané de la collection s'il est en cache et encore valide, sans charger."""
+    en_cache = _cache_messages.get((str(db.chemin_persistance), nom_collection))
+    if en_cache is None or time.monotonic() - en_cache[0] > DUREE_CACHE_MESSAGES_SEC:
+        return None
+    return en_cache[1]
+
+
+def _charger_messages(db: BaseVectorielle, nom_collection: str) -> MessagesCollection:
+    """Charge les métadonnées de tous les messages d'une collection (mis en cache 60 s).
+
+    Args:
+        db: Base vectorielle contenant la collection
+        nom_collection: Nom de la collection de messages
+
+    Returns:
+        MessagesCollection (listes vides si la collection est vide)
+    """
+    cle = (str(db.chemin_persistance), nom_collection)
+    maintenant = time.monotonic()
+    en_cache = _cache_messages.get(cle)
+    if en_cache is not None and maintenant - en_cache[0] <= DUREE_CACHE_MESSAGES_SEC:
+        return en_cache[1]
+    
+    collection = db.obtenir_ou_creer_collection(nom_collection)
+    count = collection.count()
+    
+    if count == 0:
+        messages = MessagesCollection([], [], None, [], {})
+    else:
+        # Métadonnées seulement : les textes représentent l'essentiel du volume
+        tous_messages = collection.get(
+            include=["metadatas"],
+            limit=count
+        )
+        ids = tous_messages["ids"]
+        metadatas = tous_messages["metadatas"] or [{}] * len(ids)
+        # Propriétaire stocké à l'indexation, sinon détecté sur la collection
+        proprietaire = metadatas[0].get("proprietaire") or detecter_proprietaire(metadatas)
+        # Conversations regroupées une fois par chargement, pas à chaque requête
+        interlocuteurs = [interlocuteur_message(metadata, proprietaire) for metadata in metadatas]
+        conversations = resumer_conversations(ids, metadatas, interlocuteurs)
+        positions_par_contact: Dict[str, List[int]] = {}
+        for position, interlocuteur in enumerate(interlocuteurs):
+            positions_par_contact.setdefault(interlocuteur, []).append(position)
+        # IDs de chaque conversation en ordre chronologique : une page de
+        # conversation se lit directement par tranche d'IDs
+        ids_par_contact: Dict[str, List[str]] = {
+            interlocuteur: [
+                ids[position]
+                for position in sorted(positions, key=lambda i: metadatas[i].get("timestamp") or "")
+            ]
+            for interlocuteur, positions in positions_par_contact.items()
+        }
+        messages = MessagesCollection(ids, metadatas, proprietaire, conversations, ids_par_contact)
+    
+    _cache_messages[cle] = (maintenant, messages)
+    return messages
+
+
+def _proprietaire_collection(
+    db: BaseVectorielle,
+    nom_collection: str,
+) -> Optional[Tuple[Optional[str], bool]]:
+    """Retourne le propriétaire d'une collection sans charger tous ses messages si possible.
+
+    Les collections indexées avec l'interlocuteur dans les métadonnées portent
+    aussi le propriétaire : un seul message suffit. Les anciennes collections
+    passent par _charger_messages (détection sur l'ensemble des messages).
+
+    Args:
+        db: Base vectorielle contenant la collection
+        nom_collection: Nom de la collection de messages
+
+    Returns:
+        (propriétaire, interlocuteur indexé), ou None si la collection est vide
+    """
+    if _instantane_en_cache(db, nom_collection) is None:
+        collection = db.obtenir_ou_creer_collection(nom_collection)
+        premier = collection.get(limit=1, include=["metadatas"])
+        if not premier["ids"]:
+            return None
+        metadata = (premier["metadatas"] or [{}])[0]
+        if "interlocuteur" in metadata:
+            return metadata.get("proprietaire") or None, True
+    
+    tous_messages = _charger_messages(db, nom_collection)
+    if not tous_messages.ids:
+        return None
+    return tous_messages.proprietaire, tous_messages.interlocuteur_indexe
+
+
+def _messages_du_contact(
+    db: BaseVectorielle,
+    nom_collection: str,
+    contact: str,
+    proprietaire: Optional[str],
+    interlocuteur_indexe: bool,
+    contient: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Récupère les messages d'une conversation.
+
+    Si l'instantané de la collection est en cache, son index inversé donne
+    directement les IDs de la conversation (lecture par clé primaire).
+    Sinon, filtre ChromaDB : si l'interlocuteur est stocké dans les
+    métadonnées, ChromaDB renvoie directement la conversation ; à défaut,
+    seuls les messages où le contact apparaît en from ou en to sont lus, puis
+    la règle d'interlocuteur est vérifiée sur ce sous-ensemble.
+
+    Args:
+        db: Base vectorielle contenant la collection
+        nom_collection: Nom de la collection de messages
+        contact: Numéro de l'interlocuteur recherché
+        proprietaire: Propriétaire de la collection
+        interlocuteur_indexe: True si les métadonnées portent "interlocuteur"
+        contient: Sous-chaîne exigée dans le texte (filtre where_document de
+            ChromaDB, sensible à la casse), None pour tous les messages
+        offset: Nombre de messages à sauter (ordre chronologique)
+        limit: Nombre maximal de messages renvoyés (None = tous)
+
+    Returns:
+        Tuple (page de {"id", "document", "metadata", "timestamp"} triée
+        chronologiquement, nombre total de messages de la conversation)
+    """
+    collection = db.obtenir_ou_creer_collection(nom_collection)
+    filtre_document = {"$contains": contient} if contient else None
+    fin = None if limit is None else offset + limit
+    total = None
+    instantane = _instantane_en_cache(db, nom_collection)
+    if instantane is not None:
+        ids_contact = instantane.ids_par_contact.get(contact)
+        if not ids_contact:
+            return [], 0
+        if contient is None:
+            # IDs déjà en ordre chronologique : seule la page est lue
+            total = len(ids_contact)
+            ids_contact = ids_contact[offset:fin]
+            if not ids_contact:
+                return [], total
+        candidats = collection.get(
+            ids=ids_contact,
+            where_document=filtre_document,
+            include=["documents", "metadatas"]
+        )
+    else:
+        if interlocuteur_indexe:
+            filtre = {"interlocuteur": contact}
+        else:
+            filtre = {"$or": [{"from": contact}, {"to": contact}]}
+        candidats = collection.get(
+            where=filtre,
+            where_document=filtre_document,
+            include=["documents", "metadatas"]
+        )
+    
+    ids = candidats["ids"]
+    metadatas = candidats["metadatas"] or [{}] * len(ids)
+    documents = candidats["documents"] or [""] * len(ids)
+    
+    messages = [
+        {
+            "id": msg_id,
+            "document": document,
+            "metadata": metadata,
+            "timestamp": metadata.get("timestamp") or ""
+        }
+        for msg_id, document, metadata in zip(ids, documents, metadatas)
+        if interlocuteur_message(metadata, proprietaire) == contact
+    ]
+    
+    # Trier chronologiquement (clé itemgetter : pas de lambda par comparaison)
+    messages.sort(key=_cle_timestamp)
+    if total is None:
+        total = len(messages)
+        messages = messages[offset:fin]
+    return messages, total
+
+
+def invalider_cache_messages(nom_collection: Optional[str] = None) -> None:
+    """Vide le cache des messages (d'une collection, ou de toutes si None).
+
+    Args:
+        nom_collection: Collection modifiée (None = toutes)
+    """
+    if nom_collection is None:
+        _cache_messages.clear()
+        _cache_liste_conversations.clear()
+        return
+    for cle in [cle for cle in _cache_messages if cle[1] == nom_collection]:
+        _cache_messages.pop(cle, None)
+    for cle in [cle for cle in _cache_liste_conversations if cle[1] == nom_collection]:
+        _cache_liste_conversations.pop(cle, None)
+
+
 @bp_conversations.route("/conversations", methods=["GET"])
-def lister_conversations() -> tuple[Dict[str, Any], int]:
+def lister_conversations() -> Response:
     """Liste toutes les conversations disponibles (groupées par contact).
 
     Query params:
@@ -34,128 +405,65 @@ def lister_conversations() -> tuple[Dict[str, Any], int]:
         nom_collection = request.args.get("collection", "messages_cas1")
         
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
-        # Récupérer tous les messages
-        collection = db.obtenir_ou_creer_collection(nom_collection)
-        count = collection.count()
+        # Réponse déjà construite récemment
+        cle_cache = (str(db.chemin_persistance), nom_collection)
+        maintenant = time.monotonic()
+        en_cache = _cache_liste_conversations.get(cle_cache)
+        if en_cache is not None and maintenant - en_cache[0] <= DUREE_CACHE_MESSAGES_SEC:
+            return Response(en_cache[1], status=200, mimetype="application/json")
         
-        if count == 0:
-            return jsonify({
-                "succes": True,
-                "conversations": [],
-                "total": 0
-            }), 200
-        
-        tous_messages = collection.get(
-            include=["documents", "metadatas"],
-            limit=count
-        )
-        
-        if not tous_messages["ids"]:
-            return jsonify({
-                "succes": True,
-                "conversations": [],
-                "total": 0
-            }), 200
-        
-        # Détecter le propriétaire du téléphone (le numéro qui apparaît le plus souvent)
-        numero_counts = {}
-        for i, msg_id in enumerate(tous_messages["ids"]):
-            metadata = tous_messages["metadatas"][i] if tous_messages["metadatas"] else {}
-            from_num = metadata.get("from", "")
-            to_num = metadata.get("to", "")
-            
-            if from_num:
-                numero_counts[from_num] = numero_counts.get(from_num, 0) + 1
-            if to_num:
-                numero_counts[to_num] = numero_counts.get(to_num, 0) + 1
-        
-        # Le propriétaire est le numéro qui apparaît le plus
-        proprietaire = max(numero_counts.items(), key=lambda x: x[1])[0] if numero_counts else None
-        
-        print(f"Propriétaire détecté: {proprietaire}")
-        
-        # Grouper par interlocuteur (l'autre personne dans la conversation)
-        conversations_map = {}
+        # Résumés précalculés à l'indexation : la collection n'est pas parcourue
+        # (recalculés si elle a changé depuis, nombre de messages différent)
+        collection = db.obtenir_ou_creer_collection(nom_collection)
+        conversations_resumees = lire_resumes(db.chemin_persistance, nom_collection, collection.count())
         
-        for i, msg_id in enumerate(tous_messages["ids"]):
-            metadata = tous_messages["metadatas"][i] if tous_messages["metadatas"] else {}
-            document = tous_messages["documents"][i] if tous_messages["documents"] else ""
-            
-            from_num = metadata.get("from", "")
-            to_num = metadata.get("to", "")
-            
-            # Identifier l'interlocuteur (l'autre personne que le propriétaire)
-            if from_num == proprietaire:
-                interlocuteur = to_num
-            elif to_num == proprietaire:
-                interlocuteur = from_num
-            else:
-                # Si ni from ni to n'est le propriétaire, prendre from ou to selon direction
-                direction = metadata.get("direction", "")
-                interlocuteur = from_num if direction == "incoming" else to_num
-            
-            contact_name = metadata.get("contact_name", interlocuteur)
+        if conversations_resumees is None:
+            # Récupérer tous les messages (et le propriétaire détecté)
+            tous_messages = _charger_messages(db, nom_collection)
             
-            # Clé unique pour l'interlocuteur
-            cle_contact = interlocuteur or "inconnu"
+            if not tous_messages.ids:
+                return _json({
+                    "succes": True,
+                    "conversations": [],
+                    "total": 0
+                }, 200)
             
-            if cle_contact not in conversations_map:
-                conversations_map[cle_contact] = {
-                    "contact": interlocuteur,
-                    "contact_name": contact_name,
-                    "messages": [],
-                    "dernier_message": None,
-                    "dernier_timestamp": None,
-                    "nombre_messages": 0
-                }
+            logger.debug("Propriétaire détecté: %s", tous_messages.proprietaire)
             
-            # Ajouter le message à la conversation
-            timestamp = metadata.get("timestamp", "")
-            conversations_map[cle_contact]["messages"].append({
-                "id": msg_id,
-                "document": document,
-                "metadata": metadata,
-                "timestamp": timestamp
-            })
+            # Textes des seuls derniers messages (un par conversation), en une requête
+            apercus = collection.get(
+                ids=[conv["dernier_id"] for conv in tous_messages.conversations],
+                include=["documents"]
+            )
+            document_par_id = dict(zip(apercus["ids"], apercus["documents"] or []))
+            conversations_resumees = resumes_avec_apercus(tous_messages.conversations, document_par_id)
             
-            # Mettre à jour le dernier message
-            conversations_map[cle_contact]["nombre_messages"] += 1
-            if not conversations_map[cle_contact]["dernier_timestamp"] or timestamp > conversations_map[cle_contact]["dernier_timestamp"]:
-                conversations_map[cle_contact]["dernier_timestamp"] = timestamp
-                conversations_map[cle_contact]["dernier_message"] = document[:100] + ("..." if len(document) > 100 else "")
-        
-        # Trier les conversations par date du dernier message (plus récent en premier)
-        conversations_liste = list(conversations_map.values())
-        conversations_liste.sort(key=lambda x: x["dernier_timestamp"] or "", reverse=True)
-        
-        # Ne pas retourner tous les messages dans cette route (juste les stats)
-        conversations_resumees = []
-        for conv in conversations_liste:
-            conversations_resumees.append({
-                "contact": conv["contact"],
-                "contact_name": conv["contact_name"],
-                "dernier_message": conv["dernier_message"],
-                "dernier_timestamp": conv["dernier_timestamp"],
-                "nombre_messages": conv["nombre_messages"]
-            })
-        
-        return jsonify({
+            # Collection indexée avant les résumés précalculés : ils sont
+            # enregistrés maintenant pour les prochains démarrages
+            try:
+                enregistrer_resumes(db.chemin_persistance, nom_collection, conversations_resumees)
+            except sqlite3.Error as e:
+                logger.warning("Résumés de conversations non enregistrés: %s", e)
+        
+        corps = _encoder({
             "succes": True,
             "conversations": conversations_resumees,
             "total": len(conversations_resumees)
-        }), 200
+        })
+        _cache_liste_conversations[cle_cache] = (maintenant, corps)
+        return Response(corps, status=200, mimetype="application/json")
         
     except Exception as e:
-        return jsonify({
+        return _json({
             "succes": False,
             "erreur": str(e)
-        }), 500
+        }, 500)
 
 
 @bp_conversations.route("/conversation/<contact>", methods=["GET"])
-def obtenir_conversation(contact: str) -> tuple[Dict[str, Any], int]:
+def obtenir_conversation(contact: str) -> Response:
     """Obtient tous les messages d'une conversation avec un contact spécifique.
 
     Args:
@@ -163,106 +471,72 @@ def obtenir_conversation(contact: str) -> tuple[Dict[str, Any], int]:
 
     Query params:
         collection: nom de la collection (défaut: messages_cas1)
+        offset: nombre de messages à sauter (défaut: 0)
+        limit: taille de la page (défaut: toute la conversation)
+        stream: "ndjson" pour recevoir un message par ligne (voir
+            _ndjson_conversation)
 
     Returns:
-        JSON avec tous les messages de la conversation, triés chronologiquement
+        JSON avec les messages de la conversation, triés chronologiquement
+        (avec total, offset et limit si une page est demandée)
     """
     try:
         nom_collection = request.args.get("collection", "messages_cas1")
+        offset = max(0, int(request.args.get("offset", "0")))
+        limit = request.args.get("limit")
+        limit = max(0, int(limit)) if limit is not None else None
         
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
-        # Récupérer tous les messages
-        collection = db.obtenir_ou_creer_collection(nom_collection)
-        count = collection.count()
+        # Propriétaire (stocké dans les métadonnées, sinon détecté sur la collection)
+        infos = _proprietaire_collection(db, nom_collection)
         
-        if count == 0:
-            return jsonify({
+        if infos is None:
+            return _json({
                 "succes": False,
                 "erreur": "Collection vide"
-            }), 404
+            }, 404)
         
-        tous_messages = collection.get(
-            include=["documents", "metadatas"],
-            limit=count
-        )
-        
-        if not tous_messages["ids"]:
-            return jsonify({
-                "succes": False,
-                "erreur": "Aucun message trouvé"
-            }), 404
-        
-        # Détecter le propriétaire du téléphone (même logique que lister_conversations)
-        numero_counts = {}
-        for i in range(len(tous_messages["ids"])):
-            metadata = tous_messages["metadatas"][i] if tous_messages["metadatas"] else {}
-            from_num = metadata.get("from", "")
-            to_num = metadata.get("to", "")
-            
-            if from_num:
-                numero_counts[from_num] = numero_counts.get(from_num, 0) + 1
-            if to_num:
-                numero_counts[to_num] = numero_counts.get(to_num, 0) + 1
-        
-        proprietaire = max(numero_counts.items(), key=lambda x: x[1])[0] if numero_counts else None
-        
-        print(f"obtenir_conversation - Propriétaire détecté: {proprietaire}, Contact recherché: {contact}")
+        proprietaire, interlocuteur_indexe = infos
         
-        # Filtrer les messages pour cette conversation (tous les messages où l'interlocuteur est le contact)
-        messages_conversation = []
+        if request.args.get("stream") == "ndjson":
+            return _ndjson_conversation(db, nom_collection, contact, offset, limit)
         
-        for i, msg_id in enumerate(tous_messages["ids"]):
-            metadata = tous_messages["metadatas"][i] if tous_messages["metadatas"] else {}
-            document = tous_messages["documents"][i] if tous_messages["documents"] else ""
-            
-            from_num = metadata.get("from", "")
-            to_num = metadata.get("to", "")
-            
-            # Identifier l'interlocuteur pour ce message
-            if from_num == proprietaire:
-                interlocuteur = to_num
-            elif to_num == proprietaire:
-                interlocuteur = from_num
-            else:
-                direction = metadata.get("direction", "")
-                interlocuteur = from_num if direction == "incoming" else to_num
-            
-            # Si l'interlocuteur correspond au contact recherché, ajouter le message
-            if interlocuteur == contact:
-                messages_conversation.append({
-                    "id": msg_id,
-                    "document": document,
-                    "metadata": metadata,
-                    "timestamp": metadata.get("timestamp", "")
-                })
+        logger.debug("obtenir_conversation - Propriétaire détecté: %s, Contact recherché: %s", proprietaire, contact)
         
-        # Trier chronologiquement
-        messages_conversation.sort(key=lambda x: x["timestamp"] or "")
+        # Messages de cette conversation (filtre appliqué par ChromaDB, triés chronologiquement)
+        messages_conversation, total = _messages_du_contact(
+            db, nom_collection, contact, proprietaire, interlocuteur_indexe,
+            offset=offset, limit=limit
+        )
         
         # Informations du contact
         contact_info = {
             "contact": contact,
             "contact_name": messages_conversation[0]["metadata"].get("contact_name", contact) if messages_conversation else contact,
-            "nombre_messages": len(messages_conversation)
+            "nombre_messages": total
         }
         
-        return jsonify({
+        entete = {
             "succes": True,
-            "conversation": contact_info,
-            "messages": messages_conversation
-        }), 200
+            "conversation": contact_info
+        }
+        if limit is not None:
+            entete.update({"total": total, "offset": offset, "limit": limit})
+        
+        # Corps envoyé par morceaux : une conversation peut peser plusieurs Mo
+        return _json_en_flux(entete, "messages", messages_conversation)
         
     except Exception as e:
-        return jsonify({
+        return _json({
             "succes": False,
             "erreur": str(e)
-        }), 500
+        }, 500)
 
 
 @bp_conversations.route("/conversation/<contact>/search", methods=["POST"])
-def rechercher_dans_conversation(contact: str) -> tuple[Dict[str, Any], int]:
+def rechercher_dans_conversation(contact: str) -> Response:
     """Recherche par mots-clés dans une conversation spécifique.
 
     Args:
@@ -281,77 +555,50 @@ def rechercher_dans_conversation(contact: str) -> tuple[Dict[str, Any], int]:
         nom_collection = data.get("collection", "messages_cas1")
         
         if not query:
-            return jsonify({
+            return _json({
                 "succes": False,
                 "erreur": "Requête vide"
-            }), 400
+            }, 400)
         
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
-        # Récupérer tous les messages de la conversation
-        collection = db.obtenir_ou_creer_collection(nom_collection)
-        count = collection.count()
-        
-        tous_messages = collection.get(
-            include=["documents", "metadatas"],
-            limit=count if count > 0 else 10000
-        )
-        
-        # Détecter le propriétaire (même logique)
-        numero_counts = {}
-        for i in range(len(tous_messages["ids"])):
-            metadata = tous_messages["metadatas"][i] if tous_messages["metadatas"] else {}
-            from_num = metadata.get("from", "")
-            to_num = metadata.get("to", "")
-            
-            if from_num:
-                numero_counts[from_num] = numero_counts.get(from_num, 0) + 1
-            if to_num:
-                numero_counts[to_num] = numero_counts.get(to_num, 0) + 1
-        
-        proprietaire = max(numero_counts.items(), key=lambda x: x[1])[0] if numero_counts else None
-        
-        # Filtrer par interlocuteur et par mot-clé
-        messages_trouves = []
-        
-        for i, msg_id in enumerate(tous_messages["ids"]):
-            metadata = tous_messages["metadatas"][i] if tous_messages["metadatas"] else {}
-            document = tous_messages["documents"][i] if tous_messages["documents"] else ""
-            
-            from_num = metadata.get("from", "")
-            to_num = metadata.get("to", "")
-            
-            # Identifier l'interlocuteur
-            if from_num == proprietaire:
-                interlocuteur = to_num
-            elif to_num == proprietaire:
-                interlocuteur = from_num
-            else:
-                direction = metadata.get("direction", "")
-                interlocuteur = from_num if direction == "incoming" else to_num
-            
-            # Si l'interlocuteur correspond et le terme est dans le message
-            if interlocuteur == contact and query in document.lower():
-                messages_trouves.append({
-                    "id": msg_id,
-                    "document": document,
-                    "metadata": metadata,
-                    "timestamp": metadata.get("timestamp", "")
-                })
-        
-        # Trier chronologiquement
-        messages_trouves.sort(key=lambda x: x["timestamp"] or "")
-        
-        return jsonify({
+        # Propriétaire (stocké dans les métadonnées, sinon détecté sur la collection)
+        infos = _proprietaire_collection(db, nom_collection)
+        if infos is None:
+            return _json({
+                "succes": True,
+                "resultats": [],
+                "total": 0
+            }, 200)
+        proprietaire, interlocuteur_indexe = infos
+        
+        # Messages de la conversation (filtre ChromaDB, ordre chronologique
+        # conservé), puis filtre par mot-clé.
+        # where_document $contains est sensible à la casse : il n'est confié
+        # à ChromaDB que pour une requête sans lettres à casse (numéro,
+        # montant...), où il équivaut à la recherche insensible à la casse.
+        contient = query if query.upper() == query else None
+        # Motif compilé une fois, insensible à la casse : pas de copie
+        # .lower() de chaque document
+        motif = re.compile(re.escape(query), re.IGNORECASE)
+        messages_trouves = [
+            message
+            for message in _messages_du_contact(
+                db, nom_collection, contact, proprietaire, interlocuteur_indexe, contient
+            )[0]
+            if motif.search(message["document"])
+        ]
+        
+        return _json({
             "succes": True,
             "resultats": messages_trouves,
             "total": len(messages_trouves)
-        }), 200
+        }, 200)
         
     except Exception as e:
-        return jsonify({
+        return _json({
             "succes": False,
             "erreur": str(e)
-        }), 500
+        }, 500)
 
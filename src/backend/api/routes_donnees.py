@@ -2,22 +2,61 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from flask import Blueprint, jsonify, request
 
-# Ajouter le répertoire racine au path pour les imports
-racine_projet = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(racine_projet))
-
+# Pas de manipulation de sys.path : importer src.backend.api implique déjà
+# que la racine du projet est sur le path (app.py l'ajoute au démarrage)
 from config.settings import obtenir_parametres
-from src.backend.database.vector_db import BaseVectorielle
+from src.backend.database.vector_db import BaseVectorielle, obtenir_base_vectorielle
 
 # Blueprint pour les routes d'accès aux données
 bp_donnees = Blueprint("donnees", __name__, url_prefix="/api")
 
+# Position de chaque ID dans l'ordre de stockage ChromaDB, par collection,
+# mise en cache 60 s : /api/context ne lit ensuite que la fenêtre demandée
+DUREE_CACHE_POSITIONS_SEC = 60.0
+_cache_positions: Dict[Tuple[str, str], Tuple[float, Dict[str, int]]] = {}
+
+
+def _positions_ids(db: BaseVectorielle, nom_collection: str) -> Dict[str, int]:
+    """Retourne la position de chaque message dans l'ordre de stockage (IDs seuls lus).
+
+    Args:
+        db: Base vectorielle contenant la collection
+        nom_collection: Nom de la collection
+
+    Returns:
+        Dictionnaire ID -> position (vide si la collection est vide)
+    """
+    cle = (str(db.chemin_persistance), nom_collection)
+    maintenant = time.monotonic()
+    en_cache = _cache_positions.get(cle)
+    if en_cache is not None and maintenant - en_cache[0] <= DUREE_CACHE_POSITIONS_SEC:
+        return en_cache[1]
+    
+    collection = db.obtenir_ou_creer_collection(nom_collection)
+    count = collection.count()
+    ids = collection.get(include=[], limit=count)["ids"] if count > 0 else []
+    positions = {msg_id: i for i, msg_id in enumerate(ids)}
+    _cache_positions[cle] = (maintenant, positions)
+    return positions
+
+
+def invalider_cache_positions(nom_collection: Optional[str] = None) -> None:
+    """Vide le cache des positions (d'une collection, ou de toutes si None).
+
+    Args:
+        nom_collection: Collection modifiée (None = toutes)
+    """
+    if nom_collection is None:
+        _cache_positions.clear()
+        return
+    for cle in [cle for cle in _cache_positions if cle[1] == nom_collection]:
+        _cache_positions.pop(cle, None)
+
 
 @bp_donnees.route("/message/<message_id>", methods=["GET"])
 def obtenir_message(message_id: str) -> tuple[Dict[str, Any], int]:
@@ -36,7 +75,7 @@ def obtenir_message(message_id: str) -> tuple[Dict[str, Any], int]:
         nom_collection = request.args.get("collection", "messages")
         
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
         # Récupérer le message par ID
         collection = db.obtenir_ou_creer_collection(nom_collection)
@@ -88,37 +127,48 @@ def obtenir_contexte(message_id: str) -> tuple[Dict[str, Any], int]:
         fenetre_apres = int(request.args.get("fenetre_apres", 5))
         
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
-        # Récupérer tous les messages de la collection
         collection = db.obtenir_ou_creer_collection(nom_collection)
-        count = collection.count()
-        
-        tous_messages = collection.get(
-            include=["documents", "metadatas"],
-            limit=count if count > 0 else 10000
-        )
         
-        if not tous_messages["ids"]:
-            return jsonify({
-                "succes": False,
-                "erreur": "Collection vide"
-            }), 404
-        
-        # Trouver l'index du message cible
-        try:
-            index_cible = tous_messages["ids"].index(message_id)
-        except ValueError:
+        # Position du message cible (dictionnaire en cache, au plus une
+        # relecture si la collection a changé depuis)
+        for tentative in range(2):
+            positions = _positions_ids(db, nom_collection)
+            
+            if not positions:
+                return jsonify({
+                    "succes": False,
+                    "erreur": "Collection vide"
+                }), 404
+            
+            index_cible = positions.get(message_id)
+            if index_cible is None:
+                if tentative == 0:
+                    invalider_cache_positions(nom_collection)
+                    continue
+                return jsonify({
+                    "succes": False,
+                    "erreur": f"Message '{message_id}' introuvable"
+                }), 404
+            
+            # Seule la fenêtre autour du message est lue dans ChromaDB
+            index_debut = max(0, index_cible - fenetre_avant)
+            fenetre = collection.get(
+                offset=index_debut,
+                limit=index_cible + fenetre_apres + 1 - index_debut,
+                include=["documents", "metadatas"]
+            )
+            if fenetre["ids"][index_cible - index_debut:index_cible - index_debut + 1] == [message_id]:
+                break
+            invalider_cache_positions(nom_collection)
+        else:
             return jsonify({
                 "succes": False,
                 "erreur": f"Message '{message_id}' introuvable"
             }), 404
         
-        # Extraire le contexte
-        index_debut = max(0, index_cible - fenetre_avant)
-        index_fin = min(len(tous_messages["ids"]), index_cible + fenetre_apres + 1)
-        
-        contexte = _extraire_contexte(tous_messages, index_debut, index_fin, index_cible)
+        contexte = _extraire_contexte(fenetre, 0, len(fenetre["ids"]), index_cible - index_debut)
         
         return jsonify({
             "succes": True,
@@ -5,23 +5,31 @@ from __future__ import annotations
 import base64
 import json
 import logging
-import sys
+import sqlite3
 import threading
+import time
 import uuid
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context
 
-# Ajouter le répertoire racine au path pour les imports
+# Racine du projet (résolution des chemins d'images relatifs) ; pas de
+# manipulation de sys.path, app.py ajoute déjà la racine au démarrage
 racine_projet = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(racine_projet))
 
 from config.settings import obtenir_parametres
 import os
-from urllib.parse import unquote
+from urllib.parse import quote, unquote
 from src.backend.database.image_indexer import indexer_csv_images
-from src.backend.database.vector_db import BaseVectorielle
+from src.backend.database.index_images import (
+    calculer_index_images,
+    compter_images_indexees,
+    enregistrer_index_images,
+    lire_ids_tries,
+)
+from src.backend.database.vector_db import obtenir_base_vectorielle
 
 # Configuration du logger
 logging.basicConfig(level=logging.INFO)
@@ -30,10 +38,156 @@ logger = logging.getLogger(__name__)
 # Blueprint pour les routes d'images
 bp_images = Blueprint("images", __name__, url_prefix="/api")
 
-# Stockage des tâches d'indexation d'images
+# Stockage des tâches d'indexation d'images. Le verrou ne protège que le
+# dictionnaire (ajout et lecture d'une tâche) ; chaque tâche a sa propre
+# condition, qui protège ses champs et réveille ses flux SSE : les mises à
+# jour d'une tâche ne bloquent ni les autres tâches ni leurs clients.
 _taches_images: Dict[str, Dict[str, Any]] = {}
 _taches_images_lock = threading.Lock()
 
+# Derniers événements de progression conservés par tâche
+NOMBRE_MAX_EVENEMENTS_TACHE = 64
+
+# Sans mise à jour pendant ce délai, le flux SSE envoie un commentaire de
+# maintien (détecte aussi les clients déconnectés)
+DELAI_MAINTIEN_SSE_SEC = 15.0
+
+# Images triées de la galerie par (base, collection, limite, tri), mises en
+# cache 60 s : la collection d'images ne change qu'à l'indexation (qui vide
+# le cache). Les pages (offset/limit) sont découpées dans cette liste.
+DUREE_CACHE_GALERIE_SEC = 60.0
+NOMBRE_MAX_GALERIES_EN_CACHE = 32
+_cache_galerie: Dict[Tuple[str, str, int, str], Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def invalider_cache_galerie() -> None:
+    """Vide le cache de la galerie (après indexation ou suppression d'images)."""
+    _cache_galerie.clear()
+
+
+# Durée de cache navigateur des images servies (fichiers du dossier de cas,
+# qui ne changent pas une fois extraits)
+DUREE_CACHE_IMAGES_SEC = 86400
+
+# Mimetype des images servies, par extension (autres : application/octet-stream)
+MIMETYPES_IMAGES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+# Derrière nginx : préfixe d'une location interne qui sert le dossier Cas/
+# (ex. "/protected_images/" avec "location /protected_images/ { internal;
+# alias /chemin/vers/Cas/; }"). Si la variable est définie, les images de
+# Cas/ sont envoyées par nginx (en-tête X-Accel-Redirect) sans passer par
+# le processus Flask.
+PREFIXE_X_ACCEL_REDIRECT = os.environ.get("OPSEMIA_X_ACCEL_REDIRECT")
+
+# Index nom de fichier -> chemin des fichiers sous Cas/, pour le dernier
+# recours de servir_image (au lieu d'un rglob de toute l'arborescence par
+# requête). Reconstruit au plus une fois par minute sur un nom inconnu.
+DUREE_INDEX_IMAGES_CAS_SEC = 60.0
+_index_images_cas: Optional[Tuple[float, Dict[str, Path]]] = None
+_index_images_cas_lock = threading.Lock()
+
+
+def _chercher_image_cas(nom_fichier: str) -> Optional[Path]:
+    """Cherche un fichier par son nom sous Cas/ via l'index en mémoire.
+
+    Args:
+        nom_fichier: Nom du fichier (sans dossier)
+
+    Returns:
+        Chemin du premier fichier de ce nom, ou None
+    """
+    global _index_images_cas
+    with _index_images_cas_lock:
+        if _index_images_cas is not None:
+            chemin = _index_images_cas[1].get(nom_fichier)
+            if chemin is not None and chemin.is_file():
+                return chemin
+            if time.monotonic() - _index_images_cas[0] <= DUREE_INDEX_IMAGES_CAS_SEC:
+                return None
+        
+        # os.walk : un seul parcours, sans stat() par entrée
+        index: Dict[str, Path] = {}
+        for dossier, _, fichiers in os.walk(racine_projet / "Cas"):
+            for nom in fichiers:
+                index.setdefault(nom, Path(dossier) / nom)
+        _index_images_cas = (time.monotonic(), index)
+        return index.get(nom_fichier)
+
+
+def _invalider_index_images_cas() -> None:
+    """Force la reconstruction de l'index des fichiers de Cas/ (nouvelles images indexées)."""
+    global _index_images_cas
+    with _index_images_cas_lock:
+        _index_images_cas = None
+    _chemins_images.clear()
+
+
+# Chemins d'images déjà résolus (chemin de l'URL -> fichier), gardés jusqu'à
+# la prochaine indexation d'images : la galerie redemande sans cesse les
+# mêmes images, qui n'ont alors plus besoin d'aucun stat() pour être
+# retrouvées. Seuls les fichiers trouvés sont retenus : un chemin introuvable
+# repasse par l'index de Cas/ (reconstruit au plus une fois par minute).
+NOMBRE_MAX_CHEMINS_IMAGES = 8192
+_chemins_images: Dict[str, str] = {}
+
+
+def _resoudre_chemin_image(chemin_image: str) -> Optional[str]:
+    """Trouve le fichier désigné par un chemin d'image (fichiers trouvés mis en cache).
+
+    Args:
+        chemin_image: Chemin relatif ou absolu, tel que reçu dans l'URL
+
+    Returns:
+        Chemin du fichier, ou None s'il est introuvable
+    """
+    chemin_resolu = _chemins_images.get(chemin_image)
+    if chemin_resolu is None:
+        chemin_resolu = _chercher_chemin_image(chemin_image)
+        if chemin_resolu is not None:
+            if len(_chemins_images) >= NOMBRE_MAX_CHEMINS_IMAGES:
+                _chemins_images.clear()
+            _chemins_images[chemin_image] = chemin_resolu
+    return chemin_resolu
+
+
+def _chercher_chemin_image(chemin_image: str) -> Optional[str]:
+    """Cherche le fichier désigné par un chemin d'image.
+
+    Essaie le chemin tel quel, puis relatif à la racine du projet, puis
+    relatif à Cas/, et en dernier recours cherche le nom de fichier sous
+    Cas/.
+
+    Args:
+        chemin_image: Chemin relatif ou absolu, tel que reçu dans l'URL
+
+    Returns:
+        Chemin du fichier, ou None s'il est introuvable
+    """
+    # Décoder et normaliser le chemin (gérer les backslashes Windows)
+    chemin_str = os.path.normpath(unquote(chemin_image).replace("\\", "/"))
+
+    candidats = [
+        Path(chemin_str),                   # 1) Chemin tel quel
+        racine_projet / chemin_str,         # 2) Relatif à la racine du projet
+        racine_projet / "Cas" / chemin_str, # 3) Relatif au dossier Cas/
+    ]
+    for candidat in candidats:
+        if candidat.is_file():
+            return str(candidat)
+
+    try:
+        # 4) Dernier recours : recherche par nom de fichier dans Cas/**
+        chemin_trouve = _chercher_image_cas(Path(chemin_str).name)
+    except Exception:
+        return None
+    return str(chemin_trouve) if chemin_trouve is not None else None
+
 
 @bp_images.route("/load_images", methods=["POST"])
 def charger_images() -> tuple[Dict[str, Any], int]:
@@ -77,55 +231,64 @@ def charger_images() -> tuple[Dict[str, Any], int]:
         
         # Créer une nouvelle tâche
         task_id = str(uuid.uuid4())
+        tache = {
+            "etat": "en_cours",
+            "progression": 0,
+            "etape": "initialisation",
+            "message": "Démarrage...",
+            "statistiques": None,
+            "erreur": None,
+            "evenements": deque(maxlen=NOMBRE_MAX_EVENEMENTS_TACHE),
+            "condition": threading.Condition()
+        }
         with _taches_images_lock:
-            _taches_images[task_id] = {
-                "etat": "en_cours",
-                "progression": 0,
-                "etape": "initialisation",
-                "message": "Démarrage...",
-                "statistiques": None,
-                "erreur": None,
-                "evenements": []
-            }
+            _taches_images[task_id] = tache
         
-        # Fonction de callback pour la progression
+        # Fonction de callback pour la progression (verrou de la tâche seulement)
         def on_progress(etape: str, pct: float, msg: str):
-            with _taches_images_lock:
-                if task_id in _taches_images:
-                    _taches_images[task_id]["progression"] = pct
-                    _taches_images[task_id]["etape"] = etape
-                    _taches_images[task_id]["message"] = msg
-                    _taches_images[task_id]["evenements"].append({
-                        "etape": etape,
-                        "progression": pct,
-                        "message": msg
-                    })
+            with tache["condition"]:
+                tache["progression"] = pct
+                tache["etape"] = etape
+                tache["message"] = msg
+                tache["evenements"].append({
+                    "etape": etape,
+                    "progression": pct,
+                    "message": msg
+                })
+                tache["condition"].notify_all()
         
         # Fonction d'indexation dans un thread
         def run_indexation():
             try:
                 logger.info(f"🚀 Début indexation images tâche {task_id}: {chemin_csv}")
                 parametres = obtenir_parametres()
-                stats = indexer_csv_images(
-                    chemin_csv=chemin_csv,
-                    parametres=parametres,
-                    nom_cas=nom_cas,
-                    reinitialiser=reinitialiser,
-                    progress_callback=on_progress
-                )
+                try:
+                    stats = indexer_csv_images(
+                        chemin_csv=chemin_csv,
+                        parametres=parametres,
+                        nom_cas=nom_cas,
+                        reinitialiser=reinitialiser,
+                        progress_callback=on_progress
+                    )
+                finally:
+                    # La collection d'images a pu être supprimée puis recréée,
+                    # même si l'indexation a échoué ensuite (reinitialiser=True)
+                    obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA).oublier_collections()
+                    invalider_cache_galerie()
+                    _invalider_index_images_cas()
                 
-                with _taches_images_lock:
-                    if task_id in _taches_images:
-                        _taches_images[task_id]["etat"] = "termine"
-                        _taches_images[task_id]["statistiques"] = stats
-                        logger.info(f"✅ Indexation images terminée tâche {task_id}")
+                with tache["condition"]:
+                    tache["etat"] = "termine"
+                    tache["statistiques"] = stats
+                    tache["condition"].notify_all()
+                logger.info(f"✅ Indexation images terminée tâche {task_id}")
                         
             except Exception as e:
                 logger.error(f"❌ Erreur indexation images tâche {task_id}: {e}", exc_info=True)
-                with _taches_images_lock:
-                    if task_id in _taches_images:
-                        _taches_images[task_id]["etat"] = "erreur"
-                        _taches_images[task_id]["erreur"] = str(e)
+                with tache["condition"]:
+                    tache["etat"] = "erreur"
+                    tache["erreur"] = str(e)
+                    tache["condition"].notify_all()
         
         # Lancer le thread
         thread = threading.Thread(target=run_indexation, daemon=True)
@@ -159,19 +322,29 @@ def suivre_progression_images(task_id: str):
     
     def generate():
         """Génère les événements SSE pour la progression."""
-        import time
-        
         logger.info(f"📡 Client connecté pour SSE images task {task_id}")
         derniere_progression = -1
         
+        with _taches_images_lock:
+            tache = _taches_images.get(task_id)
+        if tache is None:
+            yield f"event: error\ndata: {json.dumps({'erreur': 'Tâche introuvable'})}\n\n"
+            return
+        condition = tache["condition"]
+        
         while True:
-            with _taches_images_lock:
-                if task_id not in _taches_images:
-                    # Tâche introuvable
-                    yield f"event: error\ndata: {json.dumps({'erreur': 'Tâche introuvable'})}\n\n"
-                    break
-                
-                tache = _taches_images[task_id]
+            # Événements préparés sous verrou, envoyés après l'avoir relâché
+            # (un client lent ne bloque pas la tâche d'indexation)
+            evenements = []
+            fin = False
+            
+            with condition:
+                # Attendre une mise à jour (notify_all) au lieu de sonder
+                if (
+                    tache["progression"] == derniere_progression
+                    and tache["etat"] not in ["termine", "erreur"]
+                ):
+                    condition.wait(timeout=DELAI_MAINTIEN_SSE_SEC)
                 
                 # Envoyer un événement seulement si la progression a changé
                 if tache["progression"] != derniere_progression:
@@ -182,31 +355,35 @@ def suivre_progression_images(task_id: str):
                         "message": tache["message"]
                     }
                     
-                    yield f"data: {json.dumps(event_data)}\n\n"
+                    evenements.append(f"data: {json.dumps(event_data)}\n\n")
                     derniere_progression = tache["progression"]
                 
                 # Si terminé ou erreur, envoyer l'événement final et fermer
-                if tache["etat"] in ["termine", "erreur"]:
-                    if tache["etat"] == "termine":
-                        event_data = {
-                            "etat": "termine",
-                            "progression": 100,
-                            "statistiques": tache["statistiques"],
-                            "message": "Indexation d'images terminée avec succès"
-                        }
-                        yield f"event: complete\ndata: {json.dumps(event_data)}\n\n"
-                        logger.info(f"✅ SSE images terminé pour task {task_id}")
-                    else:
-                        event_data = {
-                            "etat": "erreur",
-                            "erreur": tache["erreur"],
-                            "message": f"Erreur: {tache['erreur']}"
-                        }
-                        yield f"event: error\ndata: {json.dumps(event_data)}\n\n"
-                        logger.error(f"❌ SSE images erreur pour task {task_id}: {tache['erreur']}")
-                    break
-            
-            time.sleep(0.5)  # Poll toutes les 500ms
+                if tache["etat"] == "termine":
+                    event_data = {
+                        "etat": "termine",
+                        "progression": 100,
+                        "statistiques": tache["statistiques"],
+                        "message": "Indexation d'images terminée avec succès"
+                    }
+                    evenements.append(f"event: complete\ndata: {json.dumps(event_data)}\n\n")
+                    logger.info(f"✅ SSE images terminé pour task {task_id}")
+                    fin = True
+                elif tache["etat"] == "erreur":
+                    event_data = {
+                        "etat": "erreur",
+                        "erreur": tache["erreur"],
+                        "message": f"Erreur: {tache['erreur']}"
+                    }
+                    evenements.append(f"event: error\ndata: {json.dumps(event_data)}\n\n")
+                    logger.error(f"❌ SSE images erreur pour task {task_id}: {tache['erreur']}")
+                    fin = True
+        
+            if not evenements:
+                evenements.append(": maintien\n\n")
+            yield from evenements
+            if fin:
+                break
     
     return Response(
         stream_with_context(generate()),
@@ -219,27 +396,116 @@ def suivre_progression_images(task_id: str):
     )
 
 
+def _reponse_galerie(
+    images: List[Dict[str, Any]],
+    offset: int,
+    limit: Optional[int],
+    total: Optional[int] = None,
+) -> tuple[Response, int]:
+    """Construit la réponse de la galerie (liste complète, ou une page si limit est donné).
+
+    Args:
+        images: Images triées de la collection (ou la page déjà découpée si
+            total est donné)
+        offset: Position de la première image de la page
+        limit: Taille de la page (None = toutes les images)
+        total: Nombre total d'images quand images est déjà la page
+
+    Returns:
+        Réponse JSON et code HTTP
+    """
+    if limit is None:
+        return jsonify({
+            "succes": True,
+            "nombre_images": len(images),
+            "images": images
+        }), 200
+    
+    if total is None:
+        total = len(images)
+        images = images[offset:offset + limit]
+    return jsonify({
+        "succes": True,
+        "nombre_images": len(images),
+        "images": images,
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    }), 200
+
+
+def _formater_images(resultats_bruts: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Met le résultat d'un get() ChromaDB au format de la galerie."""
+    ids = resultats_bruts["ids"]
+    metadatas = resultats_bruts["metadatas"] or [{}] * len(ids)
+    documents = resultats_bruts["documents"] or [""] * len(ids)
+    return [
+        {"id": image_id, "metadata": metadata, "description": document}
+        for image_id, metadata, document in zip(ids, metadatas, documents)
+    ]
+
+
+def _lire_images(collection_obj: Any, ids: List[str]) -> List[Dict[str, Any]]:
+    """Lit des images par ID, dans l'ordre des IDs donnés."""
+    if not ids:
+        return []
+    images = _formater_images(collection_obj.get(ids=ids, include=["metadatas", "documents"]))
+    position = {image_id: i for i, image_id in enumerate(ids)}
+    images.sort(key=lambda image: position[image["id"]])
+    return images
+
+
+def _galerie_sans_index(collection_obj: Any, nombre: int, tri: str) -> List[Dict[str, Any]]:
+    """Lit et trie la galerie en Python (index de tri indisponible)."""
+    images = _formater_images(collection_obj.get(limit=nombre, include=["metadatas", "documents"]))
+    if tri == "chronologique":
+        # Plus récent d'abord
+        images.sort(key=lambda x: x["metadata"].get("timestamp", ""), reverse=True)
+    elif tri == "nom":
+        images.sort(key=lambda x: x["metadata"].get("nom_image", ""))
+    return images
+
+
 @bp_images.route("/images/galerie", methods=["GET"])
 def obtenir_galerie() -> tuple[Dict[str, Any], int]:
     """Obtient toutes les images d'une collection pour la galerie.
     
+    Le tri est fait par l'index SQLite des images (index_images), construit
+    au premier appel puis reconstruit si le nombre d'images change : seules
+    les images renvoyées sont lues dans ChromaDB.
+    
     Query params:
         collection: Nom de la collection (défaut: "images")
-        limite: Nombre maximum d'images (défaut: 1000)
+        limite: Nombre maximum d'images, les premières dans l'ordre du tri
+            (défaut: 1000)
         tri: "chronologique" ou "nom" (défaut: "chronologique")
+        offset: Position de la première image renvoyée (défaut: 0)
+        limit: Taille de la page (optionnel ; sans ce paramètre, toutes les
+            images sont renvoyées)
         
     Returns:
-        JSON avec liste d'images et métadonnées
+        JSON avec liste d'images et métadonnées (plus "total", "offset" et
+        "limit" si une page est demandée)
     """
     try:
         # Paramètres de la requête
         collection = request.args.get("collection", "images")
         limite = int(request.args.get("limite", "1000"))
         tri = request.args.get("tri", "chronologique")
+        offset = max(0, int(request.args.get("offset", "0")))
+        limit = request.args.get("limit")
+        limit = max(0, int(limit)) if limit is not None else None
         
         # Récupérer toutes les images de la collection
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        
+        cle_cache = (str(parametres.CHEMIN_BASE_CHROMA), collection, limite, tri)
+        maintenant = time.monotonic()
+        en_cache = _cache_galerie.get(cle_cache)
+        if en_cache is not None and maintenant - en_cache[0] <= DUREE_CACHE_GALERIE_SEC:
+            return _reponse_galerie(en_cache[1], offset, limit)
+        
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         
         try:
             collection_obj = db.client.get_collection(name=collection)
@@ -249,48 +515,32 @@ def obtenir_galerie() -> tuple[Dict[str, Any], int]:
                 "erreur": f"Collection '{collection}' introuvable"
             }), 404
         
-        # Récupérer tous les documents
         count = collection_obj.count()
         if count == 0:
-            return jsonify({
-                "succes": True,
-                "nombre_images": 0,
-                "images": []
-            }), 200
-        
-        resultats_bruts = collection_obj.get(
-            limit=min(limite, count),
-            include=["metadatas", "documents"]
-        )
+            return _reponse_galerie([], offset, limit)
+        nombre = max(0, min(limite, count))
         
-        # Formatter les images
-        images = []
-        for i in range(len(resultats_bruts["ids"])):
-            image_data = {
-                "id": resultats_bruts["ids"][i],
-                "metadata": resultats_bruts["metadatas"][i] if resultats_bruts["metadatas"] else {},
-                "description": resultats_bruts["documents"][i] if resultats_bruts["documents"] else "",
-            }
-            images.append(image_data)
+        try:
+            # Index de tri reconstruit s'il manque ou si la collection a changé
+            chemin = db.chemin_persistance
+            if compter_images_indexees(chemin, collection) != count:
+                enregistrer_index_images(chemin, collection, calculer_index_images(collection_obj))
+            
+            if limit is not None:
+                # Page demandée hors cache : seules ses images sont lues
+                taille_page = min(limit, max(0, nombre - offset))
+                ids_page = lire_ids_tries(chemin, collection, tri, taille_page, offset) if taille_page else []
+                return _reponse_galerie(_lire_images(collection_obj, ids_page), offset, limit, total=nombre)
+            
+            images = _lire_images(collection_obj, lire_ids_tries(chemin, collection, tri, nombre))
+        except sqlite3.Error as e:
+            logger.warning(f"Index de tri des images indisponible: {e}")
+            images = _galerie_sans_index(collection_obj, nombre, tri)
         
-        # Trier les images
-        if tri == "chronologique":
-            # Trier par timestamp (plus récent d'abord)
-            images.sort(
-                key=lambda x: x["metadata"].get("timestamp", ""),
-                reverse=True
-            )
-        elif tri == "nom":
-            # Trier par nom alphabétique
-            images.sort(
-                key=lambda x: x["metadata"].get("nom_image", "")
-            )
-        
-        return jsonify({
-            "succes": True,
-            "nombre_images": len(images),
-            "images": images
-        }), 200
+        if len(_cache_galerie) >= NOMBRE_MAX_GALERIES_EN_CACHE:
+            _cache_galerie.clear()
+        _cache_galerie[cle_cache] = (maintenant, images)
+        return _reponse_galerie(images, offset, limit)
         
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de la galerie: {e}", exc_info=True)
@@ -311,65 +561,53 @@ def servir_image(chemin_image: str):
         Fichier image ou erreur 404
     """
     try:
-        # Décoder et normaliser le chemin (gérer les backslashes Windows)
-        chemin_str = unquote(chemin_image)
-        # Remplacer les antislashs par des slashs OS
-        chemin_str = chemin_str.replace("\\", "/")
-
-        candidats = []
-
-        # 1) Chemin tel quel
-        candidats.append(Path(chemin_str))
-
-        # 2) Relatif à la racine du projet
-        candidats.append(racine_projet / chemin_str)
+        chemin_resolu = _resoudre_chemin_image(chemin_image)
+        if chemin_resolu is None:
+            return jsonify({
+                "succes": False,
+                "erreur": f"Image non trouvée: {chemin_image}"
+            }), 404
+        chemin_trouve = Path(chemin_resolu)
 
-        # 3) Relatif au dossier Cas/
-        candidats.append(racine_projet / "Cas" / chemin_str)
+        # Déterminer un mimetype simple selon l'extension
+        mimetype = MIMETYPES_IMAGES.get(chemin_trouve.suffix.lower(), "application/octet-stream")
 
-        # 4) Recherche par nom de fichier dans Cas/** si toujours introuvable
-        chemin_trouve = None
-        for c in candidats:
-            if c.exists() and c.is_file():
-                chemin_trouve = c
-                break
+        if PREFIXE_X_ACCEL_REDIRECT:
+            # Chemins résolus : un chemin relatif au répertoire courant ou
+            # contenant ".." est comparé à son emplacement réel, pas à son texte
+            chemin_absolu = chemin_trouve.resolve()
+            dossier_cas = (racine_projet / "Cas").resolve()
+            if chemin_absolu.is_relative_to(dossier_cas):
+                # nginx lit et envoie le fichier (sendfile), avec ETag et
+                # Last-Modified ; Cache-Control est conservé
+                chemin_relatif = chemin_absolu.relative_to(dossier_cas).as_posix()
+                reponse = Response(mimetype=mimetype)
+                reponse.headers["X-Accel-Redirect"] = (
+                    PREFIXE_X_ACCEL_REDIRECT.rstrip("/") + "/" + quote(chemin_relatif)
+                )
+                reponse.cache_control.max_age = DUREE_CACHE_IMAGES_SEC
+                reponse.cache_control.public = True
+                return reponse
 
-        if chemin_trouve is None:
-            try:
-                base_cas = racine_projet / "Cas"
-                if base_cas.exists():
-                    # Rechercher d'abord par chemin relatif 'Images/...'
-                    # Puis fallback par nom de fichier uniquement
-                    try_path_suffix = Path(chemin_str)
-                    # Essayer de retrouver un chemin qui se termine par ce suffixe
-                    suffix_norm = os.path.join(*try_path_suffix.parts)
-                    for p in base_cas.rglob(try_path_suffix.name):
-                        # Choisir le premier match
-                        chemin_trouve = p
-                        break
-            except Exception:
-                chemin_trouve = None
-
-        if chemin_trouve is None or not chemin_trouve.exists():
+        # ETag + Last-Modified (réponses 304 conditionnelles) et cache navigateur
+        # d'une journée : la galerie ne retélécharge pas les images déjà vues
+        try:
+            reponse = send_file(
+                chemin_resolu,
+                mimetype=mimetype,
+                conditional=True,
+                etag=True,
+                max_age=DUREE_CACHE_IMAGES_SEC,
+            )
+        except FileNotFoundError:
+            # Fichier supprimé depuis sa mise en cache
+            _chemins_images.pop(chemin_image, None)
             return jsonify({
                 "succes": False,
                 "erreur": f"Image non trouvée: {chemin_image}"
             }), 404
-
-        # Déterminer un mimetype simple selon l'extension
-        ext = chemin_trouve.suffix.lower()
-        if ext in {".jpg", ".jpeg"}:
-            mimetype = 'image/jpeg'
-        elif ext in {".png"}:
-            mimetype = 'image/png'
-        elif ext in {".webp"}:
-            mimetype = 'image/webp'
-        elif ext in {".gif"}:
-            mimetype = 'image/gif'
-        else:
-            mimetype = 'application/octet-stream'
-
-        return send_file(str(chemin_trouve), mimetype=mimetype)
+        reponse.cache_control.public = True
+        return reponse
 
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de l'image: {e}")
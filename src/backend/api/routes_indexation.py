@@ -5,7 +5,6 @@ from __future__ import annotations
 import json
 import logging
 import psutil
-import sys
 import threading
 import uuid
 from pathlib import Path
@@ -13,12 +12,14 @@ from typing import Any, Dict
 
 from flask import Blueprint, Response, jsonify, request, stream_with_context
 
-# Ajouter le répertoire racine au path pour les imports
-racine_projet = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(racine_projet))
-
+# Pas de manipulation de sys.path : importer src.backend.api implique déjà
+# que la racine du projet est sur le path (app.py l'ajoute au démarrage)
 from config.settings import obtenir_parametres
+from src.backend.api.routes_config import invalider_cache_comptes
+from src.backend.api.routes_conversations import invalider_cache_messages
+from src.backend.api.routes_donnees import invalider_cache_positions
 from src.backend.database.indexer import indexer_csv_messages
+from src.backend.database.vector_db import obtenir_base_vectorielle
 from src.backend.models.model_manager import obtenir_encodeur_texte
 
 # Configuration du logger
@@ -28,10 +29,16 @@ logger = logging.getLogger(__name__)
 # Blueprint pour les routes d'indexation
 bp_indexation = Blueprint("indexation", __name__, url_prefix="/api")
 
-# Stockage des tâches d'indexation en cours
+# Stockage des tâches d'indexation en cours. Chaque tâche porte une
+# condition construite sur _taches_lock : elle réveille les flux SSE de la
+# tâche à chaque mise à jour (pas de sondage périodique).
 _taches_indexation: Dict[str, Dict[str, Any]] = {}
 _taches_lock = threading.Lock()
 
+# Sans mise à jour pendant ce délai, le flux SSE envoie un commentaire de
+# maintien (détecte aussi les clients déconnectés)
+DELAI_MAINTIEN_SSE_SEC = 15.0
+
 
 @bp_indexation.route("/load", methods=["POST"])
 def charger_csv() -> tuple[Dict[str, Any], int]:
@@ -83,7 +90,8 @@ def charger_csv() -> tuple[Dict[str, Any], int]:
                 "message": "Démarrage...",
                 "statistiques": None,
                 "erreur": None,
-                "evenements": []
+                "evenements": [],
+                "condition": threading.Condition(_taches_lock)
             }
         
         # Fonction de callback pour la progression
@@ -98,6 +106,7 @@ def charger_csv() -> tuple[Dict[str, Any], int]:
                         "progression": pct,
                         "message": msg
                     })
+                    _taches_indexation[task_id]["condition"].notify_all()
         
         # IMPORTANT: Précharger le modèle d'embedding AVANT de lancer le thread
         # pour éviter de bloquer le serveur Flask pendant 15-30s (surtout avec Qwen3)
@@ -162,6 +171,7 @@ def charger_csv() -> tuple[Dict[str, Any], int]:
                 if task_id in _taches_indexation:
                     _taches_indexation[task_id]["etat"] = "erreur"
                     _taches_indexation[task_id]["erreur"] = message_erreur
+                    _taches_indexation[task_id]["condition"].notify_all()
             return jsonify({
                 "succes": False,
                 "erreur": message_erreur
@@ -173,6 +183,7 @@ def charger_csv() -> tuple[Dict[str, Any], int]:
                 if task_id in _taches_indexation:
                     _taches_indexation[task_id]["etat"] = "erreur"
                     _taches_indexation[task_id]["erreur"] = f"Impossible de charger le modèle: {str(e)}"
+                    _taches_indexation[task_id]["condition"].notify_all()
             return jsonify({
                 "succes": False,
                 "erreur": f"Impossible de charger le modèle d'embedding: {str(e)}"
@@ -183,18 +194,27 @@ def charger_csv() -> tuple[Dict[str, Any], int]:
             try:
                 logger.info(f"🚀 Début indexation tâche {task_id}: {chemin_csv}")
                 parametres = obtenir_parametres()
-                stats = indexer_csv_messages(
-                    chemin_csv=chemin_csv,
-                    parametres=parametres,
-                    nom_cas=nom_cas,
-                    reinitialiser=reinitialiser,
-                    progress_callback=on_progress
-                )
+                try:
+                    stats = indexer_csv_messages(
+                        chemin_csv=chemin_csv,
+                        parametres=parametres,
+                        nom_cas=nom_cas,
+                        reinitialiser=reinitialiser,
+                        progress_callback=on_progress
+                    )
+                finally:
+                    # L'indexeur a pu supprimer/recréer des collections, même
+                    # s'il a échoué ensuite (reinitialiser=True)
+                    obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA).oublier_collections()
+                    invalider_cache_comptes()
+                    invalider_cache_messages()
+                    invalider_cache_positions()
                 
                 with _taches_lock:
                     if task_id in _taches_indexation:
                         _taches_indexation[task_id]["etat"] = "termine"
                         _taches_indexation[task_id]["statistiques"] = stats
+                        _taches_indexation[task_id]["condition"].notify_all()
                         logger.info(f"✅ Indexation terminée tâche {task_id}")
                         
             except Exception as e:
@@ -203,6 +223,7 @@ def charger_csv() -> tuple[Dict[str, Any], int]:
                     if task_id in _taches_indexation:
                         _taches_indexation[task_id]["etat"] = "erreur"
                         _taches_indexation[task_id]["erreur"] = str(e)
+                        _taches_indexation[task_id]["condition"].notify_all()
         
         # Lancer le thread
         thread = threading.Thread(target=run_indexation, daemon=True)
@@ -237,34 +258,44 @@ def suivre_progression(task_id: str):
     
     def generate():
         """Génère les événements SSE pour la progression."""
-        import time
-        
         logger.info(f"📡 Client connecté pour SSE task {task_id}")
         derniere_progression = -1
         
         while True:
+            # Événements préparés sous verrou, envoyés après l'avoir relâché
+            # (un client lent ne bloque pas la tâche d'indexation)
+            evenements = []
+            fin = False
+            
             with _taches_lock:
-                if task_id not in _taches_indexation:
-                    # Tâche introuvable
-                    yield f"event: error\ndata: {json.dumps({'erreur': 'Tâche introuvable'})}\n\n"
-                    break
-                
-                tache = _taches_indexation[task_id]
+                tache = _taches_indexation.get(task_id)
+                # Attendre une mise à jour (notify_all) au lieu de sonder
+                if (
+                    tache is not None
+                    and tache["progression"] == derniere_progression
+                    and tache["etat"] not in ["termine", "erreur"]
+                ):
+                    tache["condition"].wait(timeout=DELAI_MAINTIEN_SSE_SEC)
+                    tache = _taches_indexation.get(task_id)
                 
-                # Envoyer un événement seulement si la progression a changé
-                if tache["progression"] != derniere_progression:
-                    event_data = {
-                        "etat": tache["etat"],
-                        "progression": tache["progression"],
-                        "etape": tache["etape"],
-                        "message": tache["message"]
-                    }
+                if tache is None:
+                    # Tâche introuvable
+                    evenements.append(f"event: error\ndata: {json.dumps({'erreur': 'Tâche introuvable'})}\n\n")
+                    fin = True
+                else:
+                    # Envoyer un événement seulement si la progression a changé
+                    if tache["progression"] != derniere_progression:
+                        event_data = {
+                            "etat": tache["etat"],
+                            "progression": tache["progression"],
+                            "etape": tache["etape"],
+                            "message": tache["message"]
+                        }
+                        
+                        evenements.append(f"data: {json.dumps(event_data)}\n\n")
+                        derniere_progression = tache["progression"]
                     
-                    yield f"data: {json.dumps(event_data)}\n\n"
-                    derniere_progression = tache["progression"]
-                
-                # Si terminé ou erreur, envoyer l'événement final et fermer
-                if tache["etat"] in ["termine", "erreur"]:
+                    # Si terminé ou erreur, envoyer l'événement final et fermer
                     if tache["etat"] == "termine":
                         event_data = {
                             "etat": "termine",
@@ -272,19 +303,24 @@ def suivre_progression(task_id: str):
                             "statistiques": tache["statistiques"],
                             "message": "Indexation terminée avec succès"
                         }
-                        yield f"event: complete\ndata: {json.dumps(event_data)}\n\n"
+                        evenements.append(f"event: complete\ndata: {json.dumps(event_data)}\n\n")
                         logger.info(f"✅ SSE terminé pour task {task_id}")
-                    else:
+                        fin = True
+                    elif tache["etat"] == "erreur":
                         event_data = {
                             "etat": "erreur",
                             "erreur": tache["erreur"],
                             "message": f"Erreur: {tache['erreur']}"
                         }
-                        yield f"event: error\ndata: {json.dumps(event_data)}\n\n"
+                        evenements.append(f"event: error\ndata: {json.dumps(event_data)}\n\n")
                         logger.error(f"❌ SSE erreur pour task {task_id}: {tache['erreur']}")
-                    break
+                        fin = True
             
-            time.sleep(0.5)  # Poll toutes les 500ms
+            if not evenements:
+                evenements.append(": maintien\n\n")
+            yield from evenements
+            if fin:
+                break
     
     return Response(
         stream_with_context(generate()),
@@ -395,6 +431,11 @@ def charger_dossier() -> tuple[Dict[str, Any], int]:
                     "erreur": str(e)
                 }
         
+        obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA).oublier_collections()
+        invalider_cache_comptes()
+        invalider_cache_messages()
+        invalider_cache_positions()
+        
         return jsonify({
             "succes": True,
             "resultats": resultats,
@@ -2,16 +2,12 @@
 
 from __future__ import annotations
 
-import sys
-from pathlib import Path
 from typing import Any, Dict
 
 from flask import Blueprint, jsonify, request
 
-# Ajouter le répertoire racine au path pour les imports
-racine_projet = Path(__file__).resolve().parents[3]
-sys.path.insert(0, str(racine_projet))
-
+# Pas de manipulation de sys.path : importer src.backend.api implique déjà
+# que la racine du projet est sur le path (app.py l'ajoute au démarrage)
 from config.settings import obtenir_parametres
 from src.backend.core.filters import (
     combiner_filtres,
@@ -20,7 +16,7 @@ from src.backend.core.filters import (
     creer_filtre_temporel,
 )
 from src.backend.core.search_engine import MoteurRecherche
-from src.backend.database.vector_db import BaseVectorielle
+from src.backend.database.vector_db import obtenir_base_vectorielle
 
 # Blueprint pour les routes de recherche
 bp_recherche = Blueprint("recherche", __name__, url_prefix="/api")
@@ -76,7 +72,7 @@ def rechercher() -> tuple[Dict[str, Any], int]:
         
         # Initialiser le moteur de recherche
         parametres = obtenir_parametres()
-        db = BaseVectorielle(parametres.CHEMIN_BASE_CHROMA)
+        db = obtenir_base_vectorielle(parametres.CHEMIN_BASE_CHROMA)
         moteur = MoteurRecherche(db, parametres)
         
         # Déterminer les collections à rechercher
@@ -5,15 +5,32 @@ Expose toutes les routes pour l'indexation, la recherche et la gestion des donn
 
 from __future__ import annotations
 
+import logging
 import sys
 from pathlib import Path
+from typing import Any
 
 from flask import Flask, jsonify, render_template
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+# orjson (optionnel) : sérialisation de jsonify() bien plus rapide que json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# flask-compress (optionnel) : compression gzip/brotli des réponses JSON,
+# très répétitives (mêmes clés de métadonnées pour chaque message)
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
 # Ajouter le répertoire racine au path pour les imports
 racine_projet = Path(__file__).resolve().parents[2]
-sys.path.insert(0, str(racine_projet))
+if str(racine_projet) not in sys.path:
+    sys.path.insert(0, str(racine_projet))
 
 from src.backend.api.routes_config import bp_config
 from src.backend.api.routes_conversations import bp_conversations
@@ -23,12 +40,43 @@ from src.backend.api.routes_indexation import bp_indexation
 from src.backend.api.routes_recherche import bp_recherche
 
 
+class FournisseurJSONOrjson(DefaultJSONProvider):
+    """Fournisseur JSON de Flask qui sérialise avec orjson.
+
+    Toutes les routes qui répondent par jsonify() en profitent. orjson écrit
+    l'UTF-8 tel quel (équivalent de ensure_ascii=False). Repli sur json pour
+    la sortie indentée ou triée, et pour les objets qu'orjson refuse.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Sérialise en JSON compact via orjson (json en repli)."""
+        if orjson is None or self.ensure_ascii or self.sort_keys or kwargs.get("indent"):
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                # Dates laissées à self.default : même format que jsonify() standard
+                option=(
+                    orjson.OPT_NON_STR_KEYS
+                    | orjson.OPT_SERIALIZE_NUMPY
+                    | orjson.OPT_PASSTHROUGH_DATETIME
+                ),
+            ).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+
 def creer_app() -> Flask:
     """Crée et configure l'application Flask.
 
     Returns:
         Application Flask configurée avec tous les blueprints
     """
+    # Journalisation au niveau INFO : les traces de débogage par requête
+    # (logger.debug) ne sont pas écrites
+    logging.basicConfig(level=logging.INFO)
+    
     # Configurer Flask avec les dossiers frontend
     app = Flask(
         __name__,
@@ -39,9 +87,26 @@ def creer_app() -> Flask:
     # Configuration CORS (permet les requêtes depuis n'importe quelle origine)
     CORS(app)
     
-    # Configuration Flask
-    app.config["JSON_AS_ASCII"] = False  # Support UTF-8 pour les caractères français
-    app.config["JSON_SORT_KEYS"] = False  # Conserver l'ordre des clés JSON
+    # Configuration JSON (Flask >= 2.3 ignore les clés JSON_* de app.config :
+    # ces réglages passent par le fournisseur app.json)
+    app.json = FournisseurJSONOrjson(app)
+    app.json.ensure_ascii = False  # Support UTF-8 pour les caractères français
+    app.json.sort_keys = False  # Conserver l'ordre des clés JSON (pas de tri à chaque réponse)
+    app.json.compact = True  # Pas d'indentation, même en mode debug
+    
+    # Compression des réponses (si flask-compress est installé). Le flux SSE
+    # de progression (text/event-stream) n'est pas dans la liste : il doit
+    # partir immédiatement, sans être mis en tampon.
+    if Compress is not None:
+        app.config["COMPRESS_MIMETYPES"] = [
+            "application/json",
+            "text/html",
+            "text/css",
+            "application/javascript",
+        ]
+        app.config["COMPRESS_LEVEL"] = 5
+        app.config["COMPRESS_MIN_SIZE"] = 1024
+        Compress(app)
     
     # Enregistrer les blueprints API
     app.register_blueprint(bp_indexation)
@@ -0,0 +1,158 @@
+"""Regroupement des messages en conversations (propriétaire et interlocuteur)."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def detecter_proprietaire(messages: Iterable[Dict[str, Any]]) -> Optional[str]:
+    """Détecte le propriétaire du téléphone (le numéro qui apparaît le plus souvent).
+
+    Args:
+        messages: Messages ou métadonnées de messages (clés "from" et "to")
+
+    Returns:
+        Numéro du propriétaire, ou None si aucun numéro n'est renseigné
+    """
+    numero_counts = Counter()
+    for message in messages:
+        from_num = message.get("from", "")
+        to_num = message.get("to", "")
+
+        if from_num:
+            numero_counts[from_num] += 1
+        if to_num:
+            numero_counts[to_num] += 1
+
+    return numero_counts.most_common(1)[0][0] if numero_counts else None
+
+
+def identifier_interlocuteur(message: Dict[str, Any], proprietaire: Optional[str]) -> str:
+    """Identifie l'interlocuteur d'un message (l'autre personne que le propriétaire).
+
+    Args:
+        message: Message ou métadonnées du message
+        proprietaire: Numéro du propriétaire du téléphone
+
+    Returns:
+        Numéro de l'interlocuteur
+    """
+    from_num = message.get("from", "")
+    to_num = message.get("to", "")
+
+    if from_num == proprietaire:
+        return to_num
+    if to_num == proprietaire:
+        return from_num
+    # Si ni from ni to n'est le propriétaire, prendre from ou to selon direction
+    return from_num if message.get("direction", "") == "incoming" else to_num
+
+
+def interlocuteur_message(metadata: Dict[str, Any], proprietaire: Optional[str]) -> str:
+    """Retourne l'interlocuteur d'un message (stocké à l'indexation, sinon recalculé)."""
+    interlocuteur = metadata.get("interlocuteur")
+    if interlocuteur is None:
+        interlocuteur = identifier_interlocuteur(metadata, proprietaire)
+    return interlocuteur
+
+
+def resumer_conversations(
+    ids: List[str],
+    metadatas: List[Dict[str, Any]],
+    interlocuteurs: List[str],
+) -> List[Dict[str, Any]]:
+    """Regroupe les messages par interlocuteur, en un seul passage.
+
+    Pour chaque conversation : nombre de messages et dernier message (seul
+    son ID est retenu, le texte n'est lu que pour ces messages). Les
+    conversations sont triées par date du dernier message, du plus récent au
+    plus ancien.
+
+    Args:
+        ids: IDs des messages
+        metadatas: Métadonnées des messages (même ordre)
+        interlocuteurs: Interlocuteur de chaque message (même ordre)
+
+    Returns:
+        Liste de {"contact", "contact_name", "dernier_id", "dernier_timestamp",
+        "nombre_messages"}
+    """
+    # Par interlocuteur : [dernier_timestamp, dernier_id, nombre_messages,
+    # interlocuteur, métadonnées du premier message] ; une liste indexée
+    # évite les accès par clé de dict à chaque message
+    etats: Dict[str, List[Any]] = {}
+
+    for msg_id, metadata, interlocuteur in zip(ids, metadatas, interlocuteurs):
+        # Clé unique pour l'interlocuteur
+        cle_contact = interlocuteur or "inconnu"
+        timestamp = metadata.get("timestamp", "")
+
+        etat = etats.get(cle_contact)
+        if etat is None:
+            etats[cle_contact] = [timestamp, msg_id, 1, interlocuteur, metadata]
+        else:
+            # Mettre à jour le dernier message
+            etat[2] += 1
+            if timestamp > etat[0] or not etat[0]:
+                etat[0] = timestamp
+                etat[1] = msg_id
+
+    conversations = [
+        {
+            "contact": interlocuteur,
+            "contact_name": metadata.get("contact_name", interlocuteur),
+            "dernier_id": dernier_id,
+            "dernier_timestamp": dernier_timestamp,
+            "nombre_messages": nombre_messages
+        }
+        for dernier_timestamp, dernier_id, nombre_messages, interlocuteur, metadata in etats.values()
+    ]
+
+    # Trier les conversations par date du dernier message (plus récent en premier)
+    conversations.sort(key=lambda x: x["dernier_timestamp"] or "", reverse=True)
+    return conversations
+
+
+# Longueur de l'aperçu du dernier message dans la liste des conversations
+LONGUEUR_APERCU = 100
+
+
+def apercu(texte: str, longueur: int = LONGUEUR_APERCU) -> str:
+    """Tronque un texte pour un aperçu (renvoyé tel quel s'il est assez court).
+
+    Args:
+        texte: Texte complet
+        longueur: Nombre maximal de caractères conservés
+
+    Returns:
+        Texte, ou ses premiers caractères suivis de "..."
+    """
+    return texte if len(texte) <= longueur else texte[:longueur] + "..."
+
+
+def resumes_avec_apercus(
+    conversations: List[Dict[str, Any]],
+    document_par_id: Dict[str, Optional[str]],
+) -> List[Dict[str, Any]]:
+    """Met les résumés de conversations au format de GET /api/conversations.
+
+    Args:
+        conversations: Résumés produits par resumer_conversations
+        document_par_id: Texte des derniers messages, par ID
+
+    Returns:
+        Liste de {"contact", "contact_name", "dernier_message",
+        "dernier_timestamp", "nombre_messages"}, dans le même ordre
+    """
+    resumes = []
+    for conv in conversations:
+        document = document_par_id.get(conv["dernier_id"]) or ""
+        resumes.append({
+            "contact": conv["contact"],
+            "contact_name": conv["contact_name"],
+            "dernier_message": apercu(document),
+            "dernier_timestamp": conv["dernier_timestamp"],
+            "nombre_messages": conv["nombre_messages"]
+        })
+    return resumes
@@ -6,12 +6,14 @@ import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 # Ajouter le répertoire racine au path pour les imports
 racine_projet = Path(__file__).resolve().parents[3]
 sys.path.insert(0, str(racine_projet))
 
 from config.settings import Parametres
-from src.backend.core.filters import combiner_filtres
+from src.backend.core.filters import combiner_filtres, creer_filtre_exclusion_bruit
 from src.backend.database.vector_db import BaseVectorielle
 from src.backend.models.model_manager import obtenir_encodeur_texte
 
@@ -64,20 +66,33 @@ class MoteurRecherche:
             >>> for res in resultats:
             >>>     print(f"{res['score']:.3f} - {res['document'][:50]}")
         """
-        # Paramètres par défaut
-        k = nombre_resultats or self.parametres.NOMBRE_RESULTATS_RECHERCHE
-        exclure = exclure_bruit if exclure_bruit is not None else self.parametres.EXCLURE_BRUIT_PAR_DEFAUT
+        embedding_requete = self.encoder_requete(requete, nom_collection)
+        return self.rechercher_par_embedding(
+            embedding_requete,
+            nom_collection=nom_collection,
+            filtres=filtres,
+            nombre_resultats=nombre_resultats,
+            exclure_bruit=exclure_bruit,
+        )
 
-        # Extraire les filtres temporels (post-processing) et construire filtres ChromaDB
-        filtres_temporels = self._extraire_filtres_temporels(filtres or {})
-        filtres_chromadb = self._construire_filtres_chromadb(filtres or {}, exclure)
+    def encoder_requete(self, requete: str, nom_collection: Optional[str] = None) -> np.ndarray:
+        """Encode le texte d'une requête en vecteur d'embedding.
 
-        # Encoder la requête
+        Permet de réutiliser le même embedding pour plusieurs recherches
+        (filtres différents, plusieurs collections) sans réencoder la requête.
+
+        Args:
+            requete: Texte de la requête utilisateur
+            nom_collection: Collection visée (uniquement pour les logs)
+
+        Returns:
+            Vecteur d'embedding de la requête
+        """
         try:
             print(f"🔍 [SEARCH] Encodage requête: '{requete}' pour collection '{nom_collection}'")
             print(f"🔍 [SEARCH] Encodeur actuel: {type(self.encodeur).__name__}")
             print(f"🔍 [SEARCH] Modèle: {self.encodeur.id_modele if hasattr(self.encodeur, 'id_modele') else 'inconnu'}")
-            embedding_requete = self.encodeur.encoder([requete])[0].tolist()
+            embedding_requete = self.encodeur.encoder([requete])[0]
             print(f"🔍 [SEARCH] Embedding généré: dimension={len(embedding_requete)}")
         except Exception as e:
             print(f"❌ [SEARCH] Erreur lors de l'encodage de la requête: {e}")
@@ -85,6 +100,40 @@ class MoteurRecherche:
             import traceback
             traceback.print_exc()
             raise
+        return embedding_requete
+
+    def rechercher_par_embedding(
+        self,
+        embedding_requete: np.ndarray,
+        nom_collection: str,
+        filtres: Optional[Dict[str, Any]] = None,
+        nombre_resultats: Optional[int] = None,
+        exclure_bruit: Optional[bool] = None,
+    ) -> List[Dict[str, Any]]:
+        """Recherche dans une collection à partir d'un embedding déjà calculé.
+
+        Args:
+            embedding_requete: Vecteur retourné par encoder_requete()
+            nom_collection: Nom de la collection à rechercher
+            filtres: Filtres ChromaDB optionnels (dict) - peut contenir des filtres temporels
+            nombre_resultats: Nombre de résultats à retourner (utilise config par défaut si None)
+            exclure_bruit: Exclure les messages de bruit (utilise config par défaut si None)
+
+        Returns:
+            Liste de résultats avec métadonnées, texte et score de similarité
+
+        Exemple:
+            >>> embedding = moteur.encoder_requete("rendez-vous")
+            >>> entrants = moteur.rechercher_par_embedding(embedding, "messages", {"direction": "incoming"})
+            >>> sortants = moteur.rechercher_par_embedding(embedding, "messages", {"direction": "outgoing"})
+        """
+        # Paramètres par défaut
+        k = nombre_resultats or self.parametres.NOMBRE_RESULTATS_RECHERCHE
+        exclure = exclure_bruit if exclure_bruit is not None else self.parametres.EXCLURE_BRUIT_PAR_DEFAUT
+
+        # Extraire les filtres temporels (post-processing) et construire filtres ChromaDB
+        filtres_temporels = self._extraire_filtres_temporels(filtres or {})
+        filtres_chromadb = self._construire_filtres_chromadb(filtres or {}, exclure)
 
         # Augmenter le nombre de résultats si on a des filtres post-processing
         k_recherche = k * 3 if filtres_temporels else k
@@ -92,7 +141,7 @@ class MoteurRecherche:
         # Rechercher dans ChromaDB avec la méthode configurée
         resultats = self.db.rechercher(
             nom_collection=nom_collection,
-            embedding_requete=embedding_requete,
+            embedding_requete=np.asarray(embedding_requete).tolist(),
             nombre_resultats=k_recherche,
             filtres=filtres_chromadb if filtres_chromadb else None,
             methode=self.parametres.METHODE_RECHERCHE,
@@ -348,6 +397,8 @@ class MoteurRecherche:
         Note:
             ChromaDB nécessite que plusieurs conditions soient dans un $and.
             Un dict avec plusieurs clés {k1: v1, k2: v2} génère une erreur.
+            Seules les bornes temporelles (chaînes ISO, que ChromaDB ne sait
+            pas comparer) restent filtrées en post-processing.
         """
         conditions = []
         
@@ -363,9 +414,10 @@ class MoteurRecherche:
                 if cle not in ["timestamp", "timestamp_debut", "timestamp_fin"]:
                     conditions.append({cle: valeur})
         
-        # Ajouter le filtre d'exclusion du bruit si demandé
-        if exclure_bruit:
-            conditions.append({"is_noise": False})
+        # Exclusion du bruit dans la clause where : ChromaDB écarte ces
+        # documents pendant la recherche, aucun post-filtrage ni sur-échantillonnage
+        if exclure_bruit and not any("is_noise" in condition for condition in conditions):
+            conditions.append(creer_filtre_exclusion_bruit())
         
         # Retourner selon le nombre de conditions
         if len(conditions) == 0:
@@ -7,6 +7,7 @@ textuelles et embeddings vectoriels.
 from __future__ import annotations
 
 import io
+import sqlite3
 import sys
 import time
 from pathlib import Path
@@ -26,6 +27,7 @@ racine_projet = Path(__file__).resolve().parents[3]
 sys.path.insert(0, str(racine_projet))
 
 from config.settings import Parametres
+from src.backend.database.index_images import calculer_index_images, enregistrer_index_images
 from src.backend.database.vector_db import BaseVectorielle
 from src.backend.models.image_encoder import creer_encodeur_image
 from src.backend.models.model_manager import obtenir_encodeur_texte
@@ -249,6 +251,17 @@ def indexer_csv_images(
     )
     
     stats["images_indexees"] = len(ids_images)
+    
+    # Index de tri de la galerie, recalculé sur toute la collection : elle
+    # peut contenir d'autres imports
+    try:
+        enregistrer_index_images(
+            parametres.CHEMIN_BASE_CHROMA,
+            nom_collection_images,
+            calculer_index_images(db.obtenir_ou_creer_collection(nom_collection_images)),
+        )
+    except sqlite3.Error as e:
+        print(f"   ⚠️  Index de tri des images non enregistré: {e}")
     stats["duree_stockage_sec"] = time.time() - debut_phase
     
     print(f"   ✓ Stockage terminé ({stats['duree_stockage_sec']:.2f}s)")
@@ -0,0 +1,177 @@
+"""Index de tri des images, stocké à côté de la base ChromaDB.
+
+ChromaDB ne sait pas renvoyer les résultats d'un get() triés : la galerie
+devait lire toutes les images puis les trier en Python. Cet index garde, pour
+chaque image, les clés de tri de la galerie (timestamp, nom) dans une petite
+base SQLite (images.sqlite3) dans le dossier de ChromaDB, avec un index SQL
+par clé : la route obtient les IDs déjà triés (ORDER BY ... LIMIT ... OFFSET)
+et ne lit dans ChromaDB que les images de la page.
+
+Le fichier chroma.sqlite3 n'est pas modifié : son schéma appartient à
+ChromaDB et peut changer d'une version à l'autre.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from src.backend.database.vector_db import parcourir_collection
+
+NOM_FICHIER_INDEX_IMAGES = "images.sqlite3"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS images_tri (
+        collection TEXT NOT NULL,
+        id TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        nom_image TEXT NOT NULL,
+        rang INTEGER NOT NULL,
+        PRIMARY KEY (collection, id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS images_tri_timestamp ON images_tri (collection, timestamp DESC, rang)",
+    "CREATE INDEX IF NOT EXISTS images_tri_nom ON images_tri (collection, nom_image, rang)",
+    "CREATE INDEX IF NOT EXISTS images_tri_rang ON images_tri (collection, rang)",
+)
+
+# Ordre SQL par tri de la galerie (autre tri : ordre de stockage)
+_ORDRES = {
+    "chronologique": "timestamp DESC, rang",
+    "nom": "nom_image, rang",
+}
+
+
+def _connecter(chemin_persistance: str | Path) -> sqlite3.Connection:
+    """Ouvre la base de l'index (créée au besoin)."""
+    connexion = sqlite3.connect(str(Path(chemin_persistance) / NOM_FICHIER_INDEX_IMAGES))
+    for instruction in _SCHEMA:
+        connexion.execute(instruction)
+    return connexion
+
+
+def calculer_index_images(collection: Any) -> List[Tuple[str, str, str]]:
+    """Lit les clés de tri de toutes les images d'une collection.
+
+    Les métadonnées sont lues par pages : seules les clés de tri sont
+    gardées, pas les métadonnées complètes de la collection.
+
+    Args:
+        collection: Collection ChromaDB d'images
+
+    Returns:
+        Liste de (id, timestamp, nom_image), dans l'ordre de stockage
+    """
+    lignes = []
+    for page in parcourir_collection(collection, ["metadatas"]):
+        metadatas = page["metadatas"] or [{}] * len(page["ids"])
+        lignes.extend(
+            (image_id, metadata.get("timestamp") or "", metadata.get("nom_image") or "")
+            for image_id, metadata in zip(page["ids"], metadatas)
+        )
+    return lignes
+
+
+def enregistrer_index_images(
+    chemin_persistance: str | Path,
+    nom_collection: str,
+    lignes: List[Tuple[str, str, str]],
+) -> None:
+    """Remplace l'index de tri d'une collection d'images.
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection d'images
+        lignes: (id, timestamp, nom_image) de chaque image, dans l'ordre de stockage
+    """
+    connexion = _connecter(chemin_persistance)
+    try:
+        with connexion:
+            connexion.execute("DELETE FROM images_tri WHERE collection = ?", (nom_collection,))
+            connexion.executemany(
+                "INSERT OR REPLACE INTO images_tri (collection, id, timestamp, nom_image, rang) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (nom_collection, image_id, timestamp, nom_image, rang)
+                    for rang, (image_id, timestamp, nom_image) in enumerate(lignes)
+                ]
+            )
+    finally:
+        connexion.close()
+
+
+def compter_images_indexees(chemin_persistance: str | Path, nom_collection: str) -> Optional[int]:
+    """Compte les images présentes dans l'index d'une collection.
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection d'images
+
+    Returns:
+        Nombre d'images indexées, ou None si l'index est absent ou illisible
+    """
+    if not (Path(chemin_persistance) / NOM_FICHIER_INDEX_IMAGES).exists():
+        return None
+    try:
+        connexion = _connecter(chemin_persistance)
+        try:
+            (nombre,) = connexion.execute(
+                "SELECT COUNT(*) FROM images_tri WHERE collection = ?",
+                (nom_collection,)
+            ).fetchone()
+        finally:
+            connexion.close()
+    except sqlite3.Error:
+        return None
+    return nombre
+
+
+def lire_ids_tries(
+    chemin_persistance: str | Path,
+    nom_collection: str,
+    tri: str,
+    limit: int,
+    offset: int = 0,
+) -> List[str]:
+    """Renvoie une page d'IDs d'images, triés par SQLite.
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection d'images
+        tri: "chronologique" (plus récent d'abord), "nom", ou autre valeur
+            pour l'ordre de stockage
+        limit: Nombre maximal d'IDs
+        offset: Position du premier ID
+
+    Returns:
+        IDs de la page, dans l'ordre demandé
+    """
+    connexion = _connecter(chemin_persistance)
+    try:
+        lignes = connexion.execute(
+            f"SELECT id FROM images_tri WHERE collection = ? "
+            f"ORDER BY {_ORDRES.get(tri, 'rang')} LIMIT ? OFFSET ?",
+            (nom_collection, limit, offset)
+        ).fetchall()
+    finally:
+        connexion.close()
+    return [image_id for (image_id,) in lignes]
+
+
+def supprimer_index_images(chemin_persistance: str | Path, nom_collection: str) -> None:
+    """Supprime l'index de tri d'une collection (collection supprimée).
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection d'images
+    """
+    if not (Path(chemin_persistance) / NOM_FICHIER_INDEX_IMAGES).exists():
+        return
+    connexion = _connecter(chemin_persistance)
+    try:
+        with connexion:
+            connexion.execute("DELETE FROM images_tri WHERE collection = ?", (nom_collection,))
+    finally:
+        connexion.close()
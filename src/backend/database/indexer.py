@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import io
+import sqlite3
 import sys
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
@@ -22,12 +23,61 @@ sys.path.insert(0, str(racine_projet))
 
 from config.settings import Parametres
 from src.backend.core.chunking import creer_chunks_fenetre_glissante
+from src.backend.core.conversations import detecter_proprietaire, identifier_interlocuteur
 from src.backend.core.denoising import ajouter_flag_bruit
+from src.backend.database.resumes_conversations import (
+    calculer_resumes,
+    enregistrer_resumes,
+    supprimer_resumes,
+)
 from src.backend.database.vector_db import BaseVectorielle
 from src.backend.models.model_manager import obtenir_encodeur_texte
 from src.backend.parsers.message_extractor import parser_sms_depuis_csv
 
 
+def _ordre_par_longueur(textes: List[str]) -> np.ndarray:
+    """Retourne l'ordre des textes du plus long au plus court.
+
+    Encoder par lots de textes de longueurs voisines limite le padding : chaque
+    lot n'est complété que jusqu'à la longueur de son plus long texte.
+
+    Args:
+        textes: Textes à encoder
+
+    Returns:
+        Permutation des indices (tri stable par longueur décroissante)
+    """
+    return np.argsort([-len(t) for t in textes], kind="stable")
+
+
+def preparer_messages_et_chunks(
+    chemin_csv: str | Path,
+    taille_fenetre: int,
+    overlap: int,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Parse, débruite et découpe un CSV sans l'encoder.
+
+    Ces étapes ne dépendent pas du modèle d'embedding : leur résultat peut
+    être passé à indexer_csv_messages(donnees_preparees=...) pour indexer
+    le même CSV avec plusieurs modèles.
+
+    Args:
+        chemin_csv: Chemin vers le fichier CSV
+        taille_fenetre: Taille de la fenêtre glissante des chunks
+        overlap: Chevauchement entre fenêtres
+
+    Returns:
+        Tuple (messages avec flag de bruit, chunks de contexte)
+    """
+    messages = ajouter_flag_bruit(parser_sms_depuis_csv(Path(chemin_csv)))
+    chunks = creer_chunks_fenetre_glissante(
+        messages,
+        taille_fenetre=taille_fenetre,
+        overlap=overlap,
+    )
+    return messages, chunks
+
+
 def indexer_csv_messages(
     chemin_csv: str | Path,
     parametres: Parametres,
@@ -35,6 +85,7 @@ def indexer_csv_messages(
     reinitialiser: bool = False,
     progress_callback: Optional[callable] = None,
     log_verbose: bool = False,
+    donnees_preparees: Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = None,
 ) -> Dict[str, Any]:
     """Pipeline complet d'indexation d'un CSV de messages dans ChromaDB.
 
@@ -45,6 +96,9 @@ def indexer_csv_messages(
         reinitialiser: Si True, supprime les collections existantes avant d'indexer
         progress_callback: Fonction de callback pour la progression (etape, %, message)
         log_verbose: Si True, affiche chaque message/chunk embeddé (verbeux pour gros fichiers)
+        donnees_preparees: Tuple (messages, chunks) déjà produit par
+            preparer_messages_et_chunks() ; si fourni, les phases de parsing,
+            débruitage et chunking sont sautées (seul l'encodage est refait)
 
     Returns:
         Statistiques d'indexation (nombre de messages, chunks, durée, etc.)
@@ -78,37 +132,43 @@ def indexer_csv_messages(
 
     _emit_progress("initialisation", 0, "Démarrage de l'indexation...")
 
-    # ========== 1. PARSING ==========
-    print("\n📄 Phase 1/5: Parsing du CSV...")
-    _emit_progress("parsing", 5, "Lecture du fichier CSV...")
-    debut_phase = time.time()
-    messages = parser_sms_depuis_csv(Path(chemin_csv))
-    stats["duree_parsing_sec"] = time.time() - debut_phase
-    print(f"   ✓ {len(messages)} messages parsés ({stats['duree_parsing_sec']:.2f}s)")
-    _emit_progress("parsing", 20, f"{len(messages)} messages parsés")
-
-    # ========== 2. DÉBRUITAGE ==========
-    print("\n🧹 Phase 2/5: Débruitage...")
-    _emit_progress("debruitage", 22, "Détection du spam et publicités...")
-    debut_phase = time.time()
-    messages = ajouter_flag_bruit(messages)
-    stats["duree_debruitage_sec"] = time.time() - debut_phase
-    print(f"   ✓ Flags de bruit ajoutés ({stats['duree_debruitage_sec']:.2f}s)")
-    _emit_progress("debruitage", 30, "Débruitage terminé")
-
-    # ========== 3. CHUNKING ==========
-    print("\n🪟 Phase 3/5: Création des chunks de contexte...")
-    _emit_progress("chunking", 32, "Création des fenêtres de contexte...")
-    debut_phase = time.time()
-    chunks = creer_chunks_fenetre_glissante(
-        messages,
-        taille_fenetre=parametres.TAILLE_FENETRE_CHUNK,
-        overlap=parametres.OVERLAP_FENETRE_CHUNK,
-    )
-    duree_chunking = time.time() - debut_phase
-    print(f"   ✓ {len(chunks)} chunks créés (fenêtre={parametres.TAILLE_FENETRE_CHUNK}, "
-          f"overlap={parametres.OVERLAP_FENETRE_CHUNK}) ({duree_chunking:.2f}s)")
-    _emit_progress("chunking", 40, f"{len(chunks)} chunks créés")
+    if donnees_preparees is not None:
+        # Parsing, débruitage et chunking déjà faits (ne dépendent pas du modèle)
+        messages, chunks = donnees_preparees
+        print(f"\n♻️  Phases 1-3/5: {len(messages)} messages et {len(chunks)} chunks déjà préparés")
+        _emit_progress("chunking", 40, f"{len(chunks)} chunks déjà préparés")
+    else:
+        # ========== 1. PARSING ==========
+        print("\n📄 Phase 1/5: Parsing du CSV...")
+        _emit_progress("parsing", 5, "Lecture du fichier CSV...")
+        debut_phase = time.time()
+        messages = parser_sms_depuis_csv(Path(chemin_csv))
+        stats["duree_parsing_sec"] = time.time() - debut_phase
+        print(f"   ✓ {len(messages)} messages parsés ({stats['duree_parsing_sec']:.2f}s)")
+        _emit_progress("parsing", 20, f"{len(messages)} messages parsés")
+
+        # ========== 2. DÉBRUITAGE ==========
+        print("\n🧹 Phase 2/5: Débruitage...")
+        _emit_progress("debruitage", 22, "Détection du spam et publicités...")
+        debut_phase = time.time()
+        messages = ajouter_flag_bruit(messages)
+        stats["duree_debruitage_sec"] = time.time() - debut_phase
+        print(f"   ✓ Flags de bruit ajoutés ({stats['duree_debruitage_sec']:.2f}s)")
+        _emit_progress("debruitage", 30, "Débruitage terminé")
+
+        # ========== 3. CHUNKING ==========
+        print("\n🪟 Phase 3/5: Création des chunks de contexte...")
+        _emit_progress("chunking", 32, "Création des fenêtres de contexte...")
+        debut_phase = time.time()
+        chunks = creer_chunks_fenetre_glissante(
+            messages,
+            taille_fenetre=parametres.TAILLE_FENETRE_CHUNK,
+            overlap=parametres.OVERLAP_FENETRE_CHUNK,
+        )
+        duree_chunking = time.time() - debut_phase
+        print(f"   ✓ {len(chunks)} chunks créés (fenêtre={parametres.TAILLE_FENETRE_CHUNK}, "
+              f"overlap={parametres.OVERLAP_FENETRE_CHUNK}) ({duree_chunking:.2f}s)")
+        _emit_progress("chunking", 40, f"{len(chunks)} chunks créés")
 
     # ========== 4. ENCODAGE ==========
     print("\n🧠 Phase 4/5: Encodage vectoriel...")
@@ -125,16 +185,19 @@ def indexer_csv_messages(
     # Coercition pour éviter les None (sentence-transformers n'accepte que des str)
     textes_messages = [(m.get("message") or "") for m in messages]
     
-    # Encodage par batch avec progression
+    # Encodage par batch avec progression, dans l'ordre des longueurs
+    # (les embeddings sont remis dans l'ordre d'origine après l'encodage)
     taille_lot = 32
     total_messages = len(textes_messages)
+    ordre_messages = _ordre_par_longueur(textes_messages)
     print(f"     📦 {total_messages} messages à encoder par lots de {taille_lot}...")
     
     liste_embeddings = []
     temps_batches_messages = []  # Pour statistiques
     
     for i in range(0, total_messages, taille_lot):
-        batch = textes_messages[i:i+taille_lot]
+        indices_batch = ordre_messages[i:i+taille_lot]
+        batch = [textes_messages[k] for k in indices_batch]
         batch_debut = time.time()
         
         # Encoder le batch
@@ -153,8 +216,7 @@ def indexer_csv_messages(
         
         # Log détaillé de chaque message (seulement si verbose activé)
         if log_verbose:
-            for j, texte in enumerate(batch):
-                msg_idx = i + j
+            for msg_idx, texte in zip(indices_batch, batch):
                 texte_apercu = (texte[:60] + "...") if len(texte) > 60 else texte
                 print(f"        └─ [{msg_idx+1}/{total_messages}] {texte_apercu}")
         
@@ -162,8 +224,10 @@ def indexer_csv_messages(
         _emit_progress("encodage", pct, 
                       f"Messages: {messages_traites}/{total_messages} ({pct-45:.0f}% encodage)")
     
-    # Concaténer tous les embeddings
-    embeddings_messages = np.vstack(liste_embeddings)
+    # Concaténer tous les embeddings et annuler le tri par longueur
+    embeddings_tries = np.vstack(liste_embeddings)
+    embeddings_messages = np.empty_like(embeddings_tries)
+    embeddings_messages[ordre_messages] = embeddings_tries
     
     stats["duree_encodage_messages_sec"] = time.time() - debut_phase
     
@@ -201,13 +265,15 @@ def indexer_csv_messages(
     
     # Encodage par batch avec progression
     total_chunks = len(textes_chunks)
+    ordre_chunks = _ordre_par_longueur(textes_chunks)
     print(f"     📦 {total_chunks} chunks à encoder par lots de {taille_lot}...")
     
     liste_embeddings_chunks = []
     temps_batches_chunks = []  # Pour statistiques
     
     for i in range(0, total_chunks, taille_lot):
-        batch = textes_chunks[i:i+taille_lot]
+        indices_batch = ordre_chunks[i:i+taille_lot]
+        batch = [textes_chunks[k] for k in indices_batch]
         batch_debut = time.time()
         
         # Encoder le batch
@@ -226,8 +292,7 @@ def indexer_csv_messages(
         
         # Log détaillé de chaque chunk (seulement si verbose activé)
         if log_verbose:
-            for j, texte in enumerate(batch):
-                chunk_idx = i + j
+            for chunk_idx, texte in zip(indices_batch, batch):
                 texte_apercu = (texte[:60] + "...") if len(texte) > 60 else texte
                 print(f"        └─ [Chunk {chunk_idx+1}/{total_chunks}] {texte_apercu}")
         
@@ -235,8 +300,10 @@ def indexer_csv_messages(
         _emit_progress("encodage", pct,
                       f"Chunks: {chunks_traites}/{total_chunks} ({pct-67:.0f}% encodage)")
     
-    # Concaténer tous les embeddings
-    embeddings_chunks = np.vstack(liste_embeddings_chunks)
+    # Concaténer tous les embeddings et annuler le tri par longueur
+    embeddings_tries = np.vstack(liste_embeddings_chunks)
+    embeddings_chunks = np.empty_like(embeddings_tries)
+    embeddings_chunks[ordre_chunks] = embeddings_tries
     
     stats["duree_encodage_chunks_sec"] = time.time() - debut_phase
     
@@ -276,6 +343,7 @@ def indexer_csv_messages(
         print("   ⚠️  Réinitialisation des collections existantes...")
         _emit_progress("stockage", 84, "Suppression des anciennes données...")
         db.supprimer_collection(nom_collection_messages)
+        supprimer_resumes(parametres.CHEMIN_BASE_CHROMA, nom_collection_messages)
         db.supprimer_collection(nom_collection_chunks)
 
     # Stocker les messages individuels
@@ -283,7 +351,10 @@ def indexer_csv_messages(
     _emit_progress("stockage", 86, f"Stockage de {len(messages)} messages...")
     # S'assurer que tous les IDs sont des strings non vides
     ids_messages = [m.get("id") or f"msg_{i}" for i, m in enumerate(messages)]
-    metadonnees_messages = [_extraire_metadonnees_message(m) for m in messages]
+    # Propriétaire détecté une fois : l'interlocuteur de chaque message est
+    # stocké en métadonnée (les routes de conversation filtrent dessus)
+    proprietaire = detecter_proprietaire(messages)
+    metadonnees_messages = [_extraire_metadonnees_message(m, proprietaire) for m in messages]
     
     db.ajouter_messages(
         nom_collection=nom_collection_messages,
@@ -293,6 +364,17 @@ def indexer_csv_messages(
         documents=textes_messages,
     )
     stats["messages_indexe"] = len(ids_messages)
+    
+    # Résumés des conversations (liste affichée par GET /api/conversations),
+    # recalculés sur toute la collection : elle peut contenir d'autres imports
+    try:
+        enregistrer_resumes(
+            parametres.CHEMIN_BASE_CHROMA,
+            nom_collection_messages,
+            calculer_resumes(db.obtenir_ou_creer_collection(nom_collection_messages)),
+        )
+    except sqlite3.Error as e:
+        print(f"   ⚠️  Résumés des conversations non enregistrés: {e}")
     _emit_progress("stockage", 92, "Messages stockés")
 
     # Stocker les chunks
@@ -356,11 +438,12 @@ def indexer_csv_messages(
     return stats
 
 
-def _extraire_metadonnees_message(message: Dict[str, Any]) -> Dict[str, Any]:
+def _extraire_metadonnees_message(message: Dict[str, Any], proprietaire: Optional[str] = None) -> Dict[str, Any]:
     """Extrait les métadonnées pertinentes d'un message pour ChromaDB.
 
     Args:
         message: Message normalisé
+        proprietaire: Numéro du propriétaire du téléphone (détecté sur tout le CSV)
 
     Returns:
         Métadonnées JSON-serializable
@@ -384,5 +467,7 @@ def _extraire_metadonnees_message(message: Dict[str, Any]) -> Dict[str, Any]:
         "is_noise": message.get("is_noise", False),
         "app": message.get("app", ""),
         "type": "message",  # Type pour distinguer des chunks
+        "proprietaire": proprietaire or "",
+        "interlocuteur": identifier_interlocuteur(message, proprietaire),  # Clé de conversation
     }
 
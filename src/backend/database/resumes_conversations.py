@@ -0,0 +1,187 @@
+"""Résumés des conversations précalculés, stockés à côté de la base ChromaDB.
+
+GET /api/conversations n'a besoin que d'une ligne par interlocuteur (nom,
+aperçu et date du dernier message, nombre de messages). Ces résumés sont
+calculés à l'indexation et rangés dans une petite base SQLite
+(conversations.sqlite3) dans le dossier de ChromaDB : la route les relit sans
+parcourir la collection. Le nombre de messages résumés est enregistré avec
+eux : des résumés dont le total ne correspond plus à collection.count()
+(collection supprimée, réindexation interrompue, modification par un autre
+processus) sont ignorés et recalculés.
+
+Le fichier chroma.sqlite3 n'est pas modifié : son schéma appartient à
+ChromaDB et peut changer d'une version à l'autre.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.backend.core.conversations import (
+    detecter_proprietaire,
+    interlocuteur_message,
+    resumer_conversations,
+    resumes_avec_apercus,
+)
+
+NOM_FICHIER_RESUMES = "conversations.sqlite3"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS conversations_resume (
+        collection TEXT NOT NULL,
+        contact TEXT,
+        contact_name TEXT,
+        dernier_message TEXT,
+        dernier_timestamp TEXT,
+        nombre_messages INTEGER,
+        rang INTEGER NOT NULL,
+        PRIMARY KEY (collection, rang)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS conversations_total (
+        collection TEXT PRIMARY KEY,
+        nombre_messages INTEGER NOT NULL
+    )
+    """,
+)
+
+_COLONNES = ("contact", "contact_name", "dernier_message", "dernier_timestamp", "nombre_messages")
+
+
+def _connecter(chemin_persistance: str | Path) -> sqlite3.Connection:
+    """Ouvre la base des résumés (créée au besoin)."""
+    connexion = sqlite3.connect(str(Path(chemin_persistance) / NOM_FICHIER_RESUMES))
+    for instruction in _SCHEMA:
+        connexion.execute(instruction)
+    return connexion
+
+
+def calculer_resumes(collection: Any) -> List[Dict[str, Any]]:
+    """Calcule les résumés des conversations d'une collection de messages.
+
+    Lit les métadonnées de toute la collection, puis le texte des seuls
+    derniers messages (un par conversation).
+
+    Args:
+        collection: Collection ChromaDB de messages
+
+    Returns:
+        Résumés au format de GET /api/conversations, du plus récent au plus ancien
+    """
+    count = collection.count()
+    if count == 0:
+        return []
+
+    resultats = collection.get(include=["metadatas"], limit=count)
+    ids = resultats["ids"]
+    metadatas = resultats["metadatas"] or [{}] * len(ids)
+    proprietaire = metadatas[0].get("proprietaire") or detecter_proprietaire(metadatas)
+    interlocuteurs = [interlocuteur_message(metadata, proprietaire) for metadata in metadatas]
+    conversations = resumer_conversations(ids, metadatas, interlocuteurs)
+
+    apercus = collection.get(
+        ids=[conv["dernier_id"] for conv in conversations],
+        include=["documents"]
+    )
+    return resumes_avec_apercus(conversations, dict(zip(apercus["ids"], apercus["documents"] or [])))
+
+
+def enregistrer_resumes(
+    chemin_persistance: str | Path,
+    nom_collection: str,
+    resumes: List[Dict[str, Any]],
+) -> None:
+    """Remplace les résumés enregistrés pour une collection.
+
+    Le nombre de messages résumés (somme des conversations) est enregistré
+    avec eux, pour le contrôle de fraîcheur de lire_resumes().
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection de messages
+        resumes: Résumés dans l'ordre d'affichage
+    """
+    connexion = _connecter(chemin_persistance)
+    try:
+        with connexion:
+            connexion.execute("DELETE FROM conversations_resume WHERE collection = ?", (nom_collection,))
+            connexion.executemany(
+                "INSERT INTO conversations_resume "
+                "(collection, rang, contact, contact_name, dernier_message, dernier_timestamp, nombre_messages) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (nom_collection, rang, *(resume[colonne] for colonne in _COLONNES))
+                    for rang, resume in enumerate(resumes)
+                ]
+            )
+            connexion.execute(
+                "INSERT OR REPLACE INTO conversations_total (collection, nombre_messages) VALUES (?, ?)",
+                (nom_collection, sum(resume["nombre_messages"] for resume in resumes))
+            )
+    finally:
+        connexion.close()
+
+
+def lire_resumes(
+    chemin_persistance: str | Path,
+    nom_collection: str,
+    nombre_messages: int,
+) -> Optional[List[Dict[str, Any]]]:
+    """Relit les résumés enregistrés pour une collection.
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection de messages
+        nombre_messages: Nombre actuel de messages (collection.count())
+
+    Returns:
+        Résumés dans l'ordre d'affichage, ou None s'ils n'ont pas été
+        calculés, s'ils portent sur un autre nombre de messages (collection
+        modifiée depuis) ou si la base des résumés est illisible
+    """
+    chemin = Path(chemin_persistance) / NOM_FICHIER_RESUMES
+    if not chemin.exists():
+        return None
+    try:
+        connexion = _connecter(chemin_persistance)
+        try:
+            total = connexion.execute(
+                "SELECT nombre_messages FROM conversations_total WHERE collection = ?",
+                (nom_collection,)
+            ).fetchone()
+            if total is None or total[0] != nombre_messages:
+                return None
+            lignes = connexion.execute(
+                f"SELECT {', '.join(_COLONNES)} FROM conversations_resume "
+                "WHERE collection = ? ORDER BY rang",
+                (nom_collection,)
+            ).fetchall()
+        finally:
+            connexion.close()
+    except sqlite3.Error:
+        return None
+    if not lignes:
+        return None
+    return [dict(zip(_COLONNES, ligne)) for ligne in lignes]
+
+
+def supprimer_resumes(chemin_persistance: str | Path, nom_collection: str) -> None:
+    """Supprime les résumés d'une collection (collection supprimée ou modifiée).
+
+    Args:
+        chemin_persistance: Dossier de la base ChromaDB
+        nom_collection: Nom de la collection de messages
+    """
+    if not (Path(chemin_persistance) / NOM_FICHIER_RESUMES).exists():
+        return
+    connexion = _connecter(chemin_persistance)
+    try:
+        with connexion:
+            connexion.execute("DELETE FROM conversations_resume WHERE collection = ?", (nom_collection,))
+            connexion.execute("DELETE FROM conversations_total WHERE collection = ?", (nom_collection,))
+    finally:
+        connexion.close()
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import chromadb
 import numpy as np
@@ -33,6 +36,9 @@ class BaseVectorielle:
                 allow_reset=True,
             ),
         )
+        # Collections déjà ouvertes (nom -> handle), évite un aller-retour
+        # SQLite par requête HTTP pour retrouver la même collection
+        self._collections: Dict[str, Any] = {}
 
     def obtenir_ou_creer_collection(
         self,
@@ -48,6 +54,9 @@ class BaseVectorielle:
         Returns:
             Collection ChromaDB
         """
+        collection = self._collections.get(nom_collection)
+        if collection is not None:
+            return collection
         try:
             collection = self.client.get_collection(name=nom_collection)
         except Exception:
@@ -58,8 +67,17 @@ class BaseVectorielle:
                 name=nom_collection,
                 metadata=metadata,
             )
+        self._collections[nom_collection] = collection
         return collection
 
+    def oublier_collections(self) -> None:
+        """Vide le cache des handles de collections.
+
+        À appeler quand des collections ont pu être supprimées ou recréées par
+        une autre instance (indexation avec réinitialisation).
+        """
+        self._collections.clear()
+
     def ajouter_messages(
         self,
         nom_collection: str,
@@ -118,6 +136,7 @@ class BaseVectorielle:
         Args:
             nom_collection: Nom de la collection à supprimer
         """
+        self._collections.pop(nom_collection, None)
         try:
             self.client.delete_collection(name=nom_collection)
         except Exception:
@@ -138,6 +157,48 @@ class BaseVectorielle:
         except Exception:
             return 0
 
+    def compter_tous(self, collections: Optional[List[Any]] = None) -> Dict[str, int]:
+        """Compte les documents de toutes les collections en une seule requête.
+
+        Interroge directement le fichier SQLite de ChromaDB (une requête
+        GROUP BY) au lieu d'un count() par collection. Si le schéma interne
+        n'est pas celui attendu (autre version de ChromaDB), se replie sur
+        un count() par collection, exécutés en parallèle.
+
+        Args:
+            collections: Résultat de client.list_collections() si l'appelant
+                l'a déjà (évite un second aller-retour dans le repli)
+
+        Returns:
+            Dictionnaire {nom_collection: nombre_documents}
+        """
+        chemin_sqlite = (self.chemin_persistance / "chroma.sqlite3").resolve()
+        try:
+            connexion = sqlite3.connect(f"{chemin_sqlite.as_uri()}?mode=ro", uri=True)
+            try:
+                lignes = connexion.execute(
+                    """
+                    SELECT c.name, COUNT(e.id)
+                    FROM collections c
+                    JOIN segments s ON s.collection = c.id AND s.scope = 'METADATA'
+                    LEFT JOIN embeddings e ON e.segment_id = s.id
+                    GROUP BY c.name
+                    """
+                ).fetchall()
+            finally:
+                connexion.close()
+            return {nom: nombre for nom, nombre in lignes}
+        except sqlite3.Error:
+            # count() natif sur les handles déjà retournés par list_collections
+            # (pas de get_collection par nom), exécutés en parallèle
+            if collections is None:
+                collections = self.client.list_collections()
+            if not collections:
+                return {}
+            with ThreadPoolExecutor(max_workers=min(8, len(collections))) as executeur:
+                nombres = executeur.map(lambda col: col.count(), collections)
+                return {col.name: nombre for col, nombre in zip(collections, nombres)}
+
     def rechercher(
         self,
         nom_collection: str,
@@ -240,56 +301,99 @@ class BaseVectorielle:
         Returns:
             Liste de résultats formatés
         """
-        # Récupérer TOUS les documents de la collection (avec filtres si fournis)
-        # ChromaDB limite à 10000 résultats par défaut, on augmente pour être sûr
-        count = collection.count()
-        
-        resultats_bruts = collection.get(
-            where=filtres,
-            include=["embeddings", "metadatas", "documents"],
-            limit=count if count > 0 else 10000,
-        )
-
-        if not resultats_bruts["ids"] or len(resultats_bruts["ids"]) == 0:
-            return []
-
-        # Convertir en numpy pour calculs vectoriels rapides
-        embeddings_db = np.array(resultats_bruts["embeddings"])
         embedding_req = np.array(embedding_requete)
-
-        # Calculer les distances cosine manuellement
-        # Distance cosine = 1 - cosine_similarity
-        # cosine_similarity = dot(A, B) / (norm(A) * norm(B))
-        normes_db = np.linalg.norm(embeddings_db, axis=1)
         norme_req = np.linalg.norm(embedding_req)
-        
         # Éviter division par zéro
-        normes_db = np.where(normes_db == 0, 1e-10, normes_db)
         norme_req = norme_req if norme_req != 0 else 1e-10
-        
-        # Produits scalaires
-        dots = np.dot(embeddings_db, embedding_req)
-        
-        # Similarités cosine
-        similarites = dots / (normes_db * norme_req)
-        
-        # Distances cosine (1 - similarité)
-        distances = 1 - similarites
 
-        # Trier par distance croissante et prendre les top K
-        indices_tries = np.argsort(distances)[:nombre_resultats]
+        # Parcourir TOUS les documents de la collection (avec filtres si
+        # fournis) par pages : seuls les embeddings d'une page et les
+        # meilleurs résultats rencontrés sont gardés en mémoire
+        meilleurs: List[Dict[str, Any]] = []
+        for page in parcourir_collection(
+            collection, ["embeddings", "metadatas", "documents"], where=filtres
+        ):
+            # Convertir en numpy pour calculs vectoriels rapides
+            embeddings_db = np.array(page["embeddings"])
+
+            # Calculer les distances cosine manuellement
+            # Distance cosine = 1 - cosine_similarity
+            # cosine_similarity = dot(A, B) / (norm(A) * norm(B))
+            normes_db = np.linalg.norm(embeddings_db, axis=1)
+            normes_db = np.where(normes_db == 0, 1e-10, normes_db)
+
+            # Similarités cosine, puis distances cosine (1 - similarité)
+            similarites = np.dot(embeddings_db, embedding_req) / (normes_db * norme_req)
+            distances = 1 - similarites
+
+            # Top K de la page, fusionné avec le top K des pages précédentes
+            for idx in np.argsort(distances)[:nombre_resultats]:
+                meilleurs.append({
+                    "id": page["ids"][idx],
+                    "distance": float(distances[idx]),
+                    "score": float(similarites[idx]),
+                    "metadata": page["metadatas"][idx] if page["metadatas"] else {},
+                    "document": page["documents"][idx] if page["documents"] else "",
+                })
+            meilleurs.sort(key=itemgetter("distance"))
+            del meilleurs[nombre_resultats:]
+
+        return meilleurs
+
+
+# Nombre d'éléments lus par appel à get() quand toute une collection est parcourue
+TAILLE_PAGE_LECTURE = 5000
+
+
+def parcourir_collection(
+    collection: Any,
+    include: List[str],
+    where: Optional[Dict[str, Any]] = None,
+    taille_page: int = TAILLE_PAGE_LECTURE,
+) -> Iterator[Dict[str, Any]]:
+    """Lit une collection entière par pages (get avec offset et limit).
+
+    Un get(limit=count) matérialise toute la collection en une fois ; par
+    pages, chaque résultat peut être libéré avant la lecture du suivant.
+
+    Args:
+        collection: Collection ChromaDB
+        include: Champs demandés à get() (ex. ["metadatas"], [] pour les IDs seuls)
+        where: Filtre de métadonnées optionnel
+        taille_page: Nombre maximal d'éléments par page
+
+    Yields:
+        Résultats de collection.get(), d'au plus taille_page éléments chacun
+    """
+    offset = 0
+    while True:
+        page = collection.get(where=where, include=include, limit=taille_page, offset=offset)
+        nombre = len(page["ids"])
+        if nombre:
+            yield page
+        if nombre < taille_page:
+            return
+        offset += nombre
 
-        # Formatter les résultats
-        resultats_formates = []
-        for idx in indices_tries:
-            resultat = {
-                "id": resultats_bruts["ids"][idx],
-                "distance": float(distances[idx]),
-                "score": float(similarites[idx]),
-                "metadata": resultats_bruts["metadatas"][idx] if resultats_bruts["metadatas"] else {},
-                "document": resultats_bruts["documents"][idx] if resultats_bruts["documents"] else "",
-            }
-            resultats_formates.append(resultat)
 
-        return resultats_formates
+_base_vectorielle_singleton: Optional[BaseVectorielle] = None
+
+
+def obtenir_base_vectorielle(chemin_persistance: str | Path) -> BaseVectorielle:
+    """Retourne une instance BaseVectorielle partagée pour ce chemin.
 
+    Évite de recréer un client ChromaDB (ouverture SQLite, index HNSW) à
+    chaque requête HTTP. Une nouvelle instance n'est créée que si le chemin
+    de persistance change.
+
+    Args:
+        chemin_persistance: Chemin vers le répertoire de stockage ChromaDB
+
+    Returns:
+        Instance BaseVectorielle mise en cache
+    """
+    global _base_vectorielle_singleton
+    chemin = Path(chemin_persistance)
+    if _base_vectorielle_singleton is None or _base_vectorielle_singleton.chemin_persistance != chemin:
+        _base_vectorielle_singleton = BaseVectorielle(chemin)
+    return _base_vectorielle_singleton